@@ -5,15 +5,18 @@ warnings.filterwarnings("ignore", category=FutureWarning)
 from flask import Flask, render_template, request, jsonify
 from datetime import datetime
 import pytz
-from utils.location import get_location_details
+from utils.location import get_location_details, suggest_locations
 from panchanga.calculations import (
-    calculate_vara, calculate_tithi, calculate_nakshatra, 
-    calculate_yoga, calculate_karana, calculate_masa_samvatsara,
+    calculate_vara, calculate_nakshatra, calculate_angas,
     calculate_saka_year, format_panchanga_report
 )
-from utils.astronomy import get_sidereal_longitude, get_sunrise_sunset, sun, moon, get_previous_new_moon, get_angular_data
+from utils.astronomy import get_sunrise_sunset, get_moment, get_rashi
 import os
+import json
 import base64
+import hashlib
+import re
+import time
 from utils.ai_engine import ai_engine
 
 app = Flask(__name__)
@@ -22,49 +25,432 @@ app = Flask(__name__)
 def index():
     return render_template('index.html')
 
-from panchanga.recurrence import find_recurrences
+from panchanga.recurrence import find_recurrences, iter_recurrences, check_cursor
+from itertools import islice
 from utils.ical_gen import create_ical_content
-from utils.skyshot import generate_skymap, get_cache_key, get_cached_image, CACHE_DIR
-from utils.solar_system import generate_solar_system, get_cache_key as get_solar_cache_key, get_cached_image as get_solar_cached_image, CACHE_DIR as SOLAR_CACHE_DIR
+from utils.skyshot import get_cache_key, get_state_cache_key, generate_skymap_svg, SKYSHOT_CACHE, SKYSHOT_KEY_RESOLUTION
+from utils.solar_system import get_cache_key as get_solar_cache_key, generate_solar_system_svg, SOLAR_CACHE
 from flask import Response, make_response
+from utils.cache import LRUCache, get_caches
+from utils.image_cache import get_image_caches
+from utils.render_pool import get_render_pool, get_render_pool_stats, RenderQueueFull, RenderTimeout
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from utils.warmup import process_memory
+from utils.jobs import job_id, job_kind, report_progress, get_job_queue, get_job_queue_stats, JobQueueFull
+
+# Upper bound for one page of /api/recurrences
+MAX_RECURRENCE_PAGE = 100
+
+IMAGE_MAX_AGE = 3600
+
+IMAGE_MIMETYPES = {'png': 'image/png', 'svg': 'image/svg+xml'}
+
+def image_format(data):
+    """
+    The raw image format the client asked for instead of base64-PNG-in-JSON:
+    "png" or "svg", via {"format": ...} or an Accept header preferring
+    image/png or image/svg+xml. None for the JSON response.
+    """
+    if data.get('format') in IMAGE_MIMETYPES:
+        return data['format']
+    best = request.accept_mimetypes.best_match(['application/json', *IMAGE_MIMETYPES.values()])
+    return next((fmt for fmt, mimetype in IMAGE_MIMETYPES.items() if mimetype == best), None)
+
+def svg_response(svg):
+    """
+    Streams an SVG view. These are drawn per request in a few milliseconds
+    without matplotlib, so they bypass the render pool and image caches.
+    """
+    return image_response((svg, hashlib.md5(svg).hexdigest(), {}), cached=False, fmt='svg')
+
+def image_response(entry, cached, headers=None, fmt='png'):
+    """
+    Streams image bytes with a content-hash ETag. Private caching only: the
+    image encodes the user's birth moment, so shared caches must not keep it.
+    Answers If-None-Match with 304 Not Modified.
+    """
+    image, etag, _ = entry
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(image, mimetype=IMAGE_MIMETYPES[fmt])
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f'private, max-age={IMAGE_MAX_AGE}'
+    response.headers['X-Cache'] = 'HIT' if cached else 'MISS'
+    response.headers.update(headers or {})
+    return response
+
+class InvalidRequest(ValueError):
+    """Bad client input, answered with 400."""
+
+def parse_start(start_str, local_tz):
+    """
+    Parses an optional search start ("YYYY" or "YYYY-MM-DD") as local midnight.
+    """
+    if not start_str:
+        return None
+    fmt = "%Y" if len(str(start_str)) == 4 else "%Y-%m-%d"
+    try:
+        return local_tz.localize(datetime.strptime(str(start_str), fmt))
+    except ValueError:
+        raise InvalidRequest(f"Invalid start: {start_str} (expected YYYY or YYYY-MM-DD)")
+
+def format_anga_times(spans, local_tz):
+    """
+    Local start/end times of the Tithi, Nakshatra, Yoga and Karana prevailing
+    at an event, from calculate_angas()' spans (None outside the anga index).
+    """
+    if spans is None:
+        return None
+    def local(dt):
+        return dt.astimezone(local_tz).strftime('%Y-%m-%d %H:%M:%S') if dt else None
+    return {
+        anga: {"start": local(spans[anga].start), "end": local(spans[anga].end)}
+        for anga in ("tithi", "nakshatra", "yoga", "karana")
+    }
+
+def localize_event(date_str, time_str, loc):
+    """
+    Parses a request's date and time at a resolved location:
+    (local datetime, UTC datetime).
+    """
+    naive_dt = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M")
+    local_dt = pytz.timezone(loc["timezone"]).localize(naive_dt)
+    return local_dt, local_dt.astimezone(pytz.utc)
+
+def image_data_uri(png):
+    """Base64 data URI for a PNG, so images never need a public URL."""
+    return f"data:image/png;base64,{base64.b64encode(png).decode('utf-8')}"
+
+# Events per iCal download
+ICAL_ENTRIES = 20
+
+def build_ical(title, local_dt, loc, lang, start, cursor):
+    """
+    iCal text of the next ICAL_ENTRIES occurrences, optionally from a start
+    date or cursor. Runs as an "ical" background job.
+    """
+    if start or cursor:
+        occurrences = iter_recurrences(local_dt, loc, lang=lang, cursor=cursor, start=start, progress=report_progress)
+        occurrences = list(islice(occurrences, ICAL_ENTRIES))
+    else:
+        occurrences = find_recurrences(local_dt, loc, num_entries=ICAL_ENTRIES, lang=lang, progress=report_progress)
+
+    # The event descriptions are full Panchanga reports, computed per event
+    for i, occurrence in enumerate(occurrences):
+        report_progress(f"event {i + 1} of {len(occurrences)}", i / len(occurrences))
+        occurrence.report
+    return create_ical_content(title, occurrences)
+
+def build_recurrence_page(local_dt, loc, lang, limit, cursor, start, include_report):
+    """
+    One page of /api/recurrences. Runs as a "recurrences" background job.
+    """
+    occurrences = iter_recurrences(
+        local_dt, loc, lang=lang, cursor=cursor, start=start, block_years=limit + 1,
+        progress=report_progress
+    )
+    page = list(islice(occurrences, limit))
+
+    items = []
+    for occurrence in page:
+        item = {
+            "date": occurrence.datetime.strftime('%A, %B %d, %Y'),
+            "datetime": occurrence.datetime.isoformat()
+        }
+        if include_report:
+            item["report"] = occurrence.report
+        items.append(item)
+
+    return {
+        "occurrences": items,
+        "next_cursor": page[-1].cursor if len(page) == limit else None
+    }
+
+def event_inputs(loc, local_dt, lang):
+    """The normalized event part of a job id. Searches start from today, so it is included."""
+    today = datetime.now(pytz.utc).strftime('%Y-%m-%d')
+    return [local_dt.strftime('%Y-%m-%d %H:%M'), loc["latitude"], loc["longitude"], loc["timezone"], lang, today]
+
+def parse_search_options(data, loc, local_dt):
+    """
+    The 'start' and 'cursor' of a recurrence search, validated up front so
+    bad input is answered with 400 instead of becoming a failed job.
+    """
+    start_str, cursor = data.get('start'), data.get('cursor')
+    start = parse_start(start_str, local_dt.tzinfo)
+    if cursor is not None:
+        try:
+            check_cursor(cursor, local_dt, loc)
+        except ValueError as e:
+            raise InvalidRequest(str(e))
+    return start_str, start, cursor
+
+def prepare_ical_job(data, loc, local_dt, lang):
+    title = data.get('title', 'Hindu Panchanga Event')
+    start_str, start, cursor = parse_search_options(data, loc, local_dt)
+    job = job_id("ical", *event_inputs(loc, local_dt, lang), title, start_str, cursor)
+    return job, build_ical, (title, local_dt, loc, lang, start, cursor)
+
+def prepare_recurrences_job(data, loc, local_dt, lang):
+    try:
+        limit = max(1, min(int(data.get('limit', 20)), MAX_RECURRENCE_PAGE))
+    except (TypeError, ValueError):
+        raise InvalidRequest(f"Invalid limit: {data.get('limit')}")
+    include_report = bool(data.get('include_report', False))
+    start_str, start, cursor = parse_search_options(data, loc, local_dt)
+    job = job_id("recurrences", *event_inputs(loc, local_dt, lang), limit, include_report, start_str, cursor)
+    return job, build_recurrence_page, (local_dt, loc, lang, limit, cursor, start, include_report)
+
+# Job kinds clients may submit to /api/jobs: kind -> prepare(data, loc, local_dt, lang),
+# returning (job id, function, args)
+JOB_KINDS = {
+    "ical": prepare_ical_job,
+    "recurrences": prepare_recurrences_job,
+}
+
+# Endpoints backed by a job wait this long for it before answering 202 with
+# the job to poll, so quick (or cached) work still answers in one request
+JOB_INLINE_WAIT = float(os.environ.get("PANCHANGA_JOB_INLINE_WAIT", "5"))
+
+def submit_job(kind, data):
+    """
+    Resolves the event in a request body and submits it as a job of this
+    kind. Returns (job id, state).
+    """
+    lang = data.get('lang', 'EN')
+    loc = get_location_details(data.get('location'))
+    local_dt, _ = localize_event(data.get('date'), data.get('time'), loc)
+    job, fn, args = JOB_KINDS[kind](data, loc, local_dt, lang)
+    return job, get_job_queue().submit(job, fn, *args)
+
+def job_payload(job, state):
+    """Status JSON of a job, with where to poll and fetch it."""
+    return {
+        "success": state["status"] != "failed",
+        "job": job,
+        "kind": job_kind(job),
+        "status": state["status"],
+        "progress": state.get("progress"),
+        "error": state.get("error"),
+        "expires": state.get("expires"),
+        "status_url": f"/api/jobs/{job}",
+        "result_url": f"/api/jobs/{job}/result"
+    }
+
+def job_accepted(job, state):
+    return jsonify(job_payload(job, state)), 202
+
+def ical_response(title, ical_data):
+    response = make_response(ical_data)
+    response.headers["Content-Disposition"] = f"attachment; filename={title.replace(' ', '_')}.ics"
+    response.headers["Content-Type"] = "text/calendar"
+    return response
 
 @app.route('/api/generate-ical', methods=['POST'])
 def generate_ical():
+    """
+    Next 20 occurrences as an .ics download. Runs as an "ical" job: answers
+    with the file when it finishes within JOB_INLINE_WAIT, else 202 with
+    the job to poll (/api/jobs/<job>) and download (/api/jobs/<job>/result).
+    """
     data = request.json
     date_str = data.get('date')
     time_str = data.get('time')
     location_name = data.get('location')
     title = data.get('title', 'Hindu Panchanga Event')
-    lang = data.get('lang', 'EN')
 
     if not all([date_str, time_str, location_name]):
         return jsonify({"error": "Missing required fields"}), 400
 
     try:
-        # 1. Resolve Location
-        loc = get_location_details(location_name)
-        
-        # 2. Parse DateTime
-        dt_str = f"{date_str} {time_str}"
-        naive_dt = datetime.strptime(dt_str, "%Y-%m-%d %H:%M")
-        local_tz = pytz.timezone(loc["timezone"])
-        local_dt = local_tz.localize(naive_dt)
-
-        # 3. Find Recurrences (Exactly next 20 entries)
-        occurrences = find_recurrences(local_dt, loc, num_entries=20, lang=lang)
-        
-        # 4. Generate iCal content
-        ical_data = create_ical_content(title, occurrences)
-        
-        response = make_response(ical_data)
-        response.headers["Content-Disposition"] = f"attachment; filename={title.replace(' ', '_')}.ics"
-        response.headers["Content-Type"] = "text/calendar"
-        
-        return response
+        job, state = submit_job("ical", data)
+        state = get_job_queue().wait(job, JOB_INLINE_WAIT) or state
+        if state["status"] == "failed":
+            return jsonify({"success": False, "error": state["error"]}), 500
+        if state["status"] != "done":
+            return job_accepted(job, state)
+        return ical_response(title, state["result"])
+
+    except InvalidRequest as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except JobQueueFull as e:
+        return jsonify({"success": False, "error": str(e)}), 503
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/recurrences', methods=['POST'])
+def get_recurrences():
+    """
+    Page through upcoming occurrences of the event's Masa, Paksha and Tithi.
+    Accepts 'limit', an optional 'start' ("YYYY" or "YYYY-MM-DD") and the
+    'next_cursor' of a previous page as 'cursor'. Runs as a "recurrences"
+    job, answering 202 with the job to poll if it outlasts JOB_INLINE_WAIT.
+    """
+    data = request.json
+    date_str = data.get('date')
+    time_str = data.get('time')
+    location_name = data.get('location')
 
+    if not all([date_str, time_str, location_name]):
+        return jsonify({"success": False, "error": "Missing required fields"}), 400
+
+    try:
+        job, state = submit_job("recurrences", data)
+        state = get_job_queue().wait(job, JOB_INLINE_WAIT) or state
+        if state["status"] == "failed":
+            return jsonify({"success": False, "error": state["error"]}), 500
+        if state["status"] != "done":
+            return job_accepted(job, state)
+        return jsonify({"success": True, **state["result"]})
+
+    except InvalidRequest as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except JobQueueFull as e:
+        return jsonify({"success": False, "error": str(e)}), 503
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    """
+    Submits a long computation as a background job and answers 202 at once.
+    Body: {"kind": "ical" | "recurrences", ...} plus the fields of the
+    matching endpoint. Identical submissions share one job.
+    """
+    data = request.json
+    kind = data.get('kind')
+
+    if kind not in JOB_KINDS:
+        return jsonify({"success": False, "error": f"Unknown job kind: {kind}"}), 400
+    if not all([data.get('date'), data.get('time'), data.get('location')]):
+        return jsonify({"success": False, "error": "Missing required fields"}), 400
+
+    try:
+        job, state = submit_job(kind, data)
+        return job_accepted(job, state)
+    except InvalidRequest as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except JobQueueFull as e:
+        return jsonify({"success": False, "error": str(e)}), 503
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/jobs/<job>', methods=['GET'])
+def get_job(job):
+    """
+    Status of a job: "queued", "running" (with "progress"), "done" or "failed".
+    """
+    state = get_job_queue().status(job)
+    if state is None:
+        return jsonify({"success": False, "error": "Unknown or expired job"}), 404
+    return jsonify(job_payload(job, state))
+
+@app.route('/api/jobs/<job>/result', methods=['GET'])
+def get_job_result(job):
+    """
+    Result of a finished job: the .ics file of an "ical" job (its title
+    from ?title=), JSON otherwise. 409 while the job is still pending.
+    """
+    state = get_job_queue().status(job)
+    if state is None:
+        return jsonify({"success": False, "error": "Unknown or expired job"}), 404
+    if state["status"] == "failed":
+        return jsonify({"success": False, "error": state["error"]}), 500
+    if state["status"] != "done":
+        return jsonify(job_payload(job, state)), 409
+
+    kind = job_kind(job)
+    if kind == "ical":
+        return ical_response(request.args.get('title', 'Hindu Panchanga Event'), state["result"])
+    if kind == "recurrences":
+        return jsonify({"success": True, **state["result"]})
+    return jsonify({"success": True, "result": state["result"]})
+
+MAX_LOCATION_SUGGESTIONS = 20
+
+@app.route('/api/locations/suggest', methods=['GET'])
+def suggest_location_names():
+    """
+    Autocomplete for the location field, answered from the offline gazetteer.
+    Query parameters: 'q' (prefix, optionally "Town, Country") and 'limit'.
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({"success": True, "suggestions": []})
+
+    try:
+        limit = max(1, min(int(request.args.get('limit', 8)), MAX_LOCATION_SUGGESTIONS))
+        places = suggest_locations(query, limit=limit)
+        return jsonify({"success": True, "suggestions": [place.to_dict() for place in places]})
+
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+def skyshot_view(moment):
+    """
+    What the sky map of a moment shows: (nakshatra, pada, response metadata,
+    exact wheel longitudes to render at).
+    """
+    moon_lon = moment.moon_sidereal
+    angular_data = moment.angular_data
+    nakshatra, nak_pada = calculate_nakshatra(moon_lon, lang='EN')
+    metadata = {
+        "nakshatra": nakshatra,
+        "moon_longitude": round(moon_lon, 2),
+        "rahu_longitude": round(angular_data["rahu_sidereal"], 2),
+        "ketu_longitude": round(angular_data["ketu_sidereal"], 2)
+    }
+    render_at = {
+        "moon_longitude": moon_lon,
+        "rahu_longitude": angular_data["rahu_sidereal"],
+        "ketu_longitude": angular_data["ketu_sidereal"]
+    }
+    return nakshatra, nak_pada, metadata, render_at
+
+def skyshot_svg(moment):
+    nakshatra, _, _, render_at = skyshot_view(moment)
+    return generate_skymap_svg(nakshatra_name=nakshatra, **render_at)
+
+def skyshot_job(moment, title, cache_key=None):
+    """
+    What rendering the sky map of a moment takes: (cache key, metadata,
+    quantization state or None, render arguments). cache_key is the request
+    key in request-keyed mode; in state-keyed mode it comes from the wheel
+    state, so every request showing the same sky (anywhere, any minute)
+    shares the image.
+    """
+    nakshatra, nak_pada, metadata, render_at = skyshot_view(moment)
+    state = None
+    if SKYSHOT_KEY_RESOLUTION > 0:
+        cache_key, state = get_state_cache_key(nakshatra, **render_at)
+        render_at = {name: state[name] for name in render_at}
+        metadata["quantization"] = state
+    render_args = {
+        "nakshatra_name": nakshatra,
+        "nakshatra_pada": nak_pada,
+        "phase_angle": moment.angular_data["phase_angle"],
+        "event_title": title if title else None,
+        **render_at
+    }
+    return cache_key, metadata, state, render_args
+
+def render_skyshot(moment, title, cache_key=None):
+    """
+    Sky map PNG of a moment from SKYSHOT_CACHE or the render pool:
+    (cache entry, cached, metadata, quantization state or None).
+    In request-keyed mode the caller has already looked cache_key up.
+    """
+    cache_key, metadata, state, render_args = skyshot_job(moment, title, cache_key)
+    entry = SKYSHOT_CACHE.get(cache_key) if state else None
+    cached = entry is not None
+    
+    if not cached:
+        png = get_render_pool().render("skyshot", cache_key, **render_args)
+        # State-keyed images are shared, so they carry no per-request metadata
+        entry = SKYSHOT_CACHE.put(cache_key, png, {} if state else metadata)
+    return entry, cached, metadata, state
+
 @app.route('/api/skyshot', methods=['POST'])
 def get_skyshot():
     """
@@ -75,6 +461,7 @@ def get_skyshot():
     time_str = data.get('time')
     location_name = data.get('location')
     title = data.get('title', '')
+    fmt = image_format(data)
     
     if not all([date_str, time_str, location_name]):
         return jsonify({"success": False, "error": "Missing required fields"}), 400
@@ -83,60 +470,135 @@ def get_skyshot():
         # 1. Resolve location
         loc = get_location_details(location_name)
         
-        # 2. Check cache first
-        cache_key = get_cache_key(date_str, time_str, loc["latitude"], loc["longitude"])
-        cached_path = get_cached_image(cache_key)
-        
-        if cached_path:
-            with open(cached_path, "rb") as image_file:
-                encoded_string = base64.b64encode(image_file.read()).decode('utf-8')
-            return jsonify({
-                "success": True,
-                "image_data": f"data:image/png;base64,{encoded_string}",
-                "cached": True
-            })
-        
-        # 3. Parse DateTime and calculate astronomical data
-        dt_str = f"{date_str} {time_str}"
-        naive_dt = datetime.strptime(dt_str, "%Y-%m-%d %H:%M")
-        local_tz = pytz.timezone(loc["timezone"])
-        local_dt = local_tz.localize(naive_dt)
-        utc_dt = local_dt.astimezone(pytz.utc)
-        
-        # 4. Get Moon position and angular data
-        moon_lon = get_sidereal_longitude(utc_dt, moon)
-        angular_data = get_angular_data(local_dt, loc["latitude"], loc["longitude"], loc["timezone"])
+        # 2. Check cache first (request-keyed mode: before any astronomy)
+        cache_key = None
+        if SKYSHOT_KEY_RESOLUTION <= 0 and fmt != 'svg':
+            cache_key = get_cache_key(date_str, time_str, loc["latitude"], loc["longitude"])
+            entry = SKYSHOT_CACHE.get(cache_key)
+            
+            if entry:
+                if fmt == 'png':
+                    return image_response(entry, cached=True)
+                return jsonify({
+                    "success": True,
+                    "image_data": image_data_uri(entry[0]),
+                    "cached": True,
+                    **entry[2]
+                })
         
-        # 5. Get Nakshatra info
-        nakshatra, nak_pada = calculate_nakshatra(moon_lon, lang='EN')
+        # 3. Parse DateTime and take the shared snapshot of the moment
+        _, utc_dt = localize_event(date_str, time_str, loc)
+        moment = get_moment(utc_dt)
         
-        # 6. Generate sky map
-        output_path = str(CACHE_DIR / f"{cache_key}.png")
-        generate_skymap(
-            moon_longitude=moon_lon,
-            nakshatra_name=nakshatra,
-            nakshatra_pada=nak_pada,
-            phase_angle=angular_data["phase_angle"],
-            output_path=output_path,
-            event_title=title if title else None,
-            rahu_longitude=angular_data["rahu_sidereal"],
-            ketu_longitude=angular_data["ketu_sidereal"]
-        )
+        # SVG is drawn at the exact positions, inline
+        if fmt == 'svg':
+            return svg_response(skyshot_svg(moment))
         
-        # 7. Convert to Base64 for privacy (No public URL)
-        with open(output_path, "rb") as image_file:
-            encoded_string = base64.b64encode(image_file.read()).decode('utf-8')
+        # 4. Generate (or look up) the sky map
+        entry, cached, metadata, state = render_skyshot(moment, title, cache_key)
+        if fmt == 'png':
+            headers = None
+            if state:
+                max_offset = max(abs(state[f"{body}_offset"]) for body in ("moon", "rahu", "ketu"))
+                headers = {"X-Quantization-Error-Degrees": f"{max_offset:.4f}"}
+            return image_response(entry, cached=cached, headers=headers)
         
+        # 5. Convert to Base64 for privacy (No public URL)
         return jsonify({
             "success": True,
-            "image_data": f"data:image/png;base64,{encoded_string}",
-            "cached": False,
-            "nakshatra": nakshatra,
-            "moon_longitude": round(moon_lon, 2),
-            "rahu_longitude": round(angular_data["rahu_sidereal"], 2),
-            "ketu_longitude": round(angular_data["ketu_sidereal"], 2)
+            "image_data": image_data_uri(entry[0]),
+            "cached": cached,
+            **metadata
         })
         
+    except RenderQueueFull as e:
+        return jsonify({"success": False, "error": str(e)}), 503
+    except RenderTimeout as e:
+        return jsonify({"success": False, "error": str(e)}), 504
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+def solar_system_args(utc_dt, title):
+    return {"utc_dt": utc_dt, "event_title": title if title else None}
+
+def render_solar_system(utc_dt, title, cache_key):
+    """Renders the solar system view in the pool and caches it; returns the cache entry."""
+    png = get_render_pool().render("solar_system", cache_key, **solar_system_args(utc_dt, title))
+    return SOLAR_CACHE.put(cache_key, png)
+
+# Rendered images addressable by cache key, for /api/images/<kind>/<key>
+IMAGE_CACHES = {"skyshot": SKYSHOT_CACHE, "solar_system": SOLAR_CACHE}
+IMAGE_KEY_PATTERN = re.compile(r"^[0-9a-f]{12}$")
+# How often a request for an image rendering in another worker checks the disk tier
+IMAGE_POLL_INTERVAL = 0.2
+
+def start_image(kind, key, metadata=None, **render_args):
+    """
+    Handle of an image for the bundle: (URL, cached). An image that is not
+    cached yet starts rendering in the pool without waiting for it, and is
+    served by /api/images/<kind>/<key> once it is done.
+    """
+    cache = IMAGE_CACHES[kind]
+    pool = get_render_pool()
+    cached = cache.get(key) is not None
+    # Rendering in another worker already: that worker stores it
+    if not cached and not cache.is_pending(key, pool.timeout):
+        def store(png):
+            if png is None:
+                cache.clear_pending(key)
+            else:
+                cache.put(key, png, metadata)
+
+        cache.mark_pending(key)
+        pool.render_async(kind, key, store, **render_args)
+    return f"/api/images/{kind}/{key}", cached
+
+def wait_for_image(kind, key):
+    """
+    The cache entry of an image started by start_image(): joins its render
+    when it runs in this worker, else waits for the worker rendering it to
+    write it to the shared disk tier. None if it is unknown or failed.
+    """
+    cache = IMAGE_CACHES[kind]
+    pool = get_render_pool()
+    future = pool.pending(kind, key)
+    if future is not None:
+        try:
+            png = future.result(timeout=pool.timeout)
+        except FutureTimeoutError:
+            raise RenderTimeout(f"Rendering took longer than {pool.timeout:g}s") from None
+        return cache.get(key) or cache.put(key, png)
+
+    deadline = time.monotonic() + pool.timeout
+    while cache.is_pending(key, pool.timeout):
+        if time.monotonic() > deadline:
+            raise RenderTimeout(f"Rendering took longer than {pool.timeout:g}s")
+        time.sleep(IMAGE_POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    return cache.get(key)
+
+@app.route('/api/images/<kind>/<key>', methods=['GET'])
+def get_image(kind, key):
+    """
+    A rendered PNG by the handle /api/bundle returned, with an ETag
+    (304 on If-None-Match) so the browser caches it. Waits for an image
+    that is still rendering.
+    """
+    if kind not in IMAGE_CACHES or not IMAGE_KEY_PATTERN.match(key):
+        return jsonify({"success": False, "error": "Unknown image"}), 404
+    try:
+        entry = IMAGE_CACHES[kind].get(key)
+        cached = entry is not None
+        if not cached:
+            entry = wait_for_image(kind, key)
+        if entry is None:
+            return jsonify({"success": False, "error": "Unknown or expired image"}), 404
+        return image_response(entry, cached=cached)
+
+    except RenderTimeout as e:
+        return jsonify({"success": False, "error": str(e)}), 504
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
@@ -150,6 +612,7 @@ def get_solar_system():
     time_str = data.get('time')
     location_name = data.get('location')
     title = data.get('title', '')
+    fmt = image_format(data)
     
     if not all([date_str, time_str, location_name]):
         return jsonify({"success": False, "error": "Missing required fields"}), 400
@@ -160,45 +623,209 @@ def get_solar_system():
         
         # 2. Check cache (heliocentric view only depends on date/time)
         cache_key = get_solar_cache_key(date_str, time_str)
-        cached_path = get_solar_cached_image(cache_key)
+        entry = SOLAR_CACHE.get(cache_key) if fmt != 'svg' else None
         
-        if cached_path:
-            with open(cached_path, "rb") as image_file:
-                encoded_string = base64.b64encode(image_file.read()).decode('utf-8')
+        if entry:
+            if fmt == 'png':
+                return image_response(entry, cached=True)
             return jsonify({
                 "success": True,
-                "image_data": f"data:image/png;base64,{encoded_string}",
+                "image_data": image_data_uri(entry[0]),
                 "cached": True
             })
         
         # 3. Get UTC time
-        dt_str = f"{date_str} {time_str}"
-        naive_dt = datetime.strptime(dt_str, "%Y-%m-%d %H:%M")
-        local_tz = pytz.timezone(loc["timezone"])
-        local_dt = local_tz.localize(naive_dt)
-        utc_dt = local_dt.astimezone(pytz.utc)
+        _, utc_dt = localize_event(date_str, time_str, loc)
+        
+        # SVG is drawn inline from the batched planet positions
+        if fmt == 'svg':
+            return svg_response(generate_solar_system_svg(utc_dt))
         
         # 4. Generate Solar System view
-        output_path = str(SOLAR_CACHE_DIR / f"{cache_key}.png")
-        generate_solar_system(
-            utc_dt=utc_dt,
-            output_path=output_path,
-            event_title=title if title else None
-        )
+        entry = render_solar_system(utc_dt, title, cache_key)
+        if fmt == 'png':
+            return image_response(entry, cached=False)
         
         # 5. Convert to Base64 for privacy (No public URL)
-        with open(output_path, "rb") as image_file:
-            encoded_string = base64.b64encode(image_file.read()).decode('utf-8')
-            
         return jsonify({
             "success": True,
-            "image_data": f"data:image/png;base64,{encoded_string}",
+            "image_data": image_data_uri(entry[0]),
             "cached": False
         })
         
+    except RenderQueueFull as e:
+        return jsonify({"success": False, "error": str(e)}), 503
+    except RenderTimeout as e:
+        return jsonify({"success": False, "error": str(e)}), 504
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Cache statistics for monitoring. Counters are per worker process.
+    """
+    return jsonify({
+        "success": True,
+        "pid": os.getpid(),
+        "memory": process_memory(),
+        "caches": [cache.stats() for cache in get_caches()],
+        "image_caches": [cache.stats() for cache in get_image_caches()],
+        "render_pool": get_render_pool_stats(),
+        "jobs": get_job_queue_stats(),
+        "panchanga_cache": {
+            "responses": PANCHANGA_RESPONSES.stats(),
+            "cores": PANCHANGA_CORES.stats()
+        }
+    })
+
+def next_birthday_job(local_dt, loc, lang):
+    """Job id of an event's next-birthday search."""
+    return job_id("next_birthday", *event_inputs(loc, local_dt, lang))
+
+def find_next_birthday(local_dt, loc, lang):
+    """Date of the next occurrence; only the date is needed, not the report."""
+    occurrences = iter_recurrences(local_dt, loc, lang=lang, block_years=2, progress=report_progress)
+    next_occurrence = next(occurrences, None)
+    return next_occurrence.datetime.strftime('%A, %B %d, %Y') if next_occurrence else "N/A"
+
+# Normalized /api/panchanga response cache. A response entry per (place, local
+# minute, language, address) holds the finished payload; the astronomy under it
+# (Moment snapshot, sunrise/sunset, Rashi, Lagna) is one language-independent
+# core entry shared by every language of the same event.
+PANCHANGA_CACHE_TTL = int(os.environ.get("PANCHANGA_RESPONSE_CACHE_TTL", 6 * 3600))
+PANCHANGA_CORES = LRUCache(
+    "panchanga_cores", ttl=PANCHANGA_CACHE_TTL,
+    max_bytes=int(os.environ.get("PANCHANGA_CORE_CACHE_BYTES", 8 * 1024 * 1024))
+)
+PANCHANGA_RESPONSES = LRUCache(
+    "panchanga_responses", ttl=PANCHANGA_CACHE_TTL,
+    max_bytes=int(os.environ.get("PANCHANGA_RESPONSE_CACHE_BYTES", 16 * 1024 * 1024))
+)
+# Estimated footprint of a core entry (the Moment snapshot dominates)
+PANCHANGA_CORE_BYTES = 4096
+# ~10 m: places closer than this share entries
+PANCHANGA_CACHE_COORD_DECIMALS = 4
+
+def panchanga_core_key(loc, local_dt):
+    return (
+        round(loc["latitude"], PANCHANGA_CACHE_COORD_DECIMALS),
+        round(loc["longitude"], PANCHANGA_CACHE_COORD_DECIMALS),
+        loc["timezone"], local_dt.strftime('%Y-%m-%d %H:%M')
+    )
+
+def panchanga_core(loc, local_dt, utc_dt):
+    """
+    The language-independent astronomy of an event, from PANCHANGA_CORES
+    when any language of it was built before.
+    """
+    key = panchanga_core_key(loc, local_dt)
+    core = PANCHANGA_CORES.get(key)
+    if core is None:
+        # One snapshot of the moment, shared with the sky map and the
+        # recurrence search for the same instant
+        moment = get_moment(utc_dt)
+        sunrise, sunset = get_sunrise_sunset(local_dt, loc["latitude"], loc["longitude"], loc["timezone"])
+        lagna_idx, _ = moment.lagna(loc["latitude"], loc["longitude"])
+        core = {
+            "moment": moment,
+            "sunrise": sunrise,
+            "sunset": sunset,
+            "rashi_idx": get_rashi(moment.moon_sidereal),
+            "lagna_idx": lagna_idx,
+        }
+        PANCHANGA_CORES.put(key, core, size=PANCHANGA_CORE_BYTES)
+    return core
+
+def build_panchanga(loc, local_dt, utc_dt, lang='EN'):
+    """
+    The /api/panchanga "data" payload for an event at a resolved location,
+    without the next birthday (see get_panchanga_data).
+    """
+    local_tz = local_dt.tzinfo
+    # 3. Get Astronomical Data
+    core = panchanga_core(loc, local_dt, utc_dt)
+    moment, sunrise, sunset = core["moment"], core["sunrise"], core["sunset"]
+
+    # 4. Calculate Panchanga Elements
+    vara = calculate_vara(local_dt, sunrise, lang=lang)
+    angas = calculate_angas(moment, local_dt.year, lang=lang)
+    tithi, paksha = angas["tithi"], angas["paksha"]
+    nakshatra, nak_pada = angas["nakshatra"], angas["nak_pada"]
+    yoga, karana_num = angas["yoga"], angas["karana"]
+    masa, samvatsara = angas["masa"], angas["samvatsara"]
+
+    # 5. Calculate Rashi and Lagna (v3.2)
+    from utils.zodiac import get_zodiac_name, ZODIAC_SIGNS
+
+    rashi_idx = core["rashi_idx"]
+    rashi_name = get_zodiac_name(rashi_idx, lang)
+    rashi_code = ZODIAC_SIGNS[rashi_idx]["code"]
+
+    lagna_idx = core["lagna_idx"]
+    lagna_name = get_zodiac_name(lagna_idx, lang)
+    lagna_code = ZODIAC_SIGNS[lagna_idx]["code"]
+
+    report = format_panchanga_report(
+        local_dt, loc["address"], loc["timezone"],
+        sunrise, sunset, samvatsara, masa, paksha, tithi,
+        vara, nakshatra, nak_pada, yoga, karana_num, lang=lang
+    )
+
+    return {
+        "input_datetime": local_dt.strftime('%Y-%m-%d %H:%M:%S'),
+        "timezone": loc["timezone"],
+        "address": loc["address"],
+        "sunrise": sunrise.strftime('%H:%M:%S') if sunrise else 'N/A',
+        "sunset": sunset.strftime('%H:%M:%S') if sunset else 'N/A',
+        "samvatsara": samvatsara,
+        "saka_year": calculate_saka_year(local_dt),
+        "masa": masa,
+        "adhika_masa": angas["adhika"],
+        "paksha": paksha,
+        "tithi": tithi,
+        "vara": vara,
+        "nakshatra": f"{nakshatra} (Pada {nak_pada})",
+        "yoga": yoga,
+        "karana": karana_num,
+        "anga_times": format_anga_times(angas["spans"], local_tz),
+        "rashi": {"name": rashi_name, "code": rashi_code},
+        "lagna": {"name": lagna_name, "code": lagna_code},
+        "angular_data": moment.angular_data,
+        "report": report
+    }
+
+def get_panchanga_data(loc, local_dt, utc_dt, lang='EN'):
+    """
+    The full /api/panchanga "data" payload, served from PANCHANGA_RESPONSES
+    when the same event was asked before (re-opened events, shared links,
+    the insights page).
+    """
+    key = (*panchanga_core_key(loc, local_dt), lang, loc["address"])
+    next_bday_job = next_birthday_job(local_dt, loc, lang)
+    data = PANCHANGA_RESPONSES.get(key)
+    if data is None:
+        data = build_panchanga(loc, local_dt, utc_dt, lang)
+        PANCHANGA_RESPONSES.put(key, data, size=len(json.dumps(data)))
+    elif data.get("next_birthday_job") == next_bday_job and data.get("next_birthday") is not None:
+        return data
+
+    # 6. Next Birthday (Feature v4.1) runs in the background: included when
+    # already known, otherwise the client polls /api/next-birthday/<job>.
+    # The finished result is kept in the cached response under its job id,
+    # which includes today's date, so hits skip the job queue until the
+    # search moves with the clock. A full job queue only costs the next
+    # birthday, never the panchanga itself.
+    try:
+        next_bday = get_job_queue().submit(next_bday_job, find_next_birthday, local_dt, loc, lang).get("result")
+    except JobQueueFull as e:
+        print(f"WARNING: Next birthday skipped: {e}")
+        return {**data, "next_birthday": None, "next_birthday_job": None}
+    data = {**data, "next_birthday": next_bday, "next_birthday_job": next_bday_job}
+    if next_bday is not None:
+        PANCHANGA_RESPONSES.put(key, data, size=len(json.dumps(data)))
+    return data
+
 @app.route('/api/panchanga', methods=['POST'])
 def get_panchanga():
     data = request.json
@@ -212,83 +839,117 @@ def get_panchanga():
         return jsonify({"error": "Missing required fields"}), 400
 
     try:
-        # 1. Resolve Location
         loc = get_location_details(location_name)
-        
-        # 2. Parse DateTime
-        dt_str = f"{date_str} {time_str}"
-        naive_dt = datetime.strptime(dt_str, "%Y-%m-%d %H:%M")
-        local_tz = pytz.timezone(loc["timezone"])
-        local_dt = local_tz.localize(naive_dt)
-        utc_dt = local_dt.astimezone(pytz.utc)
-
-        # 3. Get Astronomical Data
-        sun_lon = get_sidereal_longitude(utc_dt, sun)
-        moon_lon = get_sidereal_longitude(utc_dt, moon)
-        sunrise, sunset = get_sunrise_sunset(local_dt, loc["latitude"], loc["longitude"], loc["timezone"])
-        
-        # New Moon for Masa
-        prev_nm_utc = get_previous_new_moon(utc_dt)
-        sun_lon_at_nm = get_sidereal_longitude(prev_nm_utc, sun)
-        
-        # 4. Calculate Panchanga Elements
-        vara = calculate_vara(local_dt, sunrise, lang=lang)
-        tithi, paksha = calculate_tithi(sun_lon, moon_lon, lang=lang)
-        nakshatra, nak_pada = calculate_nakshatra(moon_lon, lang=lang)
-        yoga = calculate_yoga(sun_lon, moon_lon, lang=lang)
-        karana_num = calculate_karana(sun_lon, moon_lon)
-        masa, samvatsara = calculate_masa_samvatsara(local_dt.year, sun_lon_at_nm, sun_lon, lang=lang)
-        
-        # 5. Calculate Rashi and Lagna (v3.2)
-        from utils.zodiac import get_zodiac_name, ZODIAC_SIGNS
-        from utils.astronomy import get_rashi, get_lagna
-        
-        rashi_idx = get_rashi(moon_lon)
-        rashi_name = get_zodiac_name(rashi_idx, lang)
-        rashi_code = ZODIAC_SIGNS[rashi_idx]["code"]
-        
-        lagna_idx, lagna_deg = get_lagna(local_dt, loc["latitude"], loc["longitude"], loc["timezone"])
-        lagna_name = get_zodiac_name(lagna_idx, lang)
-        lagna_code = ZODIAC_SIGNS[lagna_idx]["code"]
-
-        report = format_panchanga_report(
-            local_dt, loc["address"], loc["timezone"],
-            sunrise, sunset, samvatsara, masa, paksha, tithi,
-            vara, nakshatra, nak_pada, yoga, karana_num, lang=lang
-        )
-
-        # 6. Calculate Next Birthday (Feature v4.1)
-        next_bdays = find_recurrences(local_dt, loc, num_entries=1, lang=lang)
-        next_bday = next_bdays[0]["datetime"].strftime('%A, %B %d, %Y') if next_bdays else "N/A"
-
+        local_dt, utc_dt = localize_event(date_str, time_str, loc)
         return jsonify({
             "success": True,
-            "data": {
-                "input_datetime": local_dt.strftime('%Y-%m-%d %H:%M:%S'),
-                "timezone": loc["timezone"],
-                "address": loc["address"],
-                "sunrise": sunrise.strftime('%H:%M:%S') if sunrise else 'N/A',
-                "sunset": sunset.strftime('%H:%M:%S') if sunset else 'N/A',
-                "samvatsara": samvatsara,
-                "saka_year": calculate_saka_year(local_dt),
-                "masa": masa,
-                "paksha": paksha,
-                "tithi": tithi,
-                "vara": vara,
-                "nakshatra": f"{nakshatra} (Pada {nak_pada})",
-                "yoga": yoga,
-                "karana": karana_num,
-                "rashi": {"name": rashi_name, "code": rashi_code},
-                "lagna": {"name": lagna_name, "code": lagna_code},
-                "angular_data": get_angular_data(local_dt, loc["latitude"], loc["longitude"], loc["timezone"]),
-                "next_birthday": next_bday,
-                "report": report
-            }
+            "data": get_panchanga_data(loc, local_dt, utc_dt, lang)
         })
 
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+@app.route('/api/next-birthday/<job>', methods=['GET'])
+def get_next_birthday(job):
+    """
+    Polls the background next-birthday search started by /api/panchanga.
+    "status" is "queued", "running", "done" (with "next_birthday") or "failed".
+    """
+    state = get_job_queue().status(job)
+    if state is None:
+        return jsonify({"success": False, "error": "Unknown or expired job"}), 404
+    if state["status"] == "failed":
+        return jsonify({"success": False, "status": "failed", "error": state["error"]}), 500
+    return jsonify({
+        "success": True,
+        "status": state["status"],
+        "next_birthday": state.get("result")
+    })
+
+BUNDLE_PARTS = ("panchanga", "skyshot", "solar_system")
+BUNDLE_IMAGES = ("url", *IMAGE_MIMETYPES)
+
+@app.route('/api/bundle', methods=['POST'])
+def get_bundle():
+    """
+    Everything the result page shows for one event in a single response:
+    the location is resolved and the moment computed once, then shared by
+    the panchanga, the sky map and the solar system view. "parts" picks a
+    subset (default all), and "images" is "url" (default), "png" (base64
+    data URIs) or "svg" (inline markup). With "url" the images are not
+    waited for: each part carries an "image_url" to load separately, which
+    renders in the background and is served with an ETag
+    (/api/images/<kind>/<key>). A part that fails is reported in "errors"
+    without failing the others.
+    """
+    data = request.json
+    date_str = data.get('date')
+    time_str = data.get('time')
+    location_name = data.get('location')
+    title = data.get('title', '')
+    lang = data.get('lang', 'EN')
+    parts = data.get('parts') or list(BUNDLE_PARTS)
+    images = data.get('images', 'url')
+
+    if not all([date_str, time_str, location_name]):
+        return jsonify({"success": False, "error": "Missing required fields"}), 400
+    unknown = [part for part in parts if part not in BUNDLE_PARTS]
+    if unknown:
+        return jsonify({"success": False, "error": f"Unknown parts: {', '.join(map(str, unknown))}"}), 400
+    if images not in BUNDLE_IMAGES:
+        return jsonify({"success": False, "error": f"Unsupported images: {images}"}), 400
+
+    try:
+        # 1. Resolve location and the moment, once for every part
+        loc = get_location_details(location_name)
+        local_dt, utc_dt = localize_event(date_str, time_str, loc)
+        moment = get_moment(utc_dt)
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+    result = {"success": True, "angular_data": moment.angular_data, "errors": {}}
+    for part in parts:
+        try:
+            if part == "panchanga":
+                result[part] = get_panchanga_data(loc, local_dt, utc_dt, lang)
+            elif part == "skyshot":
+                if images == 'svg':
+                    _, _, metadata, _ = skyshot_view(moment)
+                    result[part] = {"svg": skyshot_svg(moment).decode("utf-8"), **metadata}
+                    continue
+                cache_key = None
+                if SKYSHOT_KEY_RESOLUTION <= 0:
+                    cache_key = get_cache_key(date_str, time_str, loc["latitude"], loc["longitude"])
+                if images == 'url':
+                    cache_key, metadata, state, render_args = skyshot_job(moment, title, cache_key)
+                    url, cached = start_image("skyshot", cache_key, {} if state else metadata, **render_args)
+                    result[part] = {"image_url": url, "cached": cached, **metadata}
+                    continue
+                entry = SKYSHOT_CACHE.get(cache_key) if cache_key else None
+                if cache_key and entry:
+                    cached, metadata = True, entry[2]
+                else:
+                    entry, cached, metadata, _ = render_skyshot(moment, title, cache_key)
+                result[part] = {"image_data": image_data_uri(entry[0]), "cached": cached, **metadata}
+            elif part == "solar_system":
+                if images == 'svg':
+                    result[part] = {"svg": generate_solar_system_svg(utc_dt).decode("utf-8")}
+                    continue
+                cache_key = get_solar_cache_key(date_str, time_str)
+                if images == 'url':
+                    url, cached = start_image("solar_system", cache_key, **solar_system_args(utc_dt, title))
+                    result[part] = {"image_url": url, "cached": cached}
+                    continue
+                entry = SOLAR_CACHE.get(cache_key)
+                cached = entry is not None
+                if not cached:
+                    entry = render_solar_system(utc_dt, title, cache_key)
+                result[part] = {"image_data": image_data_uri(entry[0]), "cached": cached}
+        except Exception as e:
+            result["errors"][part] = str(e)
+
+    return jsonify(result)
+
 @app.route('/explore')
 def explore():
     """
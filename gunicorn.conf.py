@@ -0,0 +1,51 @@
+"""
+Gunicorn settings (gunicorn -c gunicorn.conf.py app:app).
+
+By default the app is preloaded: the master imports it and runs
+utils.warmup.warm_up() once, then forks the workers, which share the
+ephemeris, tables and zone data copy-on-write instead of loading them each.
+The master never serves requests, so it never starts the render pool, the
+job queue or the cache sweeps; they start in each worker.
+
+PANCHANGA_PRELOAD=0 imports the app in every worker instead (each worker
+warms itself after boot), e.g. to pick up code changes on a graceful reload.
+scripts/benchmark_startup.py compares the two modes.
+"""
+
+import gc
+import os
+
+bind = os.environ.get("PANCHANGA_BIND", "127.0.0.1:8000")
+workers = int(os.environ.get("PANCHANGA_WORKERS", "3"))
+timeout = int(os.environ.get("PANCHANGA_TIMEOUT", "120"))
+preload_app = os.environ.get("PANCHANGA_PRELOAD", "1") == "1"
+
+
+def when_ready(server):
+    """Master, after the preloaded app is imported and before any fork."""
+    if not preload_app:
+        return
+    from utils.warmup import warm_up
+    timings = warm_up()
+    # Keep the collector from touching (and so copying) the preloaded objects
+    gc.freeze()
+    server.log.info(f"Warmed up before fork: {timings}")
+
+
+def post_worker_init(worker):
+    """
+    Worker, after the app is loaded: start the cache sweeps, so expired files
+    are deleted even if this worker never serves a request, size its render
+    pool, and without preload, warm this worker.
+    """
+    from utils.image_cache import start_image_cache_sweeper
+    from utils.jobs import start_job_sweeper
+    from utils.render_pool import set_web_workers
+    start_image_cache_sweeper()
+    start_job_sweeper()
+    # Share the host's render processes out between the workers
+    set_web_workers(worker.cfg.workers)
+    if preload_app:
+        return
+    from utils.warmup import warm_up
+    worker.log.info(f"Warmed up worker {worker.pid}: {warm_up()}")
@@ -1,4 +1,6 @@
 from data.panchanga_data import *
+from panchanga.transitions import get_anga_spans
+from panchanga.lunar_months import get_masa
 import math
 
 def calculate_vara(local_time, sunrise_time, lang='EN'):
@@ -44,7 +46,10 @@ def calculate_karana(sun_lon, moon_lon):
     karana_index = int(diff / 6)
     return karana_index + 1
 
-def calculate_masa_name(sun_lon_at_nm, lang='EN'):
+def calculate_masa_index(sun_lon_at_nm):
+    """
+    Index (0 = Chaitra) of the lunar month whose New Moon falls at this Sun longitude.
+    """
     rasi_index = int(sun_lon_at_nm / 30)
     masa_mapping = {
         11: 0, # Meena -> Chaitra
@@ -60,12 +65,75 @@ def calculate_masa_name(sun_lon_at_nm, lang='EN'):
         9: 10, # Makara -> Magha
         10: 11 # Kumbha -> Phalguna
     }
-    return MASAS[lang][masa_mapping[rasi_index]]
+    return masa_mapping[rasi_index]
+
+def calculate_masa_name(sun_lon_at_nm, lang='EN'):
+    return MASAS[lang][calculate_masa_index(sun_lon_at_nm)]
+
+def calculate_samvatsara(year, lang='EN'):
+    samvat_index = (year - 1987) % 60
+    return SAMVATSARAS[lang][samvat_index]
 
 def calculate_masa_samvatsara(year, sun_lon_at_nm, sun_lon_now, lang='EN'):
     masa_name = calculate_masa_name(sun_lon_at_nm, lang)
-    samvat_index = (year - 1987) % 60
-    return masa_name, SAMVATSARAS[lang][samvat_index]
+    return masa_name, calculate_samvatsara(year, lang)
+
+def calculate_masa(moment):
+    """
+    (Masa index, Adhika flag) of the lunar month a utils.astronomy.Moment
+    falls in: a lookup in the lunar month table when it covers the moment,
+    else from the Sun at the preceding New Moon (Adhika then unknown, None).
+    """
+    masa = get_masa(moment.utc)
+    if masa is not None:
+        return masa
+    return calculate_masa_index(moment.sun_at_new_moon), None
+
+def calculate_angas(moment, year, lang='EN'):
+    """
+    Tithi/Paksha, Nakshatra/Pada, Yoga, Karana and Masa/Samvatsara for a
+    utils.astronomy.Moment, reading each longitude from the snapshot once.
+    year is the local (Gregorian) year of the event, for the Samvatsara.
+    "adhika" flags an Adhika Masa (None when unknown) and
+    "spans" holds the panchanga.transitions AngaSpans (when each anga began
+    and ends) if the anga index covers the moment, else None.
+    """
+    masa_index, adhika = calculate_masa(moment)
+    angas = {
+        "masa": MASAS[lang][masa_index],
+        "adhika": adhika,
+        "samvatsara": calculate_samvatsara(year, lang),
+    }
+
+    # Within the anga index, the angas and their start/end times are lookups
+    spans = get_anga_spans(moment.utc)
+    if spans is not None:
+        tithi_index = spans["tithi"].index
+        nakshatra_index = spans["nakshatra"].index
+        angas.update({
+            "tithi": TITHIS[lang][tithi_index],
+            "paksha": PAKSHAS[lang][0] if tithi_index < 15 else PAKSHAS[lang][1],
+            "nakshatra": f"{NAKSHATRAS[lang][nakshatra_index]} ({NAKSHATRA_STARS[nakshatra_index]})",
+            "nak_pada": spans["pada"].index % 4 + 1,
+            "yoga": YOGAS[lang][spans["yoga"].index],
+            "karana": spans["karana"].index + 1,
+            "spans": spans,
+        })
+        return angas
+
+    sun_lon, moon_lon = moment.sun_sidereal, moment.moon_sidereal
+    tithi, paksha = calculate_tithi(sun_lon, moon_lon, lang=lang)
+    nakshatra, nak_pada = calculate_nakshatra(moon_lon, lang=lang)
+    angas.update({
+        "tithi": tithi,
+        "paksha": paksha,
+        "nakshatra": nakshatra,
+        "nak_pada": nak_pada,
+        "yoga": calculate_yoga(sun_lon, moon_lon, lang=lang),
+        "karana": calculate_karana(sun_lon, moon_lon),
+        "spans": None,
+    })
+    return angas
 
 def calculate_saka_year(date_obj):
     """
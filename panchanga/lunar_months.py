@@ -0,0 +1,114 @@
+"""
+Prebuilt table of amanta lunar months (built by scripts/build_masa_table.py):
+every month's New Moon to New Moon span, its Masa and whether it is Adhika.
+
+A month takes its Masa from the Sun's rashi at the opening New Moon
+(calculate_masa_index), and is Adhika when the Sun enters no rashi (no
+Sankranti) before the closing one; the Adhika month and the Nija month after
+it share the Masa. Resolving the Masa of an instant is a binary search.
+"""
+
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+import pytz
+
+from utils.astronomy import ts
+
+MASA_TABLE_PATH = Path(__file__).resolve().parent.parent / "data" / "lunar_months.npy"
+MASA_TABLE_VERSION = 1
+
+# index counts from 0 (Chaitra); start/end are the UTC New Moons bounding it
+LunarMonth = namedtuple("LunarMonth", "index adhika start end")
+
+class MasaTable:
+    """
+    The memory-mapped month table. The file is a flat float64 .npy array:
+    (version, month count n), then the n + 1 New Moons bounding the months
+    in TT, the n Masa indices and the n Adhika flags.
+    """
+
+    def __init__(self, path):
+        data = np.load(path, mmap_mode='r')
+        if int(data[0]) != MASA_TABLE_VERSION:
+            raise ValueError(f"version {int(data[0])}, expected {MASA_TABLE_VERSION}")
+        count = int(data[1])
+        self.bounds_tt = data[2:count + 3]
+        self.masas = data[count + 3:2 * count + 3]
+        self.adhika = data[2 * count + 3:3 * count + 3]
+
+    def covers(self, tt):
+        return self.bounds_tt[0] <= tt < self.bounds_tt[-1]
+
+    def month(self, tt):
+        """Position of the month containing a TT instant."""
+        return int(np.searchsorted(self.bounds_tt, tt, side='right')) - 1
+
+    def months(self, start_tt, end_tt):
+        """Positions of the months overlapping [start_tt, end_tt]."""
+        return range(self.month(start_tt), self.month(end_tt) + 1)
+
+MASA_TABLE = None
+
+def _load_masa_table():
+    """
+    Loads the month table. Callers fall back to the Sun at the preceding New
+    Moon if the file is missing or was built for a different table version.
+    """
+    global MASA_TABLE
+    MASA_TABLE = None
+    if not MASA_TABLE_PATH.exists():
+        return
+    try:
+        MASA_TABLE = MasaTable(MASA_TABLE_PATH)
+    except Exception as e:
+        print(f"WARNING: Could not load lunar month table: {e}")
+
+_load_masa_table()
+
+def _lunar_months(positions):
+    table = MASA_TABLE
+    bounds = ts.tt_jd(np.asarray(table.bounds_tt[positions.start:positions.stop + 1])).astimezone(pytz.utc)
+    return [
+        LunarMonth(int(table.masas[p]), bool(table.adhika[p]), bounds[i], bounds[i + 1])
+        for i, p in enumerate(positions)
+    ]
+
+def get_masa(dt):
+    """
+    (Masa index, Adhika flag) of the lunar month containing a timezone-aware
+    datetime, or None when the table is not available for that instant.
+    """
+    if MASA_TABLE is None:
+        return None
+    tt = ts.from_datetime(dt).tt
+    if not MASA_TABLE.covers(tt):
+        return None
+    position = MASA_TABLE.month(tt)
+    return int(MASA_TABLE.masas[position]), bool(MASA_TABLE.adhika[position])
+
+def get_lunar_month(dt):
+    """
+    The lunar month containing a timezone-aware datetime, as a LunarMonth, or
+    None when the table is not available for that instant.
+    """
+    if MASA_TABLE is None:
+        return None
+    tt = ts.from_datetime(dt).tt
+    if not MASA_TABLE.covers(tt):
+        return None
+    position = MASA_TABLE.month(tt)
+    return _lunar_months(range(position, position + 1))[0]
+
+def get_lunar_months(start_dt, end_dt):
+    """
+    The lunar months overlapping [start_dt, end_dt], in order, as LunarMonths.
+    Returns None when the table does not cover the range.
+    """
+    if MASA_TABLE is None:
+        return None
+    start_tt, end_tt = ts.from_datetimes([start_dt, end_dt]).tt
+    if not (MASA_TABLE.covers(start_tt) and MASA_TABLE.covers(end_tt)):
+        return None
+    return _lunar_months(MASA_TABLE.months(start_tt, end_tt))
@@ -1,96 +1,428 @@
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, date
+from functools import cached_property
+from itertools import islice
+import base64
+import hashlib
+import json
+import os
 import pytz
-from utils.astronomy import get_sidereal_longitude, get_sunrise_sunset, sun, moon, get_previous_new_moon
+from utils.astronomy import (
+    get_sidereal_longitudes, get_sunrise_sunset, get_new_moons_between, get_moment, Moment,
+    EPHEMERIS_END_UTC
+)
 from panchanga.calculations import (
-    calculate_tithi, calculate_masa_samvatsara, calculate_vara, 
+    calculate_tithi, calculate_masa, calculate_masa_name, calculate_samvatsara, calculate_vara,
     calculate_nakshatra, calculate_yoga, calculate_karana, format_panchanga_report
 )
+from panchanga.lunar_months import get_lunar_months
+from panchanga.transitions import find_anga_spans
+from data.panchanga_data import MASAS
+from utils.cache import LRUCache
+
+# Each year is searched in a 65-day window starting 32 days before the Gregorian anniversary
+WINDOW_LEAD_DAYS = 32
+WINDOW_DAYS = 65
+
+# Without the anga index, linear interpolation between New Moons places a Tithi
+# boundary within ~0.9 day of the true instant, so candidate days are taken
+# with a safety margin around it.
+TITHI_MARGIN_DAYS = 1.5
+
+ENGINES = ("lunation", "scan")
+
+# Years handed to the lunation engine at once when the caller does not know
+# how many occurrences it will consume
+DEFAULT_BLOCK_YEARS = 10
+
+CURSOR_VERSION = 1
 
-def find_recurrences(base_dt, loc_details, num_entries=20, lang='EN'):
+# Shared recurrence cache: many users ask for the same (Masa, Paksha, Tithi) in the same few cities
+RECURRENCE_CACHE_BYTES = int(os.environ.get("PANCHANGA_RECURRENCE_CACHE_BYTES", 16 * 1024 * 1024))
+# Coordinates are rounded to ~1 km before keying; only sunrise/sunset depend on them
+RECURRENCE_CACHE_COORD_DECIMALS = 2
+# Rough per-occurrence footprint (two datetimes, floats and the sunrise/sunset memo)
+OCCURRENCE_BYTES = 1024
+
+RECURRENCE_CACHE = LRUCache("recurrences", max_bytes=RECURRENCE_CACHE_BYTES)
+
+def _target_attributes(base_dt):
     """
-    Finds the next num_entries occurrences of the same Masa, Paksha, and Tithi.
-    Starts search from the current date.
+    Sun and Moon longitudes of the original event and the index of its Masa,
+    from the shared snapshot of that instant (already computed when
+    /api/panchanga asks for it).
+    """
+    moment = get_moment(base_dt)
+    masa_index, _ = calculate_masa(moment)
+    return moment.sun_sidereal, moment.moon_sidereal, masa_index
+
+def _get_target(base_dt, lang):
     """
-    # 1. Get target attributes from the original date
-    utc_dt = base_dt.astimezone(pytz.utc)
-    sun_lon = get_sidereal_longitude(utc_dt, sun)
-    moon_lon = get_sidereal_longitude(utc_dt, moon)
-    
+    Returns the (Masa, Paksha, Tithi) of the original event.
+    """
+    sun_lon, moon_lon, masa_index = _target_attributes(base_dt)
+
     target_tithi, target_paksha = calculate_tithi(sun_lon, moon_lon, lang=lang)
-    
-    # Target Masa must be determined at the New Moon preceding the original event
-    prev_nm_utc = get_previous_new_moon(utc_dt)
-    sun_lon_at_nm = get_sidereal_longitude(prev_nm_utc, sun)
-    target_masa, _ = calculate_masa_samvatsara(base_dt.year, sun_lon_at_nm, sun_lon, lang=lang)
-    
+    target_masa = MASAS[lang][masa_index]
+
+    tithi_index = int(((moon_lon - sun_lon) % 360) / 12)
+    return target_masa, target_paksha, target_tithi, tithi_index
+
+def _search_window(base_dt, year):
+    """
+    Returns the naive local datetimes (at the event's local time) of one year's
+    search window.
+    """
+    # Approximate date: same month/day
+    try:
+        approx_date = datetime(year, base_dt.month, base_dt.day, base_dt.hour, base_dt.minute)
+    except ValueError:
+        approx_date = datetime(year, base_dt.month, 28, base_dt.hour, base_dt.minute)
+    start_search = approx_date - timedelta(days=WINDOW_LEAD_DAYS)
+
+    return [start_search + timedelta(days=d_offset) for d_offset in range(WINDOW_DAYS)]
+
+def _localize(days, tz, now):
+    """
+    Localizes window days, skipping dates that are already in the past.
+    """
+    localized = []
+    for current_day in days:
+        dt_local = tz.localize(datetime(current_day.year, current_day.month, current_day.day, current_day.hour, current_day.minute))
+        dt_utc = dt_local.astimezone(pytz.utc)
+        if dt_utc >= now:
+            localized.append((dt_local, dt_utc))
+    return localized
+
+def _scan_year(days, tz, now, target, lang):
+    """
+    Reference engine: evaluates Tithi for every day of the window and resolves
+    the Masa for each Tithi match.
+    """
+    target_masa, target_paksha, target_tithi, _ = target
+    window = _localize(days, tz, now)
+    if not window:
+        return []
+
+    # Sun/Moon longitudes for every candidate day in one vectorized pass
+    sun_lons, moon_lons = get_sidereal_longitudes([dt_utc for _, dt_utc in window])
+
+    matches = []
+    for (dt_local, dt_utc), s_lon, m_lon in zip(window, sun_lons, moon_lons):
+        tithi, paksha = calculate_tithi(s_lon, m_lon, lang=lang)
+        # Masa needs a New Moon search, so only resolve it for Tithi matches
+        if tithi != target_tithi or paksha != target_paksha:
+            continue
+
+        masa_index, _ = calculate_masa(Moment(dt_utc))
+        if MASAS[lang][masa_index] == target_masa:
+            matches.append((dt_local, s_lon, m_lon))
+    return matches
+
+def _indexed_tithi_spans(months, tithi_index):
+    """
+    Exact (start, end) UTC of the Tithi in each (New Moon, next New Moon)
+    lunar month, from the anga index; None when the index does not cover them.
+    """
+    # Tithi 0 begins at the New Moon; the slack only absorbs rounding between
+    # the New Moon table and the index
+    slack = timedelta(hours=1)
+    spans = find_anga_spans("tithi", tithi_index, [(nm_start - slack, nm_end - slack) for nm_start, nm_end in months])
+    if spans is None or None in spans:
+        return None
+    return spans
+
+def _lunation_years(windows, tz, now, target, lang):
+    """
+    Lunation engine: steps through the lunar months overlapping a block of yearly
+    windows, keeps those whose Masa matches, looks up (or predicts) when the
+    target Tithi prevails inside them and evaluates only the days around it.
+    Months come from the lunar month table, or from the New Moon table and the
+    Sun at each New Moon without it. Returns one list of matches per window,
+    or None when neither covers the block.
+    """
+    target_masa, target_paksha, target_tithi, tithi_index = target
+    bounds = _localize([windows[0][0], windows[-1][-1]], tz, datetime.min.replace(tzinfo=pytz.utc))
+    lunar_months = get_lunar_months(bounds[0][1], bounds[-1][1])
+    if lunar_months is not None:
+        months = [(month.start, month.end) for month in lunar_months if MASAS[lang][month.index] == target_masa]
+    else:
+        new_moons = get_new_moons_between(bounds[0][1], bounds[-1][1])
+        if new_moons is None:
+            return None
+
+        # Masa of each lunar month is fixed by the Sun's rashi at its opening New Moon
+        sun_at_nm, _ = get_sidereal_longitudes(new_moons[:-1])
+        months = [
+            (nm_start, nm_end) for nm_start, nm_end, s_lon_at_nm in zip(new_moons, new_moons[1:], sun_at_nm)
+            if calculate_masa_name(s_lon_at_nm, lang) == target_masa
+        ]
+    # With the anga index the Tithi's exact span is known, without it predicted
+    spans = _indexed_tithi_spans(months, tithi_index) or [None] * len(months)
+
+    candidates = []
+    for (nm_start, nm_end), span in zip(months, spans):
+        if span is not None:
+            tithi_start, tithi_end = span
+        else:
+            # Tithi i spans elongations [12i, 12i + 12) out of the month's 360
+            lunation = nm_end - nm_start
+            tithi_start = max(nm_start, nm_start + lunation * (tithi_index / 30.0) - timedelta(days=TITHI_MARGIN_DAYS))
+            tithi_end = min(nm_end, nm_start + lunation * ((tithi_index + 1) / 30.0) + timedelta(days=TITHI_MARGIN_DAYS))
+
+        # Only localize the window days that can fall inside the predicted span
+        first_day = tithi_start.astimezone(tz).date() - timedelta(days=1)
+        last_day = tithi_end.astimezone(tz).date() + timedelta(days=1)
+        for i, days in enumerate(windows):
+            nearby = [day for day in days if first_day <= day.date() <= last_day]
+            candidates.extend(
+                (i, dt_local, dt_utc) for dt_local, dt_utc in _localize(nearby, tz, now)
+                if tithi_start <= dt_utc < tithi_end
+            )
+
+    matches = [[] for _ in windows]
+    if not candidates:
+        return matches
+
+    # One vectorized pass for the candidate days of every window in the block
+    sun_lons, moon_lons = get_sidereal_longitudes([dt_utc for _, _, dt_utc in candidates])
+    for (i, dt_local, _), s_lon, m_lon in zip(candidates, sun_lons, moon_lons):
+        tithi, paksha = calculate_tithi(s_lon, m_lon, lang=lang)
+        if tithi == target_tithi and paksha == target_paksha:
+            matches[i].append((dt_local, s_lon, m_lon))
+    return [sorted(year_matches, key=lambda match: match[0]) for year_matches in matches]
+
+def _match_windows(windows, tz, now, target, lang, engine):
+    """
+    Runs the selected engine over a block of yearly windows. The lunation engine
+    retries year by year when the block runs past the New Moon table, and any
+    year it cannot cover is handled by the scanner.
+    """
+    if engine == "lunation":
+        matches = _lunation_years(windows, tz, now, target, lang)
+        if matches is not None:
+            return matches
+        if len(windows) > 1:
+            return [year_matches for days in windows for year_matches in _match_windows([days], tz, now, target, lang, engine)]
+    return [_scan_year(days, tz, now, target, lang) for days in windows]
+
+class Occurrence:
+    """
+    One recurrence of the target Masa, Paksha and Tithi.
+    Only the date is known up front; sunrise, Nakshatra and the formatted report
+    are computed on first access. Supports occurrence["datetime"] / ["report"]
+    so it can be used wherever the old result dicts were.
+    """
+
+    def __init__(self, dt_local, sun_lon, moon_lon, loc_details, lang, cursor, year=None, astro=None):
+        self.datetime = dt_local
+        self.sun_lon = sun_lon
+        self.moon_lon = moon_lon
+        self.loc_details = loc_details
+        self.lang = lang
+        self.cursor = cursor
+        # Search year the occurrence was found in, and language-independent
+        # results (sunrise/sunset, Masa) shared through the cache
+        self.year = year
+        self.astro = {} if astro is None else astro
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    @cached_property
+    def tithi_paksha(self):
+        return calculate_tithi(self.sun_lon, self.moon_lon, lang=self.lang)
+
+    @cached_property
+    def masa_samvatsara(self):
+        if "masa_index" not in self.astro:
+            self.astro["masa_index"], _ = calculate_masa(Moment(self.datetime))
+        return MASAS[self.lang][self.astro["masa_index"]], calculate_samvatsara(self.datetime.year, lang=self.lang)
+
+    @cached_property
+    def sunrise_sunset(self):
+        if "sunrise_sunset" not in self.astro:
+            loc = self.loc_details
+            self.astro["sunrise_sunset"] = get_sunrise_sunset(self.datetime, loc["latitude"], loc["longitude"], loc["timezone"])
+        return self.astro["sunrise_sunset"]
+
+    @cached_property
+    def nakshatra(self):
+        return calculate_nakshatra(self.moon_lon, lang=self.lang)
+
+    @cached_property
+    def report(self):
+        tithi, paksha = self.tithi_paksha
+        masa, samvatsara = self.masa_samvatsara
+        sunrise, sunset = self.sunrise_sunset
+        nakshatra, nak_pada = self.nakshatra
+        vara = calculate_vara(self.datetime, sunrise, lang=self.lang)
+        yoga = calculate_yoga(self.sun_lon, self.moon_lon, lang=self.lang)
+        karana = calculate_karana(self.sun_lon, self.moon_lon)
+
+        return format_panchanga_report(
+            self.datetime, self.loc_details["address"], self.loc_details["timezone"],
+            sunrise, sunset, samvatsara, masa, paksha, tithi,
+            vara, nakshatra, nak_pada, yoga, karana, lang=self.lang
+        )
+
+def _cursor_key(base_dt, loc_details, engine):
+    """
+    Short fingerprint of the search, so a cursor cannot resume a different one.
+    """
+    data = f"{base_dt.isoformat()}-{loc_details['latitude']:.4f}-{loc_details['longitude']:.4f}-{loc_details['timezone']}-{engine}"
+    return hashlib.md5(data.encode()).hexdigest()[:12]
+
+def encode_cursor(key, year, last_date):
+    payload = json.dumps({"v": CURSOR_VERSION, "k": key, "y": year, "d": last_date.isoformat()}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor, key):
+    """
+    Returns (year, last_date) from an opaque cursor, or raises ValueError.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["v"] != CURSOR_VERSION or payload["k"] != key:
+            raise ValueError
+        return int(payload["y"]), date.fromisoformat(payload["d"])
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid or expired cursor")
+
+def check_cursor(cursor, base_dt, loc_details, engine='lunation'):
+    """
+    Raises ValueError unless cursor came from this search, so bad input can
+    be rejected before the search starts.
+    """
+    if not isinstance(cursor, str):
+        raise ValueError("Invalid or expired cursor")
+    decode_cursor(cursor, _cursor_key(base_dt, loc_details, engine))
+
+def _last_searchable_year(base_dt):
+    """
+    Latest year whose whole search window lies inside the ephemeris.
+    """
+    year = EPHEMERIS_END_UTC.year
+    while _search_window(base_dt, year)[-1] + timedelta(days=1) >= EPHEMERIS_END_UTC.replace(tzinfo=None):
+        year -= 1
+    return year
+
+def iter_recurrences(base_dt, loc_details, lang='EN', engine='lunation', cursor=None, start=None,
+                     last_year=None, block_years=DEFAULT_BLOCK_YEARS, progress=None):
+    """
+    Lazily yields upcoming occurrences of the same Masa, Paksha, and Tithi as
+    Occurrence objects, in chronological order.
+
+    cursor: an Occurrence.cursor from an earlier page; resumes right after it.
+    start: aware datetime; only occurrences at or after it (and after now) are yielded.
+    last_year: last search year (defaults to the end of the ephemeris).
+    progress: optional callback progress(message, fraction), called as each
+    search year starts (e.g. to report on a background job).
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown recurrence engine: {engine}")
+
+    target = _get_target(base_dt, lang)
+    return _iter_matches(base_dt, loc_details, target, lang, engine, cursor, start, last_year, block_years, progress)
+
+def _iter_matches(base_dt, loc_details, target, lang, engine, cursor, start, last_year, block_years, progress=None):
+    tz = pytz.timezone(loc_details["timezone"])
+    key = _cursor_key(base_dt, loc_details, engine)
+
     now = datetime.now(pytz.utc)
-    current_year = now.year
-    
-    # Starting search from current year
-    print(f"Searching for: {target_masa}, {target_paksha}, {target_tithi} for next {num_entries} matches...")
-    
-    results = []
-    year_to_search = current_year
-    
-    # 2. Search year by year until we have num_entries
-    while len(results) < num_entries:
-        # Approximate date: same month/day
-        try:
-            approx_date = datetime(year_to_search, base_dt.month, base_dt.day, base_dt.hour, base_dt.minute)
-        except ValueError:
-            approx_date = datetime(year_to_search, base_dt.month, 28, base_dt.hour, base_dt.minute)
-            
-        tz = pytz.timezone(loc_details["timezone"])
-        # Window of search (+/- 30 days around approx date)
-        start_search = approx_date - timedelta(days=32)
-        
-        for d_offset in range(65):
-            current_day = start_search + timedelta(days=d_offset)
-            dt_local = tz.localize(datetime(current_day.year, current_day.month, current_day.day, base_dt.hour, base_dt.minute))
-            dt_utc = dt_local.astimezone(pytz.utc)
-            
-            # Skip past dates
-            if dt_utc < now:
+    threshold = now
+    year = now.year
+    last_date = None
+    if start is not None:
+        threshold = max(now, start.astimezone(pytz.utc))
+        # The previous year's window can reach into the start year
+        year = max(now.year, start.year - 1)
+    if cursor is not None:
+        year, last_date = decode_cursor(cursor, key)
+
+    if last_year is None:
+        last_year = _last_searchable_year(base_dt)
+
+    pending = []
+    first_year = year
+    while year <= last_year:
+        if progress is not None:
+            progress(f"year {year} of {last_year}", (year - first_year) / (last_year - first_year + 1))
+        if not pending:
+            block = 1 if engine == "scan" else min(block_years, last_year - year + 1)
+            windows = [_search_window(base_dt, y) for y in range(year, year + block)]
+            pending = _match_windows(windows, tz, threshold, target, lang, engine)
+
+        for dt_local, s_lon, m_lon in pending.pop(0):
+            # Basic protection against double-counting the same day (and resuming past a cursor)
+            if last_date is not None and dt_local.date() <= last_date:
                 continue
-                
-            s_lon = get_sidereal_longitude(dt_utc, sun)
-            m_lon = get_sidereal_longitude(dt_utc, moon)
-            
-            tithi, paksha = calculate_tithi(s_lon, m_lon, lang=lang)
-            curr_nm_utc = get_previous_new_moon(dt_utc)
-            s_lon_at_nm = get_sidereal_longitude(curr_nm_utc, sun)
-            masa, samvatsara = calculate_masa_samvatsara(dt_local.year, s_lon_at_nm, s_lon, lang=lang)
-            
-            if tithi == target_tithi and paksha == target_paksha and masa == target_masa:
-                # Basic protection against double-counting the same day
-                if results and results[-1]["datetime"].date() == dt_local.date():
-                    continue
-
-                sunrise, sunset = get_sunrise_sunset(dt_local, loc_details["latitude"], loc_details["longitude"], loc_details["timezone"])
-                vara = calculate_vara(dt_local, sunrise, lang=lang)
-                nakshatra, nak_pada = calculate_nakshatra(m_lon, lang=lang)
-                yoga = calculate_yoga(s_lon, m_lon, lang=lang)
-                karana = calculate_karana(s_lon, m_lon)
-                
-                report = format_panchanga_report(
-                    dt_local, loc_details["address"], loc_details["timezone"],
-                    sunrise, sunset, samvatsara, masa, paksha, tithi,
-                    vara, nakshatra, nak_pada, yoga, karana, lang=lang
-                )
-                
-                results.append({
-                    "datetime": dt_local,
-                    "report": report
-                })
-                
-                if len(results) >= num_entries:
-                    break
-        
-        year_to_search += 1
-        # Safety break to prevent infinite loops if something is wrong with calculations
-        if year_to_search > current_year + (num_entries * 2):
-            break
-            
-    return results
-                
-    return results
+            last_date = dt_local.date()
+            yield Occurrence(dt_local, s_lon, m_lon, loc_details, lang, encode_cursor(key, year, last_date), year=year)
+
+        year += 1
+
+def _recurrence_cache_key(base_dt, loc_details, now, engine):
+    """
+    Language-independent key: the target lunar attributes plus everything else
+    the search depends on (timezone, rounded coordinates, the event's local time,
+    its Gregorian anniversary, which anchors the yearly windows, start year and
+    engine, so the reference scanner is never answered from lunation results).
+    """
+    sun_lon, moon_lon, masa_index = _target_attributes(base_dt)
+    tithi_index = int(((moon_lon - sun_lon) % 360) / 12)
+    return (
+        masa_index, tithi_index,
+        loc_details["timezone"],
+        round(loc_details["latitude"], RECURRENCE_CACHE_COORD_DECIMALS),
+        round(loc_details["longitude"], RECURRENCE_CACHE_COORD_DECIMALS),
+        base_dt.hour, base_dt.minute, base_dt.month, base_dt.day,
+        now.year, engine
+    )
+
+def find_recurrences(base_dt, loc_details, num_entries=20, lang='EN', engine='lunation', progress=None):
+    """
+    Finds the next num_entries occurrences of the same Masa, Paksha, and Tithi.
+    Starts search from the current date.
+
+    engine='lunation' (default) steps through lunar months using the lunar month table;
+    engine='scan' is the original day-by-day scanner, kept as the reference mode.
+    Both return the same results.
+
+    Results are shared across users through RECURRENCE_CACHE, so a repeated target
+    is served (report included) without any ephemeris work. progress is passed
+    on to the search (see iter_recurrences).
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown recurrence engine: {engine}")
+
+    now = datetime.now(pytz.utc)
+    # Safety bound to prevent endless searches if something is wrong with calculations
+    last_year = min(now.year + (num_entries * 2), _last_searchable_year(base_dt))
+
+    cache_key = _recurrence_cache_key(base_dt, loc_details, now, engine)
+    cached = RECURRENCE_CACHE.get(cache_key)
+    if cached is not None:
+        matches, searched_to = cached
+        # Entries live for the rest of the year: drop the occurrences that have
+        # passed since they were cached, and search again if too few remain
+        matches = [match for match in matches if match[0].astimezone(pytz.utc) >= now]
+        if len(matches) < num_entries and searched_to < last_year:
+            cached = None
+
+    if cached is None:
+        # 1. Get target attributes from the original date
+        target = _get_target(base_dt, lang)
+        target_masa, target_paksha, target_tithi, _ = target
+        print(f"Searching for: {target_masa}, {target_paksha}, {target_tithi} for next {num_entries} matches...")
+
+        # 2. Search year by year
+        occurrences = _iter_matches(base_dt, loc_details, target, lang, engine, None, None, last_year, num_entries + 1, progress)
+        matches = [(o.datetime, o.sun_lon, o.moon_lon, o.year, o.astro) for o in islice(occurrences, num_entries)]
+        RECURRENCE_CACHE.put(cache_key, (matches, last_year), size=OCCURRENCE_BYTES * (len(matches) + 1))
+
+    key = _cursor_key(base_dt, loc_details, engine)
+    return [
+        Occurrence(dt_local, s_lon, m_lon, loc_details, lang, encode_cursor(key, year, dt_local.date()), year=year, astro=astro)
+        for dt_local, s_lon, m_lon, year, astro in matches[:num_entries]
+    ]
@@ -0,0 +1,200 @@
+"""
+Prebuilt index of anga boundaries: the instant every Tithi, Karana,
+Nakshatra (and Pada) and Yoga begins (built by scripts/build_anga_index.py).
+
+Only the finest divisions are stored: Karanas (half Tithis, 60 per lunar
+month), Padas (quarter Nakshatras, 108 per sidereal turn of the Moon) and
+Yogas. A Tithi is two consecutive Karanas and a Nakshatra four consecutive
+Padas, so their spans come from the same arrays. Every quantity increases
+monotonically, so the division beginning at the i-th boundary of a series
+is (first + i) % cycle and lookups are binary searches.
+"""
+
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+import pytz
+
+from utils.astronomy import ts
+
+ANGA_INDEX_PATH = Path(__file__).resolve().parent.parent / "data" / "anga_transitions.npy"
+ANGA_INDEX_VERSION = 1
+
+# Stored series: name -> (divisions per 360 degrees, quantity)
+SERIES = {
+    "karana": (60, "elongation"),   # Moon - Sun
+    "pada": (108, "moon"),          # sidereal Moon
+    "yoga": (27, "sum"),            # sidereal Sun + Moon
+}
+# Anga -> (series, divisions of the series per anga)
+ANGAS = {
+    "tithi": ("karana", 2),
+    "karana": ("karana", 1),
+    "nakshatra": ("pada", 4),
+    "pada": ("pada", 1),
+    "yoga": ("yoga", 1),
+}
+
+# index counts from 0 (Tithi 0 = Shukla Pratipada, Nakshatra 0 = Ashwini);
+# start/end are UTC datetimes, None past the edges of the index
+AngaSpan = namedtuple("AngaSpan", "index start end")
+
+class AngaIndex:
+    """
+    The memory-mapped boundary series. The file is a flat float64 .npy array:
+    a header (version, then coverage start/end in TT) followed, for each
+    series in SERIES order, by (count, index of the first division) and its
+    boundary instants in TT, ascending.
+    """
+
+    def __init__(self, path):
+        data = np.load(path, mmap_mode='r')
+        if int(data[0]) != ANGA_INDEX_VERSION:
+            raise ValueError(f"version {int(data[0])}, expected {ANGA_INDEX_VERSION}")
+        self.coverage_tt = (float(data[1]), float(data[2]))
+        self.series = {}
+        offset = 3
+        for name in SERIES:
+            count, first = int(data[offset]), int(data[offset + 1])
+            self.series[name] = (data[offset + 2:offset + 2 + count], first)
+            offset += 2 + count
+
+    def covers(self, tt):
+        return self.coverage_tt[0] <= tt < self.coverage_tt[1]
+
+    def _division(self, name, position):
+        _, first = self.series[name]
+        return (first + position) % SERIES[name][0]
+
+    def span(self, anga, tt):
+        """(index, start TT, end TT) of the anga prevailing at a TT instant."""
+        name, group = ANGAS[anga]
+        times, _ = self.series[name]
+        position = int(np.searchsorted(times, tt, side='right')) - 1
+        division = self._division(name, position)
+        start = position - division % group
+        end = start + group
+        return (
+            division // group,
+            float(times[start]) if start >= 0 else None,
+            float(times[end]) if end < len(times) else None,
+        )
+
+    def starts(self, anga, start_tt, end_tt):
+        """(start TTs, indices) of every anga beginning in [start_tt, end_tt)."""
+        name, group = ANGAS[anga]
+        times, _ = self.series[name]
+        lo, hi = np.searchsorted(times, [start_tt, end_tt])
+        positions = np.arange(lo, hi)
+        divisions = self._division(name, positions)
+        keep = divisions % group == 0
+        return np.asarray(times[positions[keep]]), divisions[keep] // group
+
+    def find(self, anga, index, start_tt, end_tt):
+        """
+        (start TTs, end TTs) of the first anga of this index beginning in each
+        [start_tt, end_tt) range; NaN where a range has none.
+        """
+        name, group = ANGAS[anga]
+        cycle = SERIES[name][0]
+        times, _ = self.series[name]
+        lo = np.searchsorted(times, start_tt)
+        hi = np.searchsorted(times, end_tt)
+        # Divisions repeat every cycle boundaries, so the wanted one is a fixed
+        # distance from the first boundary of the range
+        position = lo + (index * group - self._division(name, lo)) % cycle
+        found = (position < hi) & (position + group < len(times))
+        position = np.where(found, position, 0)
+        starts = np.where(found, times[position], np.nan)
+        ends = np.where(found, times[np.minimum(position + group, len(times) - 1)], np.nan)
+        return starts, ends
+
+ANGA_INDEX = None
+
+def _load_anga_index():
+    """
+    Loads the anga index. Callers fall back to live longitudes if the file is
+    missing or was built for a different index version.
+    """
+    global ANGA_INDEX
+    ANGA_INDEX = None
+    if not ANGA_INDEX_PATH.exists():
+        return
+    try:
+        ANGA_INDEX = AngaIndex(ANGA_INDEX_PATH)
+    except Exception as e:
+        print(f"WARNING: Could not load anga index: {e}")
+
+_load_anga_index()
+
+def _utc(tt):
+    return None if tt is None else ts.tt_jd(tt).astimezone(pytz.utc)
+
+def get_anga_span(anga, dt):
+    """
+    The Tithi, Karana, Nakshatra, Pada or Yoga prevailing at a timezone-aware
+    datetime, with when it began and ends, as an AngaSpan. Returns None when
+    the index is not available for that instant.
+    """
+    if ANGA_INDEX is None:
+        return None
+    tt = ts.from_datetime(dt).tt
+    if not ANGA_INDEX.covers(tt):
+        return None
+    index, start, end = ANGA_INDEX.span(anga, tt)
+    return AngaSpan(index, _utc(start), _utc(end))
+
+def get_anga_spans(dt, angas=tuple(ANGAS)):
+    """
+    AngaSpans of several angas at one instant, as a dict keyed by anga, or
+    None when the index is not available for that instant.
+    """
+    if ANGA_INDEX is None:
+        return None
+    tt = ts.from_datetime(dt).tt
+    if not ANGA_INDEX.covers(tt):
+        return None
+    spans = {}
+    for anga in angas:
+        index, start, end = ANGA_INDEX.span(anga, tt)
+        spans[anga] = AngaSpan(index, _utc(start), _utc(end))
+    return spans
+
+def get_anga_starts(anga, start_dt, end_dt):
+    """
+    Every anga of one kind beginning between two timezone-aware datetimes,
+    as a list of (start UTC datetime, index). Returns None when the index
+    does not cover the range.
+    """
+    if ANGA_INDEX is None:
+        return None
+    start_tt, end_tt = ts.from_datetime(start_dt).tt, ts.from_datetime(end_dt).tt
+    if not (ANGA_INDEX.covers(start_tt) and ANGA_INDEX.covers(end_tt)):
+        return None
+    times, indices = ANGA_INDEX.starts(anga, start_tt, end_tt)
+    if not len(times):
+        return []
+    return list(zip(ts.tt_jd(times).astimezone(pytz.utc), indices.tolist()))
+
+def find_anga_spans(anga, index, ranges):
+    """
+    For each (start, end) pair of timezone-aware datetimes, the (start, end)
+    UTC datetimes of the first anga with this index beginning in it (e.g.
+    the Ekadashi of each of several lunar months), or None where there is
+    none. Returns None when the index does not cover every range.
+    """
+    if ANGA_INDEX is None or not ranges:
+        return None
+    bounds_tt = ts.from_datetimes([dt for bounds in ranges for dt in bounds]).tt.reshape(-1, 2)
+    if not (ANGA_INDEX.covers(bounds_tt.min()) and ANGA_INDEX.covers(bounds_tt.max())):
+        return None
+    starts, ends = ANGA_INDEX.find(anga, index, bounds_tt[:, 0], bounds_tt[:, 1])
+    found = ~np.isnan(starts)
+    spans = [None] * len(ranges)
+    if found.any():
+        utc = ts.tt_jd(np.concatenate([starts[found], ends[found]])).astimezone(pytz.utc)
+        count = int(found.sum())
+        for i, start, end in zip(np.flatnonzero(found), utc[:count], utc[count:]):
+            spans[i] = (start, end)
+    return spans
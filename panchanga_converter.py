@@ -2,12 +2,8 @@ import argparse
 from datetime import datetime
 import pytz
 from utils.location import get_location_details
-from utils.astronomy import get_sidereal_longitude, get_sunrise_sunset, sun, moon
-from panchanga.calculations import (
-    calculate_vara, calculate_tithi, calculate_nakshatra, 
-    calculate_yoga, calculate_karana, calculate_masa_samvatsara,
-    calculate_saka_year
-)
+from utils.astronomy import get_moment, get_sunrise_sunset
+from panchanga.calculations import calculate_vara, calculate_angas, calculate_saka_year
 
 def main():
     parser = argparse.ArgumentParser(description="Gregorian to Hindu Panchanga Converter")
@@ -33,18 +29,18 @@ def main():
 
         # 3. Get Astronomical Data
         print("\nCalculating astronomical positions...")
-        sun_lon = get_sidereal_longitude(utc_dt, sun)
-        moon_lon = get_sidereal_longitude(utc_dt, moon)
+        moment = get_moment(utc_dt)
         
         sunrise, sunset = get_sunrise_sunset(local_dt, loc["latitude"], loc["longitude"], loc["timezone"])
         
         # 4. Calculate Panchanga Elements
         vara = calculate_vara(local_dt, sunrise)
-        tithi, paksha = calculate_tithi(sun_lon, moon_lon)
-        nakshatra = calculate_nakshatra(moon_lon)
-        yoga = calculate_yoga(sun_lon, moon_lon)
-        karana_num = calculate_karana(sun_lon, moon_lon)
-        masa, samvatsara = calculate_masa_samvatsara(local_dt.year, sun_lon)
+        angas = calculate_angas(moment, local_dt.year)
+        tithi, paksha = angas["tithi"], angas["paksha"]
+        nakshatra = f"{angas['nakshatra']} (Pada {angas['nak_pada']})"
+        yoga = angas["yoga"]
+        karana_num = angas["karana"]
+        masa, samvatsara = angas["masa"], angas["samvatsara"]
 
         # 5. Display Results
         print("\n" + "="*40)
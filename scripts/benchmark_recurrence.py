@@ -0,0 +1,57 @@
+"""
+Benchmark: lunation-stepping vs. day-by-day scan recurrence engines.
+
+Run from the project root (where de421.bsp lives):
+    python3 scripts/benchmark_recurrence.py
+    python3 scripts/benchmark_recurrence.py --entries 10 20 --date 1985-08-14 --time 06:30
+
+Reports wall time for each engine and checks that both return the same occurrences.
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pytz
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from panchanga.recurrence import find_recurrences
+
+LOCATION = {
+    "address": "Bengaluru, Karnataka, India",
+    "latitude": 12.9716,
+    "longitude": 77.5946,
+    "timezone": "Asia/Kolkata",
+}
+
+
+def run(engine, base_dt, entries):
+    t0 = time.perf_counter()
+    occurrences = find_recurrences(base_dt, LOCATION, num_entries=entries, engine=engine)
+    return time.perf_counter() - t0, occurrences
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recurrence engine benchmark")
+    parser.add_argument("--entries", type=int, nargs="+", default=[1, 20])
+    parser.add_argument("--date", default="1985-08-14")
+    parser.add_argument("--time", default="06:30")
+    args = parser.parse_args()
+
+    tz = pytz.timezone(LOCATION["timezone"])
+    base_dt = tz.localize(datetime.strptime(f"{args.date} {args.time}", "%Y-%m-%d %H:%M"))
+
+    print(f"{'entries':>8} | {'scan (s)':>9} | {'lunation (s)':>12} | {'speedup':>8} | same")
+    print("-" * 56)
+    for entries in args.entries:
+        scan_s, scan = run("scan", base_dt, entries)
+        lunation_s, lunation = run("lunation", base_dt, entries)
+        same = [(o["datetime"], o["report"]) for o in scan] == [(o["datetime"], o["report"]) for o in lunation]
+        print(f"{entries:>8} | {scan_s:>9.3f} | {lunation_s:>12.3f} | {scan_s / lunation_s:>7.1f}x | {'yes' if same else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark: scalar get_sidereal_longitude loop vs. batch get_sidereal_longitudes.
+
+Run from the project root (where de421.bsp lives):
+    python3 scripts/benchmark_sidereal.py
+    python3 scripts/benchmark_sidereal.py --sizes 1000 10000 100000 --scalar-limit 10000
+
+The scalar loop is slow (two skyfield round-trips per instant), so for sizes above
+--scalar-limit it is timed on the first --scalar-limit instants and extrapolated
+linearly (marked with '~').
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytz
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.astronomy import get_sidereal_longitude, get_sidereal_longitudes, sun, moon
+
+
+def make_instants(n):
+    start = datetime(1990, 1, 1, tzinfo=pytz.utc)
+    step = timedelta(days=60 * 365.25 / n)
+    return [start + i * step for i in range(n)]
+
+
+def time_scalar(instants):
+    t0 = time.perf_counter()
+    sun_lons = [get_sidereal_longitude(dt, sun) for dt in instants]
+    moon_lons = [get_sidereal_longitude(dt, moon) for dt in instants]
+    return time.perf_counter() - t0, np.array(sun_lons), np.array(moon_lons)
+
+
+def time_batch(instants):
+    t0 = time.perf_counter()
+    sun_lons, moon_lons = get_sidereal_longitudes(instants)
+    return time.perf_counter() - t0, sun_lons, moon_lons
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scalar vs. batch sidereal longitude benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--scalar-limit", type=int, default=10000)
+    args = parser.parse_args()
+
+    print(f"{'instants':>10} | {'scalar (s)':>12} | {'batch (s)':>10} | {'speedup':>8} | {'max diff (°)':>12}")
+    print("-" * 66)
+    for n in args.sizes:
+        instants = make_instants(n)
+        sample = instants[:min(n, args.scalar_limit)]
+
+        scalar_s, s_sun, s_moon = time_scalar(sample)
+        batch_s, b_sun, b_moon = time_batch(instants)
+
+        extrapolated = len(sample) < n
+        if extrapolated:
+            scalar_s *= n / len(sample)
+
+        k = len(sample)
+        max_diff = max(
+            np.max(np.abs((b_sun[:k] - s_sun + 180) % 360 - 180)),
+            np.max(np.abs((b_moon[:k] - s_moon + 180) % 360 - 180)),
+        )
+        scalar_col = f"{'~' if extrapolated else ''}{scalar_s:.3f}"
+        print(f"{n:>10} | {scalar_col:>12} | {batch_s:>10.3f} | {scalar_s / batch_s:>7.0f}x | {max_diff:>12.2e}")
+
+
+if __name__ == "__main__":
+    main()
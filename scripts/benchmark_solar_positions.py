@@ -0,0 +1,74 @@
+"""
+Benchmark: per-planet sun.at(t).observe(body) loop vs. the batched
+get_heliocentric_positions engine behind the solar system view.
+
+Run from the project root (where de421.bsp lives):
+    python3 scripts/benchmark_solar_positions.py
+    python3 scripts/benchmark_solar_positions.py --sizes 1 30 365 3650 --repeat 20
+
+The loop is what generate_solar_system used to do for one instant (8 observe
+calls); for N instants it is repeated per instant, which is what orbit trails
+or multi-date comparisons would otherwise cost. Both sides get the same
+prebuilt skyfield Times, so only the position computation is timed.
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytz
+from skyfield.framelib import ecliptic_frame
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.astronomy import sun, ts
+from utils.solar_system import get_heliocentric_positions, planets_map
+
+
+def make_times(n):
+    start = datetime(2024, 1, 1, 6, 30, tzinfo=pytz.utc)
+    return ts.from_datetimes([start + timedelta(days=i) for i in range(n)])
+
+
+def loop_positions(times):
+    return np.stack([
+        np.array([sun.at(t).observe(body).frame_xyz(ecliptic_frame).au[:2] for body in planets_map.values()])
+        for t in times
+    ], axis=-1)
+
+
+def best_of(repeat, fn, *args):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-planet loop vs. batched heliocentric positions")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 365])
+    parser.add_argument("--repeat", type=int, default=10, help="Best of this many runs per size")
+    args = parser.parse_args()
+
+    print(f"{'instants':>9} | {'loop (ms)':>10} | {'batch (ms)':>10} | {'speedup':>8} | {'max diff (AU)':>13}")
+    print("-" * 63)
+    for n in args.sizes:
+        times = make_times(n)
+        loop_s, expected = best_of(args.repeat, loop_positions, times)
+        batch_s, actual = best_of(args.repeat, get_heliocentric_positions, times)
+        max_diff = np.max(np.abs(actual - expected))
+        print(f"{n:>9} | {loop_s * 1000:>10.2f} | {batch_s * 1000:>10.2f} | {loop_s / batch_s:>7.1f}x | {max_diff:>13.2e}")
+
+    # The single-instant path as generate_solar_system calls it
+    dt = datetime(2024, 1, 1, 6, 30, tzinfo=pytz.utc)
+    single_s, _ = best_of(args.repeat, get_heliocentric_positions, dt)
+    print(f"\nget_heliocentric_positions(datetime): {single_s * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
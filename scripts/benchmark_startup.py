@@ -0,0 +1,214 @@
+"""
+Benchmark: app import time and per-worker memory under gunicorn.
+
+Import time: `import app` in fresh interpreters (median of --runs), the
+slowest modules by cumulative import time (python -X importtime), and
+whether the lazily imported heavy modules (matplotlib, the Gemini client)
+stayed out of it.
+
+Worker memory: starts gunicorn with gunicorn.conf.py twice, preloaded
+(PANCHANGA_PRELOAD=1, the default) and per-worker imports
+(PANCHANGA_PRELOAD=0), waits until every worker answers, and reads each
+worker's RSS, PSS and private memory from /proc/<pid>/smaps_rollup (Linux).
+RSS counts shared pages in full in every worker; PSS splits them between
+the processes sharing them, so the PSS sum is what the workers really cost.
+
+With --render (the default) every worker is then made to start its render
+pool (concurrent sky map requests until each worker has pool processes),
+and each worker is reported together with its pool processes, sized by
+PANCHANGA_RENDER_WORKERS shared out between the workers.
+
+Run from the project root (where de421.bsp lives):
+    python3 scripts/benchmark_startup.py --workers 3
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+LAZY_MODULES = ("matplotlib", "google.generativeai")
+BOOT_TIMEOUT = 120
+
+
+def import_seconds(runs):
+    code = (
+        "import sys, time; t = time.perf_counter(); import app; "
+        "print(time.perf_counter() - t, *[m in sys.modules for m in %r])" % (LAZY_MODULES,)
+    )
+    times, loaded = [], None
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+        seconds, *flags = out.stdout.split()[-1 - len(LAZY_MODULES):]
+        times.append(float(seconds))
+        loaded = [name for name, flag in zip(LAZY_MODULES, flags) if flag == "True"]
+    return statistics.median(times), loaded
+
+
+def slowest_imports(count):
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"],
+                         cwd=ROOT, capture_output=True, text=True, check=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "cumulative" not in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            rows.append((int(cumulative), name.rstrip()))
+    # Direct imports of app only (one level below it): a module's cumulative
+    # time includes everything it imports
+    direct = [(us, name.strip()) for us, name in rows if len(name) - len(name.lstrip()) == 3]
+    return sorted(direct, reverse=True)[:count]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def smaps(pid):
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) * 1024
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "private": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def children(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def descendants(pid):
+    found = []
+    for child in children(pid):
+        found += [child, *descendants(child)]
+    return found
+
+
+def is_resource_tracker(pid):
+    with open(f"/proc/{pid}/cmdline", "rb") as f:
+        return b"resource_tracker" in f.read()
+
+
+def request_skyshot(port, minute):
+    body = json.dumps({"date": "2000-01-01", "time": f"{minute // 60 % 24:02d}:{minute % 60:02d}",
+                       "location": "Mysuru", "format": "png"}).encode()
+    request = urllib.request.Request(f"http://127.0.0.1:{port}/api/skyshot", data=body,
+                                     headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            response.read()
+    except OSError:
+        pass
+
+
+def start_render_pools(port, master_pid, workers):
+    """Sends uncached sky map requests in parallel until every worker has started its pool."""
+    t0 = time.perf_counter()
+    minute = 0
+    while not all(children(pid) for pid in children(master_pid)):
+        if time.perf_counter() - t0 > BOOT_TIMEOUT:
+            raise RuntimeError("render pools did not start")
+        batch = [threading.Thread(target=request_skyshot, args=(port, minute + i)) for i in range(workers * 2)]
+        minute += len(batch)
+        for thread in batch:
+            thread.start()
+        for thread in batch:
+            thread.join()
+
+
+def worker_memory(preload, workers, render):
+    port = free_port()
+    env = dict(os.environ, PANCHANGA_PRELOAD="1" if preload else "0")
+    t0 = time.perf_counter()
+    master = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--bind", f"127.0.0.1:{port}",
+         "--workers", str(workers), "app:app"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        # Ready once every worker is up and one of them answers
+        pids = set()
+        while len(pids) < workers or not answered(port):
+            if time.perf_counter() - t0 > BOOT_TIMEOUT or master.poll() is not None:
+                raise RuntimeError("gunicorn did not boot")
+            time.sleep(0.2)
+            pids = set(children(master.pid))
+        boot_s = time.perf_counter() - t0
+        # Let the per-worker warm-up (PANCHANGA_PRELOAD=0) finish too
+        time.sleep(2)
+        if render:
+            start_render_pools(port, master.pid, workers)
+            # Let the pool processes finish loading matplotlib
+            time.sleep(5)
+        return boot_s, smaps(master.pid), [
+            (smaps(pid), [{**smaps(child), "tracker": is_resource_tracker(child)} for child in descendants(pid)])
+            for pid in children(master.pid)
+        ]
+    finally:
+        master.send_signal(signal.SIGTERM)
+        master.wait(timeout=30)
+
+
+def answered(port):
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/metrics", timeout=5) as response:
+            return response.status == 200
+    except OSError:
+        return False
+
+
+def mb(value):
+    return f"{value / 2**20:7.1f} MB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time and per-worker memory benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to time `import app` in")
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--no-render", dest="render", action="store_false",
+                        help="Measure idle workers, without starting their render pools")
+    args = parser.parse_args()
+
+    seconds, loaded = import_seconds(args.runs)
+    print(f"import app: {seconds * 1000:.0f} ms (median of {args.runs})")
+    print(f"lazy modules loaded at import: {', '.join(loaded) if loaded else 'none'}")
+    for us, name in slowest_imports(8):
+        print(f"   {us / 1000:7.1f} ms  {name}")
+
+    if not Path("/proc/self/smaps_rollup").exists():
+        print("Per-worker memory needs Linux /proc; skipped.")
+        return
+
+    for preload in (True, False):
+        boot_s, master, workers = worker_memory(preload, args.workers, args.render)
+        print(f"\n{'preloaded' if preload else 'per-worker import'} ({args.workers} workers, ready in {boot_s:.1f}s)")
+        print(f"   master   RSS {mb(master['rss'])}  PSS {mb(master['pss'])}")
+        total = master["pss"]
+        for i, (worker, pool) in enumerate(workers):
+            print(f"   worker {i} RSS {mb(worker['rss'])}  PSS {mb(worker['pss'])}  private {mb(worker['private'])}")
+            if pool:
+                renderers = sum(not p["tracker"] for p in pool)
+                print(f"      + render pool: {renderers} render + {len(pool) - renderers} tracker process(es), RSS {mb(sum(p['rss'] for p in pool))}  "
+                      f"PSS {mb(sum(p['pss'] for p in pool))}")
+            total += worker["pss"] + sum(p["pss"] for p in pool)
+        print(f"   total PSS (master + workers{' + render pools' if args.render else ''}): {mb(total)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark: PNG (matplotlib/Agg) vs. SVG (string templates) output for the sky
+map and solar system views.
+
+Run from the project root (where de421.bsp lives):
+    python3 scripts/benchmark_svg_render.py
+    python3 scripts/benchmark_svg_render.py --samples 50
+
+Renders the same random states both ways in this process and reports the
+median time per image and the payload size (raw and gzipped, as it would go
+over the wire with compression). The PNG sky map timing is the pre-rendered
+wheel composite the render pool runs, after its one-off warm-up.
+"""
+
+import argparse
+import gzip
+import io
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytz
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from data.panchanga_data import NAKSHATRAS as NAKSHATRA_NAMES
+from utils.skyshot import generate_skymap, generate_skymap_svg, get_wheel_renderer
+from utils.solar_system import generate_solar_system, generate_solar_system_svg
+
+
+def png_bytes(render, *args, **kwargs):
+    buf = io.BytesIO()
+    render(*args, output_path=buf, **kwargs)
+    return buf.getvalue()
+
+
+def measure(render, samples):
+    """Median milliseconds per call and the outputs."""
+    times, outputs = [], []
+    for args in samples:
+        t0 = time.perf_counter()
+        outputs.append(render(*args))
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times), outputs
+
+
+def report(view, fmt, ms, outputs):
+    raw = statistics.mean(len(out) for out in outputs) / 1024
+    gz = statistics.mean(len(gzip.compress(out)) for out in outputs) / 1024
+    print(f"{view:>13} | {fmt:>4} | {ms:>9.2f} | {raw:>9.1f} | {gz:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PNG vs. SVG image rendering benchmark")
+    parser.add_argument("--samples", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    sky_states = [
+        (rng.uniform(0, 360), rng.choice(NAKSHATRA_NAMES["EN"]), rng.uniform(0, 360))
+        for _ in range(args.samples)
+    ]
+    start = datetime(1990, 1, 1, tzinfo=pytz.utc)
+    instants = [(start + timedelta(days=rng.uniform(0, 20000)),) for _ in range(args.samples)]
+
+    # Warm-up outside the timings: wheel rasterization, fonts, ephemeris pages
+    get_wheel_renderer().prerender()
+    png_bytes(generate_solar_system, instants[0][0])
+    generate_solar_system_svg(instants[0][0])
+
+    print(f"{'view':>13} | {'fmt':>4} | {'ms/image':>9} | {'KB':>9} | {'KB (gz)':>9}")
+    print("-" * 56)
+
+    def sky_png(moon, nakshatra, rahu):
+        return png_bytes(generate_skymap, moon, nakshatra, 1, 0.0,
+                         rahu_longitude=rahu, ketu_longitude=(rahu + 180) % 360)
+
+    def sky_svg(moon, nakshatra, rahu):
+        return generate_skymap_svg(moon, nakshatra, rahu_longitude=rahu, ketu_longitude=(rahu + 180) % 360)
+
+    png_ms, png_out = measure(sky_png, sky_states)
+    svg_ms, svg_out = measure(sky_svg, sky_states)
+    report("sky map", "png", png_ms, png_out)
+    report("sky map", "svg", svg_ms, svg_out)
+    print(f"{'':>13} | svg is {png_ms / svg_ms:.0f}x faster, {sum(map(len, png_out)) / sum(map(len, svg_out)):.0f}x smaller")
+
+    png_ms, png_out = measure(lambda dt: png_bytes(generate_solar_system, dt), instants)
+    svg_ms, svg_out = measure(generate_solar_system_svg, instants)
+    report("solar system", "png", png_ms, png_out)
+    report("solar system", "svg", svg_ms, svg_out)
+    print(f"{'':>13} | svg is {png_ms / svg_ms:.0f}x faster, {sum(map(len, png_out)) / sum(map(len, svg_out)):.0f}x smaller")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark: per-request timezone resolution cost.
+
+Compares the old pattern (a fresh TimezoneFinder per request) with the shared
+resolver in utils.location, both cold (distinct coordinates) and warm (repeat
+coordinates served from the LRU).
+
+    python3 scripts/benchmark_timezone.py --requests 200
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from timezonefinder import TimezoneFinder
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils import location
+
+
+def per_request_ms(fn, coords):
+    t0 = time.perf_counter()
+    for lat, lon in coords:
+        fn(lat, lon)
+    return (time.perf_counter() - t0) * 1000 / len(coords)
+
+
+def fresh_finder(lat, lon):
+    return TimezoneFinder().timezone_at(lng=lon, lat=lat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Timezone resolution benchmark")
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    coords = list(zip(rng.uniform(-50, 60, args.requests), rng.uniform(-120, 150, args.requests)))
+
+    before = per_request_ms(fresh_finder, coords)
+
+    t0 = time.perf_counter()
+    location.get_timezone_finder()
+    init_ms = (time.perf_counter() - t0) * 1000
+    cold = per_request_ms(location.get_timezone, coords)
+    warm = per_request_ms(location.get_timezone, coords)
+
+    print(f"fresh TimezoneFinder per request : {before:8.3f} ms")
+    print(f"shared finder, one-time init     : {init_ms:8.3f} ms (in_memory={location.TIMEZONE_IN_MEMORY})")
+    print(f"shared finder, new coordinates   : {cold:8.3f} ms")
+    print(f"shared finder, cached coordinates: {warm:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Build step: find every Karana, Pada and Yoga boundary covered by de421.
+
+Writes data/anga_transitions.npy, which panchanga.transitions memory-maps at
+import so the current Tithi, Karana, Nakshatra, Pada or Yoga of an instant,
+when it began and when it ends, are binary searches.
+
+Run from the project root (where de421.bsp lives):
+    python3 scripts/build_anga_index.py            # build + verify
+    python3 scripts/build_anga_index.py --verify-only --samples 20000
+
+The Sun and Moon are sampled every GRID_DAYS (short enough that no step
+crosses two boundaries of a series), each crossing is located by linear
+interpolation and then polished with REFINE_ITERATIONS secant steps on the
+live longitudes. Verification compares the index against calculate_*() on
+live longitudes at random instants (instants within a second of a boundary
+are skipped) and checks that every boundary sits on its longitude to within
+MAX_BOUNDARY_ERROR_S.
+
+Nakshatra, Pada and Yoga boundaries depend on the ayanamsha, so rebuild
+after changing utils.astronomy.get_ayanamsha.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.astronomy import eph, ts, get_sidereal_longitudes
+from panchanga import transitions
+from panchanga.transitions import SERIES, ANGA_INDEX_PATH, ANGA_INDEX_VERSION, AngaIndex
+from panchanga.calculations import calculate_karana, calculate_yoga
+from data.panchanga_data import YOGAS
+
+# The Moon gains at most ~16 degrees a day on the Sun, so a 0.1 day step moves
+# every quantity by well under half its smallest division (3 1/3 degrees)
+GRID_DAYS = 0.1
+REFINE_ITERATIONS = 4
+# Longitudes per skyfield call, to keep its working arrays small
+CHUNK = 50000
+MAX_BOUNDARY_ERROR_S = 0.01
+
+
+def quantities(tt):
+    """Karana (elongation), Pada (Moon) and Yoga (Sun + Moon) longitudes, 0-360."""
+    sun_lons, moon_lons = [], []
+    for start in range(0, len(tt), CHUNK):
+        s, m = get_sidereal_longitudes(ts.tt_jd(tt[start:start + CHUNK]))
+        sun_lons.append(s)
+        moon_lons.append(m)
+    sun_lon, moon_lon = np.concatenate(sun_lons), np.concatenate(moon_lons)
+    values = {"elongation": moon_lon - sun_lon, "moon": moon_lon, "sum": sun_lon + moon_lon}
+    return {name: values[quantity] % 360 for name, (_, quantity) in SERIES.items()}
+
+
+def wrapped(degrees):
+    return (degrees + 180) % 360 - 180
+
+
+def build(path):
+    segment = eph.spk.segments[0]
+    # Stay clear of the kernel edges so light-time iterations remain in range
+    first_jd, last_jd = segment.start_jd + 1, segment.end_jd - 1
+    print(f"Searching anga boundaries between {ts.tt_jd(first_jd).utc_strftime('%Y-%m-%d')} "
+          f"and {ts.tt_jd(last_jd).utc_strftime('%Y-%m-%d')}...")
+
+    grid = np.arange(first_jd, last_jd, GRID_DAYS)
+    sampled = quantities(grid)
+
+    found = {}
+    for name, (cycle, _) in SERIES.items():
+        span = 360 / cycle
+        values = np.unwrap(sampled[name], period=360)
+        division = np.floor(values / span).astype(np.int64)
+        steps = np.flatnonzero(np.diff(division))
+        if np.any(np.diff(division)[steps] != 1):
+            raise RuntimeError(f"{name}: a grid step crossed more than one boundary")
+        boundary = division[steps + 1] * span
+        # Linear interpolation, and the local rate for the secant steps
+        rate = (values[steps + 1] - values[steps]) / GRID_DAYS
+        tt = grid[steps] + (boundary - values[steps]) / rate
+        found[name] = (tt, boundary % 360, rate, int(division[steps[0] + 1] % cycle))
+
+    for _ in range(REFINE_ITERATIONS):
+        # One longitude pass polishes every series at once
+        all_tt = np.concatenate([tt for tt, _, _, _ in found.values()])
+        values = quantities(all_tt)
+        offset = 0
+        for name, (tt, boundary, rate, first) in found.items():
+            residual = wrapped(values[name][offset:offset + len(tt)] - boundary)
+            found[name] = (tt - residual / rate, boundary, rate, first)
+            offset += len(tt)
+
+    parts = [np.array([ANGA_INDEX_VERSION, first_jd, last_jd], dtype=np.float64)]
+    for name, (tt, _, _, first) in found.items():
+        parts.append(np.array([len(tt), first], dtype=np.float64))
+        parts.append(tt)
+        print(f"  {name}: {len(tt)} boundaries")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.save(path, np.concatenate(parts))
+    print(f"Wrote {path} ({path.stat().st_size / 1024:.1f} KB)")
+
+
+def verify(samples, seed=7):
+    transitions._load_anga_index()
+    index = transitions.ANGA_INDEX
+    if index is None:
+        print("❌ Index could not be loaded.")
+        return False
+
+    ok = True
+    # Every boundary sits on its longitude
+    for name, (cycle, _) in SERIES.items():
+        times, first = index.series[name]
+        times = np.asarray(times)
+        boundary = ((first + np.arange(len(times))) % cycle) * (360 / cycle)
+        residual = wrapped(quantities(times)[name] - boundary)
+        rate = wrapped(quantities(times + 1e-3)[name] - quantities(times - 1e-3)[name]) / 2e-3
+        worst = np.max(np.abs(residual / rate)) * 86400
+        ordered = bool(np.all(np.diff(times) > 0))
+        good = worst <= MAX_BOUNDARY_ERROR_S and ordered
+        ok &= good
+        print(f"{'✅' if good else '❌'} {name}: {len(times)} boundaries, max timing error {worst * 1000:.3f} ms")
+
+    # Index lookups agree with the live calculations
+    rng = np.random.default_rng(seed)
+    tt = rng.uniform(*index.coverage_tt, samples)
+    sun_lons, moon_lons = get_sidereal_longitudes(ts.tt_jd(tt))
+    mismatches = 0
+    checked = 0
+    for jd, s_lon, m_lon in zip(tt, sun_lons, moon_lons):
+        spans = {anga: index.span(anga, jd) for anga in ("tithi", "karana", "nakshatra", "pada", "yoga")}
+        edges = [t for _, start, end in spans.values() for t in (start, end) if t is not None]
+        if min(abs(jd - t) for t in edges) * 86400 < 1:
+            continue
+        checked += 1
+        expected = {
+            "tithi": int(((m_lon - s_lon) % 360) / 12),
+            "karana": calculate_karana(s_lon, m_lon) - 1,
+            "nakshatra": int(m_lon / (360 / 27)),
+            "pada": int(m_lon / (360 / 108)),
+            "yoga": YOGAS["EN"].index(calculate_yoga(s_lon, m_lon)),
+        }
+        if any(spans[anga][0] != value for anga, value in expected.items()):
+            mismatches += 1
+    good = mismatches == 0
+    ok &= good
+    print(f"{'✅' if good else '❌'} {checked} samples: index vs live angas mismatches = {mismatches}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the anga transition index")
+    parser.add_argument("--samples", type=int, default=5000, help="Random instants to verify against live longitudes")
+    parser.add_argument("--verify-only", action="store_true")
+    args = parser.parse_args()
+
+    if not args.verify_only:
+        build(ANGA_INDEX_PATH)
+    sys.exit(0 if verify(args.samples) else 1)
+
+
+if __name__ == "__main__":
+    main()
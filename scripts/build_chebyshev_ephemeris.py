@@ -0,0 +1,142 @@
+"""
+Build step: fit piecewise Chebyshev series to the Sun's and Moon's
+longitude over the whole de421 span.
+
+Writes data/chebyshev_longitudes.npy, which utils.astronomy memory-maps when
+PANCHANGA_EPHEMERIS_BACKEND=chebyshev, so Sun and Moon longitudes become a
+polynomial evaluation instead of a JPL kernel lookup with light-time
+iterations.
+
+Run from the project root (where de421.bsp lives):
+    python3 scripts/build_chebyshev_ephemeris.py            # build + verify
+    python3 scripts/build_chebyshev_ephemeris.py --verify-only --samples 1000000
+
+The tropical (ecliptic of J2000) longitude is fitted, exactly what
+get_sidereal_longitude() observes before subtracting the ayanamsha, so the
+ayanamsha formula can change without rebuilding. Verification evaluates the
+series at random instants against the kernel and fails if any differs by
+more than CHEBYSHEV_MAX_ERROR_ARCSEC.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from numpy.polynomial import chebyshev
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.astronomy import (
+    eph, ts, earth, sun, moon, ChebyshevLongitudes,
+    CHEBYSHEV_TABLE_PATH, CHEBYSHEV_TABLE_VERSION, CHEBYSHEV_MAX_ERROR_ARCSEC,
+)
+
+# (days per segment, degree): the Sun's segments must stay short against the
+# month because of the Earth's wobble about the Earth-Moon barycenter
+SUN_SERIES = (32, 16)
+MOON_SERIES = (8, 12)
+# Kernel evaluations per skyfield call, to keep its working arrays small
+CHUNK = 50000
+
+
+def kernel_longitudes(tt):
+    """Tropical Sun and Moon longitudes from de421, as get_sidereal_longitude() observes them."""
+    sun_lons, moon_lons = [], []
+    for start in range(0, len(tt), CHUNK):
+        observer = earth.at(ts.tt_jd(tt[start:start + CHUNK]))
+        sun_lons.append(observer.observe(sun).ecliptic_latlon()[1].degrees)
+        moon_lons.append(observer.observe(moon).ecliptic_latlon()[1].degrees)
+    return np.concatenate(sun_lons), np.concatenate(moon_lons)
+
+
+def fit(first_jd, last_jd, days, degree, body):
+    """Interpolates each segment at its Chebyshev nodes; returns (count, degree + 1) coefficients."""
+    count = int((last_jd - first_jd) // days)
+    nodes = np.cos(np.pi * (np.arange(degree + 1) + 0.5) / (degree + 1))
+    tt = first_jd + days * (np.arange(count)[:, None] + (nodes[None, :] + 1) / 2)
+    longitudes = kernel_longitudes(tt.ravel())[body].reshape(tt.shape)
+    # Nodes run from +1 down to -1; unwrap so a segment never jumps at 360
+    longitudes = np.unwrap(longitudes, period=360, axis=1)
+    vandermonde = chebyshev.chebvander(nodes, degree)
+    return np.linalg.solve(vandermonde, longitudes.T).T
+
+
+def build(path):
+    segment = eph.spk.segments[0]
+    # Stay clear of the kernel edges so light-time iterations remain in range
+    first_jd, last_jd = segment.start_jd + 1, segment.end_jd - 1
+    print(f"Fitting Sun and Moon longitudes between {ts.tt_jd(first_jd).utc_strftime('%Y-%m-%d')} "
+          f"and {ts.tt_jd(last_jd).utc_strftime('%Y-%m-%d')}...")
+
+    sun_coefficients = fit(first_jd, last_jd, *SUN_SERIES, body=0)
+    moon_coefficients = fit(first_jd, last_jd, *MOON_SERIES, body=1)
+    header = np.array([
+        CHEBYSHEV_TABLE_VERSION, first_jd,
+        SUN_SERIES[0], len(sun_coefficients), SUN_SERIES[1],
+        MOON_SERIES[0], len(moon_coefficients), MOON_SERIES[1],
+    ], dtype=np.float64)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.save(path, np.concatenate([header, sun_coefficients.ravel(), moon_coefficients.ravel()]))
+    print(f"Wrote {len(sun_coefficients)} Sun and {len(moon_coefficients)} Moon segments to {path} "
+          f"({path.stat().st_size / 1024:.1f} KB)")
+
+
+def verify(samples, seed=7):
+    try:
+        table = ChebyshevLongitudes(CHEBYSHEV_TABLE_PATH)
+    except Exception as e:
+        print(f"❌ Table could not be loaded: {e}")
+        return False
+
+    rng = np.random.default_rng(seed)
+    tt = rng.uniform(table.first_tt, table.last_tt, samples)
+
+    # Untimed first pass: pages in the kernel and the memory-mapped table
+    table.tropical_longitudes(tt)
+    t0 = time.perf_counter()
+    expected = kernel_longitudes(tt)
+    kernel_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    actual = table.tropical_longitudes(tt)
+    table_s = time.perf_counter() - t0
+
+    ok = True
+    for name, a, e in zip(("Sun", "Moon"), actual, expected):
+        worst = np.max(np.abs((a - e + 180) % 360 - 180)) * 3600
+        ok &= worst <= CHEBYSHEV_MAX_ERROR_ARCSEC
+        print(f"{'✅' if worst <= CHEBYSHEV_MAX_ERROR_ARCSEC else '❌'} {name}: max |series - de421| = "
+              f"{worst:.6f}\" over {samples} samples (limit {CHEBYSHEV_MAX_ERROR_ARCSEC}\")")
+    print(f"   batch:  de421 {kernel_s / samples * 1e6:.2f} µs/instant, "
+          f"series {table_s / samples * 1e6:.3f} µs/instant ({kernel_s / table_s:.0f}x)")
+
+    # One instant per call, as Moment and get_sidereal_longitude() ask
+    single = tt[:200]
+    t0 = time.perf_counter()
+    for jd in single:
+        kernel_longitudes(np.array([jd]))
+    kernel_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for jd in single:
+        table.tropical_longitudes(jd)
+    table_s = time.perf_counter() - t0
+    print(f"   single: de421 {kernel_s / len(single) * 1e6:.0f} µs/call, "
+          f"series {table_s / len(single) * 1e6:.1f} µs/call ({kernel_s / table_s:.0f}x)")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the Chebyshev Sun/Moon longitude table")
+    parser.add_argument("--samples", type=int, default=200000, help="Random instants to verify against de421")
+    parser.add_argument("--verify-only", action="store_true")
+    args = parser.parse_args()
+
+    if not args.verify_only:
+        build(CHEBYSHEV_TABLE_PATH)
+    sys.exit(0 if verify(args.samples) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Build step: compile the offline gazetteer used for location autocomplete and
+for resolving common place names without a Nominatim round trip.
+
+Source data is GeoNames (https://www.geonames.org, CC BY 4.0), either the
+official dumps or the copy bundled with the `geonamescache` package:
+
+    # Official dumps (cities15000.zip + countryInfo.txt from download.geonames.org/export/dump/)
+    python3 scripts/build_gazetteer.py --cities cities15000.txt --countries countryInfo.txt
+
+    # Bundled copy (pip install geonamescache)
+    python3 scripts/build_gazetteer.py
+
+Writes data/gazetteer.npz: place columns (name, country, latitude, longitude,
+timezone, population) ordered most populous first, the sorted folded names
+with the place each one points to, and the folded region names that must
+never resolve to a town.
+
+Only each place's own name and the curated CITY_ALIASES are indexed. GeoNames'
+alternate names are not: they include abbreviations, historical names and
+spellings that collide after folding ("India" is an alias of Inđija, Serbia;
+"Victoria" one of Hong Kong), which sent plain inputs to the wrong place.
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.gazetteer import GAZETTEER_PATH, GAZETTEER_VERSION, Gazetteer, fold_name
+
+# Former and common English names people still type: alias -> (country code,
+# GeoNames name of the place it stands for)
+CITY_ALIASES = {
+    "Bangalore": ("IN", "Bengaluru"),
+    "Bombay": ("IN", "Mumbai"),
+    "Madras": ("IN", "Chennai"),
+    "Calcutta": ("IN", "Kolkata"),
+    "Mysore": ("IN", "Mysuru"),
+    "Mangalore": ("IN", "Mangaluru"),
+    "Trivandrum": ("IN", "Thiruvananthapuram"),
+    "Poona": ("IN", "Pune"),
+    "Baroda": ("IN", "Vadodara"),
+    "Benares": ("IN", "Varanasi"),
+    "Banaras": ("IN", "Varanasi"),
+    "Allahabad": ("IN", "Prayagraj"),
+    "Gurgaon": ("IN", "Gurugram"),
+    "Cochin": ("IN", "Kochi"),
+    "Calicut": ("IN", "Kozhikode"),
+    "Pondicherry": ("IN", "Puducherry"),
+    "Trichur": ("IN", "Thrissur"),
+    "Trichy": ("IN", "Tiruchirappalli"),
+    "Hubli": ("IN", "Hubballi"),
+    "Belgaum": ("IN", "Belagavi"),
+    "Simla": ("IN", "Shimla"),
+    "Vizag": ("IN", "Visakhapatnam"),
+    "New York": ("US", "New York City"),
+    "Peking": ("CN", "Beijing"),
+    "Saigon": ("VN", "Ho Chi Minh City"),
+    "Rangoon": ("MM", "Yangon"),
+    "Kiev": ("UA", "Kyiv"),
+}
+
+# States, provinces and regions whose names are also (small) towns somewhere:
+# a bare "Goa" or "Florida" means the region, which the geocoder resolves
+REGION_NAMES = [
+    # India
+    "Andhra Pradesh", "Arunachal Pradesh", "Assam", "Bihar", "Chhattisgarh", "Goa", "Gujarat",
+    "Haryana", "Himachal Pradesh", "Jharkhand", "Karnataka", "Kerala", "Madhya Pradesh",
+    "Maharashtra", "Manipur", "Meghalaya", "Mizoram", "Nagaland", "Odisha", "Orissa", "Punjab",
+    "Rajasthan", "Sikkim", "Tamil Nadu", "Telangana", "Tripura", "Uttar Pradesh", "Uttarakhand",
+    "West Bengal", "Kashmir", "Ladakh", "Andaman", "Lakshadweep",
+    # Elsewhere
+    "Bali", "Java", "Sumatra", "Borneo", "Sicily", "Sardinia", "Tuscany", "Bavaria", "Catalonia",
+    "Andalusia", "Provence", "Normandy", "Brittany", "Scotland", "Wales", "England",
+    "Ontario", "Quebec", "British Columbia", "Alberta", "Queensland", "Tasmania",
+    "New South Wales", "Hawaii", "Alaska", "California", "Florida", "Texas",
+]
+
+csv.field_size_limit(sys.maxsize)
+
+
+def read_geonames_cities(path):
+    """Rows of a GeoNames cities*.txt dump (tab-separated, no header)."""
+    with open(path, encoding="utf-8", newline="") as f:
+        for row in csv.reader(f, delimiter="\t", quoting=csv.QUOTE_NONE):
+            yield {
+                "name": row[1],
+                "latitude": float(row[4]),
+                "longitude": float(row[5]),
+                "countrycode": row[8],
+                "population": int(row[14] or 0),
+                "timezone": row[17],
+            }
+
+
+def read_geonames_countries(path):
+    countries = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("#") or not line.strip():
+                continue
+            row = line.rstrip("\n").split("\t")
+            countries[row[0]] = row[4]
+    return countries
+
+
+def read_geonamescache():
+    try:
+        import geonamescache
+    except ImportError:
+        sys.exit("No --cities given and geonamescache is not installed (pip install geonamescache).")
+    data_dir = Path(geonamescache.__file__).parent / "data"
+    with open(data_dir / "cities15000.json", encoding="utf-8") as f:
+        cities = list(json.load(f).values())
+    with open(data_dir / "countries.json", encoding="utf-8") as f:
+        countries = {code: c["name"] for code, c in json.load(f).items()}
+    return cities, countries
+
+
+def read_us_states():
+    """US state names from geonamescache, when installed."""
+    try:
+        import geonamescache
+    except ImportError:
+        return []
+    return [state["name"] for state in geonamescache.GeonamesCache().get_us_states().values()]
+
+
+def match_keys(cities):
+    """(folded key, place index) for every place's name and curated alias."""
+    entries = [(fold_name(city["name"]), index) for index, city in enumerate(cities)]
+    # Most populous place of that name in the country
+    lookup = {}
+    for index, city in enumerate(cities):
+        lookup.setdefault((city["countrycode"], city["name"]), index)
+    for alias, (code, name) in CITY_ALIASES.items():
+        if (code, name) not in lookup:
+            print(f"WARNING: No place {name} ({code}) for alias {alias}")
+            continue
+        entries.append((fold_name(alias), lookup[code, name]))
+    return sorted(entry for entry in entries if entry[0])
+
+
+def build(cities, countries, path, min_population):
+    cities = sorted(
+        (c for c in cities if c["population"] >= min_population and c["timezone"]),
+        key=lambda c: -c["population"],
+    )
+    country_codes = sorted({c["countrycode"] for c in cities})
+    timezones = sorted({c["timezone"] for c in cities})
+    country_lookup = {code: i for i, code in enumerate(country_codes)}
+    timezone_lookup = {tz: i for i, tz in enumerate(timezones)}
+
+    entries = match_keys(cities)
+    # A curated alias wins over a region of the same name ("New York")
+    regions = sorted({fold_name(name) for name in REGION_NAMES + read_us_states()} - {fold_name(alias) for alias in CITY_ALIASES})
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(
+        path,
+        version=np.int32(GAZETTEER_VERSION),
+        attribution=np.array("GeoNames (geonames.org), CC BY 4.0"),
+        names=np.array([c["name"].encode("utf-8") for c in cities]),
+        country_index=np.array([country_lookup[c["countrycode"]] for c in cities], dtype=np.int16),
+        country_codes=np.array([code.encode() for code in country_codes]),
+        country_names=np.array([countries.get(code, code).encode("utf-8") for code in country_codes]),
+        latitudes=np.array([c["latitude"] for c in cities], dtype=np.float64),
+        longitudes=np.array([c["longitude"] for c in cities], dtype=np.float64),
+        timezone_index=np.array([timezone_lookup[c["timezone"]] for c in cities], dtype=np.int16),
+        timezones=np.array([tz.encode() for tz in timezones]),
+        populations=np.array([c["population"] for c in cities], dtype=np.int64),
+        keys=np.array([key.encode("ascii") for key, _ in entries]),
+        key_place=np.array([index for _, index in entries], dtype=np.int32),
+        regions=np.array([name.encode("ascii") for name in regions]),
+    )
+    print(f"Wrote {len(cities)} places / {len(entries)} keys / {len(regions)} regions to {path} ({path.stat().st_size / 1024:.1f} KB)")
+
+
+def check(path):
+    t0 = time.perf_counter()
+    gazetteer = Gazetteer.load(path)
+    load_ms = (time.perf_counter() - t0) * 1000
+    print(f"Loaded {len(gazetteer)} places / {gazetteer.key_count} keys in {load_ms:.1f} ms")
+
+    for query in ("Bangalore, India", "Mysuru", "New York, US", "London", "Goa", "India"):
+        print(f"  resolve({query!r}) -> {gazetteer.resolve(query)}")
+    for prefix in ("ben", "mys", "s"):
+        t0 = time.perf_counter()
+        for _ in range(1000):
+            suggestions = gazetteer.suggest(prefix)
+        per_call_us = (time.perf_counter() - t0) * 1000
+        print(f"  suggest({prefix!r}) -> {[p.label for p in suggestions[:4]]} ({per_call_us:.1f} us)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the offline gazetteer")
+    parser.add_argument("--cities", help="GeoNames cities*.txt dump (default: geonamescache's cities15000)")
+    parser.add_argument("--countries", help="GeoNames countryInfo.txt (required with --cities)")
+    parser.add_argument("--min-population", type=int, default=15000)
+    parser.add_argument("--output", type=Path, default=GAZETTEER_PATH)
+    args = parser.parse_args()
+
+    if args.cities:
+        if not args.countries:
+            parser.error("--countries is required with --cities")
+        cities = read_geonames_cities(args.cities)
+        countries = read_geonames_countries(args.countries)
+    else:
+        cities, countries = read_geonamescache()
+
+    build(cities, countries, args.output, args.min_population)
+    check(args.output)
+
+
+if __name__ == "__main__":
+    main()
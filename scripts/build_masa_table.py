@@ -0,0 +1,134 @@
+"""
+Build step: tabulate every amanta lunar month covered by the New Moon table,
+with its Masa and Adhika flag, from New Moon and Sankranti instants.
+
+Writes data/lunar_months.npy, which panchanga.lunar_months memory-maps at
+import so the Masa of an instant is a binary search instead of a New Moon
+lookup plus a Sun position. Needs data/new_moons.npz
+(scripts/build_new_moon_table.py) first.
+
+Run from the project root (where de421.bsp lives):
+    python3 scripts/build_masa_table.py            # build + verify
+    python3 scripts/build_masa_table.py --verify-only
+
+Sankrantis (the Sun entering a sidereal rashi) are found on a daily grid and
+polished with secant steps. A month's Masa comes from the rashi the Sun is in
+at its opening New Moon, as calculate_masa_index() has it, and the month is
+Adhika when no Sankranti falls inside it. Verification checks every month
+against calculate_masa_index() on the live Sun and a few known Adhika months.
+"""
+
+import argparse
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pytz
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils import astronomy
+from utils.astronomy import ts, get_sidereal_longitudes
+from panchanga import lunar_months
+from panchanga.lunar_months import MASA_TABLE_PATH, MASA_TABLE_VERSION
+from panchanga.calculations import calculate_masa_index
+from data.panchanga_data import MASAS
+
+GRID_DAYS = 1.0
+REFINE_ITERATIONS = 4
+# Longitudes per skyfield call, to keep its working arrays small
+CHUNK = 50000
+
+# (a date inside the month, Masa) of published Adhika months
+KNOWN_ADHIKA = [
+    ((2015, 6, 30), "Ashadha"),
+    ((2018, 5, 30), "Jyeshtha"),
+    ((2020, 10, 1), "Ashvin"),
+    ((2023, 8, 1), "Shravana"),
+    ((2026, 6, 1), "Jyeshtha"),
+]
+
+
+def sun_longitudes(tt):
+    lons = []
+    for start in range(0, len(tt), CHUNK):
+        lons.append(get_sidereal_longitudes(ts.tt_jd(tt[start:start + CHUNK]))[0])
+    return np.concatenate(lons)
+
+
+def sankrantis(first_jd, last_jd):
+    """(TT instants, rashi entered) of every Sankranti in the range."""
+    grid = np.arange(first_jd, last_jd, GRID_DAYS)
+    values = np.unwrap(sun_longitudes(grid), period=360)
+    rashi = np.floor(values / 30).astype(np.int64)
+    steps = np.flatnonzero(np.diff(rashi))
+    boundary = rashi[steps + 1] * 30.0
+    rate = (values[steps + 1] - values[steps]) / GRID_DAYS
+    tt = grid[steps] + (boundary - values[steps]) / rate
+    for _ in range(REFINE_ITERATIONS):
+        residual = (sun_longitudes(tt) - boundary % 360 + 180) % 360 - 180
+        tt = tt - residual / rate
+    return tt, rashi[steps + 1] % 12
+
+
+def build(path):
+    astronomy._load_new_moon_table()
+    if astronomy.NEW_MOONS_TT is None:
+        raise SystemExit("data/new_moons.npz is missing; run scripts/build_new_moon_table.py first.")
+    new_moons = np.asarray(astronomy.NEW_MOONS_TT)
+    sankranti_tt, entered = sankrantis(astronomy.NEW_MOONS_COVERAGE_TT[0], new_moons[-1])
+    # The table opens at the first New Moon with a known Sankranti before it
+    new_moons = new_moons[new_moons > sankranti_tt[0]]
+    print(f"Tabulating {len(new_moons) - 1} lunar months between {ts.tt_jd(new_moons[0]).utc_strftime('%Y-%m-%d')} "
+          f"and {ts.tt_jd(new_moons[-1]).utc_strftime('%Y-%m-%d')}...")
+
+    preceding = np.searchsorted(sankranti_tt, new_moons, side='right') - 1
+    rashi_at_new_moon = entered[preceding[:-1]]
+    masas = (rashi_at_new_moon + 1) % 12      # Meena (11) -> Chaitra (0), as calculate_masa_index
+    adhika = preceding[1:] == preceding[:-1]  # no Sankranti between the two New Moons
+
+    count = len(new_moons) - 1
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.save(path, np.concatenate([
+        np.array([MASA_TABLE_VERSION, count], dtype=np.float64),
+        new_moons, masas.astype(np.float64), adhika.astype(np.float64),
+    ]))
+    print(f"Wrote {count} months ({int(adhika.sum())} Adhika) to {path} ({path.stat().st_size / 1024:.1f} KB)")
+
+
+def verify():
+    lunar_months._load_masa_table()
+    table = lunar_months.MASA_TABLE
+    if table is None:
+        print("❌ Table could not be loaded.")
+        return False
+
+    # A few seconds into each month, clear of the New Moon instant itself
+    sun_at_nm = sun_longitudes(np.asarray(table.bounds_tt[:-1]) + 1e-4)
+    expected = np.array([calculate_masa_index(lon) for lon in sun_at_nm])
+    mismatches = int(np.sum(expected != np.asarray(table.masas)))
+    ok = mismatches == 0
+    print(f"{'✅' if ok else '❌'} {len(expected)} months: Masa mismatches vs the live Sun = {mismatches}")
+
+    for (y, m, d), masa in KNOWN_ADHIKA:
+        month = lunar_months.get_lunar_month(pytz.utc.localize(datetime(y, m, d)))
+        good = month is not None and month.adhika and MASAS["EN"][month.index] == masa
+        ok &= good
+        found = f"{MASAS['EN'][month.index]}, adhika={month.adhika}" if month else "not covered"
+        print(f"{'✅' if good else '❌'} Adhika {masa} {y}: {found}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the lunar month (Masa) table")
+    parser.add_argument("--verify-only", action="store_true")
+    args = parser.parse_args()
+
+    if not args.verify_only:
+        build(MASA_TABLE_PATH)
+    sys.exit(0 if verify() else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Build step: precompute every New Moon (Amavasya) instant covered by de421.
+
+Writes data/new_moons.npz, which utils.astronomy loads at import so that
+get_previous_new_moon() becomes a binary search instead of a 32-day
+almanac.find_discrete() run.
+
+Run from the project root (where de421.bsp lives):
+    python3 scripts/build_new_moon_table.py            # build + verify
+    python3 scripts/build_new_moon_table.py --verify-only --samples 2000
+
+Verification compares the table lookup against the live almanac search for
+random instants. The almanac result itself moves with the search window by up
+to its bisection epsilon (~1 ms), so agreement is checked to that tolerance,
+and the Masa derived from both results must match exactly.
+"""
+
+import argparse
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+import pytz
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from skyfield import almanac
+from utils import astronomy
+from utils.astronomy import eph, ts, sun, get_sidereal_longitude, NEW_MOON_TABLE_PATH, NEW_MOON_TABLE_VERSION
+from panchanga.calculations import calculate_masa_name
+
+# Newton refinement steps applied to the almanac roots
+REFINE_ITERATIONS = 4
+# Searched in chunks to keep find_discrete's working arrays small
+CHUNK_DAYS = 1000
+ALMANAC_EPSILON_S = 1e-3
+
+
+def ephemeris_range():
+    segment = eph.spk.segments[0]
+    return segment.start_jd, segment.end_jd
+
+
+def build(path):
+    start_jd, end_jd = ephemeris_range()
+    # Stay clear of the kernel edges so light-time iterations remain in range
+    first_jd, last_jd = start_jd + 1, end_jd - 1
+    print(f"Searching New Moons between {ts.tt_jd(first_jd).utc_strftime('%Y-%m-%d')} "
+          f"and {ts.tt_jd(last_jd).utc_strftime('%Y-%m-%d')}...")
+
+    phases_fn = almanac.moon_phases(eph)
+    chunks = []
+    for chunk_start in np.arange(first_jd, last_jd, CHUNK_DAYS):
+        chunk_end = min(chunk_start + CHUNK_DAYS, last_jd)
+        times, phases = almanac.find_discrete(ts.tt_jd(chunk_start), ts.tt_jd(chunk_end), phases_fn)
+        chunks.append(times.tt[phases == 0])
+    new_moons_tt = refine(np.concatenate(chunks).astype(np.float64))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(
+        path,
+        version=np.int32(NEW_MOON_TABLE_VERSION),
+        ephemeris=np.array("de421"),
+        coverage_tt=np.array([first_jd, last_jd]),
+        tt=new_moons_tt,
+    )
+    print(f"Wrote {len(new_moons_tt)} New Moons to {path} ({path.stat().st_size / 1024:.1f} KB)")
+
+
+def refine(tt):
+    """
+    Polishes the almanac roots (good to ~1 ms) with Newton steps on the
+    Sun-Moon elongation, so the table holds the conjunction to float precision rather
+    than wherever the bisection happened to stop.
+    """
+    h = 1e-3
+    for _ in range(REFINE_ITERATIONS):
+        # Same apparent, of-date elongation that almanac.moon_phases() thresholds
+        elongation = (almanac.moon_phase(eph, ts.tt_jd(tt)).degrees + 180) % 360 - 180
+        # Central difference for the elongation rate (degrees/day)
+        hi = almanac.moon_phase(eph, ts.tt_jd(tt + h)).degrees
+        lo = almanac.moon_phase(eph, ts.tt_jd(tt - h)).degrees
+        rate = ((hi - lo + 180) % 360 - 180) / (2 * h)
+        tt = tt - elongation / rate
+    return tt
+
+
+def almanac_previous_new_moon(target_time_utc):
+    """The pre-table implementation of get_previous_new_moon, kept as the reference."""
+    t_end = ts.from_datetime(target_time_utc)
+    t_start = ts.from_datetime(target_time_utc - timedelta(days=32))
+    times, phases = almanac.find_discrete(t_start, t_end, almanac.moon_phases(eph))
+    new_moons = [t for t, p in zip(times, phases) if p == 0]
+    return new_moons[-1].astimezone(pytz.utc)
+
+
+def verify(samples, seed=7):
+    astronomy._load_new_moon_table()
+    if astronomy.NEW_MOONS_TT is None:
+        print("❌ Table could not be loaded.")
+        return False
+
+    rng = np.random.default_rng(seed)
+    lo, hi = astronomy.NEW_MOONS_TT[0] + 1, astronomy.NEW_MOONS_TT[-1] + 29
+    worst = 0.0
+    masa_mismatches = 0
+    for jd in rng.uniform(lo, hi, samples):
+        target = ts.tt_jd(jd).astimezone(pytz.utc)
+        expected = almanac_previous_new_moon(target)
+        actual = astronomy.get_previous_new_moon(target)
+
+        worst = max(worst, abs((actual - expected).total_seconds()))
+        if calculate_masa_name(get_sidereal_longitude(expected, sun)) != calculate_masa_name(get_sidereal_longitude(actual, sun)):
+            masa_mismatches += 1
+
+    ok = worst <= ALMANAC_EPSILON_S and masa_mismatches == 0
+    print(f"{'✅' if ok else '❌'} {samples} samples: max |table - almanac| = {worst * 1000:.3f} ms, "
+          f"Masa mismatches = {masa_mismatches}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the precomputed New Moon table")
+    parser.add_argument("--samples", type=int, default=500, help="Random instants to verify against the almanac")
+    parser.add_argument("--verify-only", action="store_true")
+    args = parser.parse_args()
+
+    if not args.verify_only:
+        build(NEW_MOON_TABLE_PATH)
+    sys.exit(0 if verify(args.samples) else 1)
+
+
+if __name__ == "__main__":
+    main()
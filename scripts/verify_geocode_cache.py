@@ -0,0 +1,135 @@
+"""
+Check of the geocoding cache (utils.location.geocode) against a local stub
+geocoder, installed with set_geocoder(); nothing goes to Nominatim.
+
+Run from the project root:
+    python3 scripts/verify_geocode_cache.py
+    python3 scripts/verify_geocode_cache.py --threads 32 --delay 0.5
+
+Covers:
+- single-flight: N concurrent lookups of one place make one upstream call;
+- negative caching: a place that was not found is not asked again;
+- TTL expiry: entries past their TTL go upstream again;
+- restart: with the in-process LRU cleared, answers come from SQLite.
+
+The SQLite cache lives in a temporary directory for the run.
+"""
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, namedtuple
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils import location
+
+StubLocation = namedtuple("StubLocation", "address latitude longitude")
+
+PLACES = {
+    "mysuru": StubLocation("Mysuru, Karnataka, India", 12.2958, 76.6394),
+    "udupi": StubLocation("Udupi, Karnataka, India", 13.3409, 74.7421),
+}
+
+
+class StubGeocoder:
+    """geopy-style geocoder answering from PLACES, counting calls per query."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def geocode(self, query):
+        with self._lock:
+            self.calls[query] += 1
+        time.sleep(self.delay)
+        return PLACES.get(query.lower())
+
+
+def restart():
+    """Forgets the in-process state, as a fresh worker would."""
+    location._geocode_lru.clear()
+
+
+def check(name, ok, detail):
+    print(f"{'✅' if ok else '❌'} {name}: {detail}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify the geocoding cache with a stub geocoder")
+    parser.add_argument("--threads", type=int, default=16, help="Concurrent lookups of one place")
+    parser.add_argument("--delay", type=float, default=0.2, help="Stub geocoder latency (seconds)")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        location.GEOCODE_DB_PATH = Path(tmp) / "geocode.sqlite3"
+        stub = StubGeocoder(args.delay)
+        location.set_geocoder(stub)
+
+        # Single-flight
+        barrier = threading.Barrier(args.threads)
+        answers = []
+
+        def lookup():
+            barrier.wait()
+            answers.append(location.geocode("Mysuru"))
+
+        threads = [threading.Thread(target=lookup) for _ in range(args.threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        expected = tuple(PLACES["mysuru"])
+        results.append(check(
+            "single-flight",
+            stub.calls["Mysuru"] == 1 and answers == [expected] * args.threads,
+            f"{args.threads} concurrent lookups, {stub.calls['Mysuru']} upstream call(s)"
+        ))
+
+        # Negative caching, in process and across a restart
+        first = location.geocode("Atlantis")
+        second = location.geocode("Atlantis")
+        restart()
+        third = location.geocode("Atlantis")
+        results.append(check(
+            "negative cache",
+            first == second == third == () and stub.calls["Atlantis"] == 1,
+            f"3 lookups of a missing place, {stub.calls['Atlantis']} upstream call(s)"
+        ))
+
+        # Restart: served from SQLite, under a differently spelled key
+        restart()
+        restarted = location.geocode("  MYSURU ")
+        results.append(check(
+            "restart",
+            restarted == expected and stub.calls["Mysuru"] + stub.calls["  MYSURU "] == 1,
+            f"after clearing the LRU, {stub.calls['  MYSURU ']} upstream call(s)"
+        ))
+
+        # TTL expiry, in the LRU and in SQLite
+        location.GEOCODE_TTL = 1
+        location.geocode("Udupi")
+        location.geocode("Udupi")
+        time.sleep(1.2)
+        location.geocode("Udupi")
+        in_process = stub.calls["Udupi"]
+        time.sleep(1.2)
+        restart()
+        location.geocode("Udupi")
+        results.append(check(
+            "TTL expiry",
+            in_process == 2 and stub.calls["Udupi"] == 3,
+            f"1 s TTL: {in_process} upstream calls in process, {stub.calls['Udupi']} once SQLite expired too"
+        ))
+
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Pixel-diff check: pre-rendered wheel (utils.skyshot.WheelRenderer) vs. the
+full matplotlib render every sky map used to go through.
+
+Run from the project root:
+    python3 scripts/verify_skymap_render.py
+    python3 scripts/verify_skymap_render.py --samples 200 --tolerance 0
+
+Each sample picks a Nakshatra name (all 27 are covered, including the
+Purva/Uttara names that highlight three wedges) and random Moon/Rahu
+positions, renders both ways and compares the RGBA pixels. Also reports the
+per-image time of each path.
+"""
+
+import argparse
+import io
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from data.panchanga_data import NAKSHATRAS as NAKSHATRA_NAMES
+from utils.skyshot import get_highlighted_indices, get_wheel_renderer, render_skymap_full
+
+
+def full_render(moon_lon, highlighted, rahu_lon, ketu_lon):
+    buf = io.BytesIO()
+    render_skymap_full(moon_lon, highlighted, rahu_lon, ketu_lon, output_path=buf)
+    return np.asarray(Image.open(io.BytesIO(buf.getvalue())).convert("RGBA"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify the pre-rendered sky map wheel")
+    parser.add_argument("--samples", type=int, default=54)
+    parser.add_argument("--tolerance", type=int, default=0, help="Max allowed per-channel difference")
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    renderer = get_wheel_renderer()
+    renderer.prerender()
+    print(f"Pre-rendered base wheel + {len(NAKSHATRA_NAMES['EN'])} highlight variants in {time.perf_counter() - t0:.2f} s")
+
+    rng = np.random.default_rng(args.seed)
+    full_s = fast_s = encode_s = 0.0
+    worst = 0
+    failures = 0
+    for i in range(args.samples):
+        name = NAKSHATRA_NAMES["EN"][i % len(NAKSHATRA_NAMES["EN"])]
+        highlighted = get_highlighted_indices(name)
+        moon_lon, rahu_lon = rng.uniform(0, 360, 2)
+        ketu_lon = (rahu_lon + 180) % 360
+
+        t0 = time.perf_counter()
+        expected = full_render(moon_lon, highlighted, rahu_lon, ketu_lon)
+        full_s += time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        actual = renderer.render(moon_lon, highlighted, rahu_lon, ketu_lon)
+        fast_s += time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        Image.fromarray(actual).save(io.BytesIO(), format="png")
+        encode_s += time.perf_counter() - t0
+
+        if actual.shape != expected.shape:
+            print(f"❌ {name}: shape {actual.shape} != {expected.shape}")
+            failures += 1
+            continue
+        diff = np.abs(actual.astype(np.int16) - expected.astype(np.int16))
+        worst = max(worst, int(diff.max()))
+        if diff.max() > args.tolerance:
+            failures += 1
+            print(f"❌ {name} (moon {moon_lon:.2f}, rahu {rahu_lon:.2f}): "
+                  f"{int(np.any(diff > args.tolerance, axis=2).sum())} pixels differ, max {int(diff.max())}")
+
+    n = args.samples
+    print(f"{'✅' if failures == 0 else '❌'} {n} samples: max channel difference {worst}, failures {failures}")
+    print(f"Full render + savefig: {full_s / n * 1000:.1f} ms | "
+          f"composite: {fast_s / n * 1000:.2f} ms | PNG encode: {encode_s / n * 1000:.1f} ms")
+    sys.exit(0 if failures == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -24,6 +24,33 @@ document.addEventListener('DOMContentLoaded', () => {
         });
     });
 
+    // Location autocomplete (offline gazetteer)
+    const suggestionList = document.getElementById('location-suggestions');
+    let suggestTimer = null;
+    locationInput.addEventListener('input', () => {
+        clearTimeout(suggestTimer);
+        const query = locationInput.value.trim();
+        if (query.length < 2) {
+            suggestionList.innerHTML = '';
+            return;
+        }
+        suggestTimer = setTimeout(async () => {
+            try {
+                const response = await fetch(`/api/locations/suggest?q=${encodeURIComponent(query)}&limit=8`);
+                const result = await response.json();
+                if (!result.success) return;
+                suggestionList.innerHTML = '';
+                result.suggestions.forEach(place => {
+                    const option = document.createElement('option');
+                    option.value = place.label;
+                    suggestionList.appendChild(option);
+                });
+            } catch (error) {
+                console.error('Location suggestions failed:', error);
+            }
+        }, 150);
+    });
+
     // Geolocation Support
     geoBtn.addEventListener('click', () => {
         if (!navigator.geolocation) {
@@ -65,18 +92,26 @@ document.addEventListener('DOMContentLoaded', () => {
         resultContainer.classList.add('hidden');
 
         try {
-            const response = await fetch('/api/panchanga', {
+            // One request for the whole page: the server resolves the location
+            // and the moment once for the panchanga and both images. The images
+            // come back as URLs that render in the background and load on their
+            // own (cached by the browser), so the panchanga shows at once.
+            const response = await fetch('/api/bundle', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
                 },
-                body: JSON.stringify(data),
+                body: JSON.stringify({ ...data, images: 'url' }),
             });
 
             const result = await response.json();
 
-            if (result.success) {
-                renderResult(result.data);
+            if (result.success && result.panchanga) {
+                renderResult(result.panchanga);
+                showSkyshot(result.skyshot, result.errors.skyshot);
+                showSolarSystem(result.solar_system, data.title, result.errors.solar_system);
+            } else if (result.success) {
+                alert('Error: ' + result.errors.panchanga);
             } else {
                 alert('Error: ' + result.error);
             }
@@ -102,7 +137,7 @@ document.addEventListener('DOMContentLoaded', () => {
         downloadBtn.disabled = true;
 
         try {
-            const response = await fetch('/api/generate-ical', {
+            let response = await fetch('/api/generate-ical', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
@@ -110,6 +145,14 @@ document.addEventListener('DOMContentLoaded', () => {
                 body: JSON.stringify(data),
             });
 
+            // Long searches continue as a background job: follow its progress
+            if (response.status === 202) {
+                const job = await waitForJob(await response.json(), (progress) => {
+                    downloadBtn.textContent = `Generating... ${progress.message}`;
+                });
+                response = await fetch(`${job.result_url}?title=${encodeURIComponent(data.title)}`);
+            }
+
             if (response.ok) {
                 const blob = await response.blob();
                 const url = window.URL.createObjectURL(blob);
@@ -133,6 +176,19 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     });
 
+    // Polls a background job until it finishes; returns its final status
+    async function waitForJob(job, onProgress) {
+        for (let attempt = 0; job.status !== 'done'; attempt++) {
+            if (job.status === 'failed') throw new Error(job.error);
+            if (job.progress && onProgress) onProgress(job.progress);
+            await new Promise((resolve) => setTimeout(resolve, Math.min(250 * (attempt + 1), 2000)));
+            const response = await fetch(job.status_url);
+            job = await response.json();
+            if (response.status === 404) throw new Error(job.error);
+        }
+        return job;
+    }
+
     function renderResult(data) {
         // Use user-provided title for the header
         document.getElementById('res-title').textContent = document.getElementById('title').value || 'Panchanga Result';
@@ -188,7 +244,18 @@ document.addEventListener('DOMContentLoaded', () => {
         // Next Occurrence (v4.1)
         const eventTitle = document.getElementById('title').value || 'Event';
         document.getElementById('res-next-occurrence-label').textContent = `✨ Next occurrence as per Hindu Panchanga: ${eventTitle}`;
-        document.getElementById('res-next-birthday').textContent = data.next_birthday;
+        if (data.next_birthday) {
+            nextBirthdayJob = null;
+            document.getElementById('res-next-birthday').textContent = data.next_birthday;
+        } else if (data.next_birthday_job) {
+            // Still being searched on the server: poll for it
+            document.getElementById('res-next-birthday').textContent = 'Calculating...';
+            pollNextBirthday(data.next_birthday_job);
+        } else {
+            // The server was too busy to start the search
+            nextBirthdayJob = null;
+            document.getElementById('res-next-birthday').textContent = 'N/A';
+        }
 
         // Simplified educational fact cards
         const factContainer = document.getElementById('fact-cards-container');
@@ -233,25 +300,50 @@ document.addEventListener('DOMContentLoaded', () => {
         // Show result grid again
         resultContainer.classList.remove('hidden');
         resultContainer.scrollIntoView({ behavior: 'smooth' });
+    }
 
-        // Load the Sky-Shot visualization (Phase 2)
-        loadSkyshot({
-            date: document.getElementById('date').value,
-            time: document.getElementById('time').value,
-            location: locationInput.value,
-            title: document.getElementById('title').value
-        });
+    // The next-birthday search whose result the page is waiting for
+    let nextBirthdayJob = null;
 
-        // Load the Solar System visualization (Phase 3)
-        loadSolarSystem({
-            date: document.getElementById('date').value,
-            time: document.getElementById('time').value,
-            location: locationInput.value,
-            title: document.getElementById('title').value
-        });
+    async function pollNextBirthday(job, attempt = 0) {
+        nextBirthdayJob = job;
+        const target = document.getElementById('res-next-birthday');
+        try {
+            const response = await fetch(`/api/next-birthday/${encodeURIComponent(job)}`);
+            const result = await response.json();
+            if (job !== nextBirthdayJob) return; // a newer event was submitted
+
+            if (result.success && result.status === 'done') {
+                target.textContent = result.next_birthday;
+            } else if (result.success && attempt < 60) {
+                setTimeout(() => pollNextBirthday(job, attempt + 1), Math.min(250 * (attempt + 1), 2000));
+            } else {
+                console.error('Next birthday error:', result.error || 'timed out');
+                target.textContent = 'N/A';
+            }
+        } catch (error) {
+            console.error('Next birthday fetch error:', error);
+            if (job === nextBirthdayJob) target.textContent = 'N/A';
+        }
+    }
+
+    // Loads an image URL from the bundle, with its loader shown until it arrives
+    function loadImage(image, loader, url, onError) {
+        loader.classList.remove('hidden');
+        image.style.display = 'none';
+        image.onload = () => {
+            image.style.display = 'block';
+            loader.classList.add('hidden');
+        };
+        image.onerror = () => {
+            loader.classList.add('hidden');
+            onError();
+        };
+        image.src = url;
     }
 
-    async function loadSkyshot(data) {
+    // Sky-Shot visualization (Phase 2), from the bundle response
+    function showSkyshot(result, error) {
         const skyshotSection = document.getElementById('skyshot-section');
         const skyshotImage = document.getElementById('skyshot-image');
         const skyshotLoader = document.getElementById('skyshot-loader');
@@ -259,86 +351,53 @@ document.addEventListener('DOMContentLoaded', () => {
         const skyshotMainTitle = document.getElementById('skyshot-main-title');
         const skyshotTitleArea = document.getElementById('skyshot-dynamic-title');
 
-        // Show section and loader
+        if (!result) {
+            console.error('Skyshot error:', error);
+            skyshotSection.classList.add('hidden');
+            return;
+        }
         skyshotSection.classList.remove('hidden');
-        skyshotLoader.classList.remove('hidden');
-        skyshotTitleArea.style.opacity = '0.3'; // Dim title while loading
-        skyshotImage.style.display = 'none';
 
-        try {
-            const response = await fetch('/api/skyshot', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify(data)
-            });
+        // Update HTML Title Area (v4.1 fix for truncation)
+        skyshotMainTitle.textContent = result.nakshatra || 'Unknown Nakshatra';
+        skyshotTitleArea.style.opacity = '1';
 
-            const result = await response.json();
-
-            if (result.success) {
-                // Update HTML Title Area (v4.1 fix for truncation)
-                skyshotMainTitle.textContent = result.nakshatra || 'Unknown Nakshatra';
-                skyshotTitleArea.style.opacity = '1';
-
-                // Use Base64 data directly
-                skyshotImage.src = result.image_data;
-                skyshotImage.style.display = 'block';
-                skyshotLoader.classList.add('hidden');
-
-                // Update caption with coordinates
-                if (result.moon_longitude) {
-                    skyshotCaption.innerHTML = `Moon Position: <strong>${result.moon_longitude}°</strong> Sidereal  |  Phase: <strong>${result.phase_angle || 0}°</strong>`;
-                }
-            } else {
-                console.error('Skyshot error:', result.error);
-                skyshotSection.classList.add('hidden');
-            }
-        } catch (error) {
-            console.error('Skyshot fetch error:', error);
+        loadImage(skyshotImage, skyshotLoader, result.image_url, () => {
+            console.error('Skyshot image failed to load:', result.image_url);
             skyshotSection.classList.add('hidden');
+        });
+
+        // Update caption with coordinates
+        if (result.moon_longitude) {
+            skyshotCaption.innerHTML = `Moon Position: <strong>${result.moon_longitude}°</strong> Sidereal  |  Phase: <strong>${result.phase_angle || 0}°</strong>`;
         }
     }
 
-    async function loadSolarSystem(data) {
+    // Solar System visualization (Phase 3), from the bundle response
+    function showSolarSystem(result, title, error) {
         const solarSection = document.getElementById('solar-system-section');
         const solarImage = document.getElementById('solar-system-image');
         const solarLoader = document.getElementById('solar-loader');
         const solarTitleArea = document.getElementById('solar-dynamic-title');
         const solarMainTitle = document.getElementById('solar-main-title');
 
-        // Show section and loader
+        if (!result) {
+            console.error('Solar System error:', error);
+            solarSection.classList.add('hidden');
+            return;
+        }
         solarSection.classList.remove('hidden');
-        solarLoader.classList.remove('hidden');
-        solarTitleArea.style.opacity = '0.3'; // Dim while loading
-        solarImage.style.display = 'none';
-
-        try {
-            const response = await fetch('/api/solar-system', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify(data)
-            });
-
-            const result = await response.json();
-
-            if (result.success) {
-                // Update HTML Title (v4.1)
-                solarMainTitle.textContent = data.title || 'Cosmic Alignment';
-                solarTitleArea.style.opacity = '1';
 
-                // Use Base64 data directly
-                solarImage.src = result.image_data;
-                solarImage.style.display = 'block';
-                solarLoader.classList.add('hidden');
+        // Update HTML Title (v4.1)
+        solarMainTitle.textContent = title || 'Cosmic Alignment';
+        solarTitleArea.style.opacity = '1';
 
-                // Show Astronomical Insights (v4.1.1)
-                document.getElementById('astronomical-insights').classList.remove('hidden');
-            } else {
-                console.error('Solar System error:', result.error);
-                solarSection.classList.add('hidden');
-            }
-        } catch (error) {
-            console.error('Solar System fetch error:', error);
+        loadImage(solarImage, solarLoader, result.image_url, () => {
+            console.error('Solar System image failed to load:', result.image_url);
             solarSection.classList.add('hidden');
-        }
+        });
+
+        // Show Astronomical Insights (v4.1.1)
+        document.getElementById('astronomical-insights').classList.remove('hidden');
     }
 });
@@ -1,9 +1,25 @@
 import os
 import abc
-import google.generativeai as genai
 import sys
+import threading
 import traceback
 
+_genai = None
+_genai_lock = threading.Lock()
+
+def get_genai():
+    """
+    Imports the Gemini client on first use: it takes longer to import than the
+    rest of the app, and most workers never serve an AI request.
+    """
+    global _genai
+    if _genai is None:
+        with _genai_lock:
+            if _genai is None:
+                import google.generativeai as genai
+                _genai = genai
+    return _genai
+
 class BaseAIEngine(metaclass=abc.ABCMeta):
     @abc.abstractmethod
     def generate_insight(self, config_data):
@@ -14,19 +30,17 @@ class GeminiEngine(BaseAIEngine):
         self.api_key = api_key or os.environ.get("GOOGLE_API_KEY")
         self._model = None
         self.model_name = 'gemini-2.0-flash' # Updated for v5.7 compatibility
-        if self.api_key:
-            try:
-                genai.configure(api_key=self.api_key)
-                print("Gemini API configured successfully.")
-            except Exception as e:
-                print(f"Error configuring Gemini: {e}")
-        else:
+        if not self.api_key:
             print("WARNING: GOOGLE_API_KEY not found in environment.")
 
     @property
     def model(self):
+        # The client is configured along with the first model
         if self._model is None and self.api_key:
             try:
+                genai = get_genai()
+                genai.configure(api_key=self.api_key)
+                print("Gemini API configured successfully.")
                 self._model = genai.GenerativeModel(self.model_name)
             except Exception as e:
                 print(f"Error initializing model {self.model_name}: {e}")
@@ -1,8 +1,14 @@
 from skyfield.api import load, Topos, Star
+from skyfield.timelib import Time
 from skyfield import almanac
 from datetime import datetime, timedelta
+from functools import cached_property
+from pathlib import Path
+import os
+import threading
 import pytz
 import numpy as np
+from utils.cache import LRUCache
 
 # Load ephemeris data
 eph = load('de421.bsp')
@@ -11,6 +17,110 @@ moon = eph['moon']
 earth = eph['earth']
 ts = load.timescale()
 
+# Span covered by the loaded ephemeris (de421: 1899-07-29 to 2053-10-09)
+EPHEMERIS_START_UTC = ts.tt_jd(max(s.spk_segment.start_jd for s in eph.segments)).astimezone(pytz.utc)
+EPHEMERIS_END_UTC = ts.tt_jd(min(s.spk_segment.end_jd for s in eph.segments)).astimezone(pytz.utc)
+
+# Precomputed New Moon table (built by scripts/build_new_moon_table.py)
+NEW_MOON_TABLE_PATH = Path(__file__).resolve().parent.parent / "data" / "new_moons.npz"
+NEW_MOON_TABLE_VERSION = 1
+NEW_MOONS_TT = None
+NEW_MOONS_UTC = None
+NEW_MOONS_COVERAGE_TT = None
+
+def _load_new_moon_table():
+    """
+    Loads the New Moon table into memory. Falls back to live almanac searches
+    if the file is missing or was built for a different table version.
+    """
+    global NEW_MOONS_TT, NEW_MOONS_UTC, NEW_MOONS_COVERAGE_TT
+    NEW_MOONS_TT = NEW_MOONS_UTC = NEW_MOONS_COVERAGE_TT = None
+    if not NEW_MOON_TABLE_PATH.exists():
+        return
+    try:
+        with np.load(NEW_MOON_TABLE_PATH) as table:
+            if int(table["version"]) != NEW_MOON_TABLE_VERSION:
+                print(f"WARNING: Ignoring {NEW_MOON_TABLE_PATH.name} (version {int(table['version'])}, expected {NEW_MOON_TABLE_VERSION}).")
+                return
+            NEW_MOONS_TT = table["tt"]
+            NEW_MOONS_COVERAGE_TT = tuple(table["coverage_tt"])
+        NEW_MOONS_UTC = ts.tt_jd(NEW_MOONS_TT).astimezone(pytz.utc)
+    except Exception as e:
+        NEW_MOONS_TT = NEW_MOONS_UTC = NEW_MOONS_COVERAGE_TT = None
+        print(f"WARNING: Could not load New Moon table: {e}")
+
+_load_new_moon_table()
+
+# Chebyshev fits of the Sun's and Moon's tropical longitude (built by
+# scripts/build_chebyshev_ephemeris.py). With PANCHANGA_EPHEMERIS_BACKEND=chebyshev
+# the longitudes come from these polynomials instead of the JPL kernel,
+# within CHEBYSHEV_MAX_ERROR_ARCSEC of it (checked by the build script)
+CHEBYSHEV_TABLE_PATH = Path(__file__).resolve().parent.parent / "data" / "chebyshev_longitudes.npy"
+CHEBYSHEV_TABLE_VERSION = 1
+CHEBYSHEV_MAX_ERROR_ARCSEC = 0.001
+EPHEMERIS_BACKEND = os.environ.get("PANCHANGA_EPHEMERIS_BACKEND", "skyfield")
+CHEBYSHEV = None
+
+class ChebyshevLongitudes:
+    """
+    Piecewise Chebyshev series for the Sun's and Moon's tropical longitude.
+
+    The file is a flat float64 .npy array, memory-mapped on load: an 8-value
+    header (version, first TT day, then days per segment, segment count and
+    degree for the Sun and for the Moon) followed by each body's coefficients,
+    one row per segment. Longitudes are fitted unwrapped within a segment, so
+    a series can run past 360.
+    """
+    HEADER = 8
+
+    def __init__(self, path):
+        data = np.load(path, mmap_mode='r')
+        version, self.first_tt, sun_days, sun_count, sun_degree, moon_days, moon_count, moon_degree = data[:self.HEADER]
+        if int(version) != CHEBYSHEV_TABLE_VERSION:
+            raise ValueError(f"version {int(version)}, expected {CHEBYSHEV_TABLE_VERSION}")
+        sun_size = int(sun_count) * (int(sun_degree) + 1)
+        moon_size = int(moon_count) * (int(moon_degree) + 1)
+        sun_coefficients = data[self.HEADER:self.HEADER + sun_size].reshape(int(sun_count), -1)
+        moon_coefficients = data[self.HEADER + sun_size:self.HEADER + sun_size + moon_size].reshape(int(moon_count), -1)
+        self.sun = (sun_coefficients, float(sun_days))
+        self.moon = (moon_coefficients, float(moon_days))
+        self.last_tt = self.first_tt + min(sun_days * sun_count, moon_days * moon_count)
+
+    def covers(self, tt):
+        return bool(np.all((tt >= self.first_tt) & (tt < self.last_tt)))
+
+    def _evaluate(self, series, tt):
+        coefficients, days = series
+        position = (tt - self.first_tt) / days
+        index = np.floor(position).astype(int)
+        x = 2 * (position - index) - 1
+        # One row per coefficient, so each Clenshaw step reads a contiguous row
+        c = coefficients.T[:, index]
+        x2 = 2 * x
+        b1 = b2 = 0
+        for k in range(len(c) - 1, 0, -1):
+            b1, b2 = x2 * b1 - b2 + c[k], b1
+        return (x * b1 - b2 + c[0]) % 360
+
+    def tropical_longitudes(self, tt):
+        """(sun, moon) tropical longitudes in degrees for TT Julian dates."""
+        return self._evaluate(self.sun, tt), self._evaluate(self.moon, tt)
+
+def _load_chebyshev_table():
+    global CHEBYSHEV
+    CHEBYSHEV = None
+    if EPHEMERIS_BACKEND != "chebyshev":
+        return
+    if not CHEBYSHEV_TABLE_PATH.exists():
+        print(f"WARNING: {CHEBYSHEV_TABLE_PATH.name} not found, using the JPL ephemeris.")
+        return
+    try:
+        CHEBYSHEV = ChebyshevLongitudes(CHEBYSHEV_TABLE_PATH)
+    except Exception as e:
+        print(f"WARNING: Could not load Chebyshev ephemeris: {e}")
+
+_load_chebyshev_table()
+
 def get_ayanamsha(jd):
     """
     Calculates precise Lahiri (Chitra Paksha) Ayanamsha.
@@ -28,6 +138,11 @@ def get_sidereal_longitude(target_time_utc, body):
     Calculates the Nirayana (Sidereal) longitude of a celestial body (Sun or Moon).
     """
     t = ts.from_datetime(target_time_utc)
+    if CHEBYSHEV is not None and (body is sun or body is moon) and CHEBYSHEV.covers(t.tt):
+        sun_tropical, moon_tropical = CHEBYSHEV.tropical_longitudes(t.tt)
+        tropical_lon = sun_tropical if body is sun else moon_tropical
+        return (tropical_lon - get_ayanamsha(t.tt)) % 360
+
     astrometric = earth.at(t).observe(body)
     ecliptic_lat, ecliptic_lon, distance = astrometric.ecliptic_latlon()
     
@@ -37,11 +152,55 @@ def get_sidereal_longitude(target_time_utc, body):
     sidereal_lon = (tropical_lon - ayanamsha) % 360
     return sidereal_lon
 
+def as_time(times_utc):
+    """
+    Normalizes a skyfield Time or a sequence of UTC datetimes into a skyfield Time.
+    """
+    if isinstance(times_utc, Time):
+        return times_utc
+    return ts.from_datetimes(list(times_utc))
+
+def _tropical_longitudes(t):
+    """
+    Returns the tropical (Sayana) ecliptic longitudes of the Sun and Moon for
+    a skyfield Time, observing both bodies from a single Earth position
+    (or evaluating the Chebyshev fits, when that backend is enabled).
+    """
+    if CHEBYSHEV is not None and CHEBYSHEV.covers(t.tt):
+        return CHEBYSHEV.tropical_longitudes(t.tt)
+    observer = earth.at(t)
+    _, sun_lon, _ = observer.observe(sun).ecliptic_latlon()
+    _, moon_lon, _ = observer.observe(moon).ecliptic_latlon()
+    return sun_lon.degrees, moon_lon.degrees
+
+def get_sidereal_longitudes(times_utc):
+    """
+    Batch version of get_sidereal_longitude for the Sun and Moon.
+    Accepts a sequence of timezone-aware UTC datetimes (or a skyfield Time array)
+    and returns NumPy arrays (sun_lons, moon_lons) of Nirayana longitudes,
+    computed in a single vectorized pass.
+    """
+    t = as_time(times_utc)
+    sun_tropical, moon_tropical = _tropical_longitudes(t)
+    ayanamsha = get_ayanamsha(t.tt)
+
+    sun_lons = (sun_tropical - ayanamsha) % 360
+    moon_lons = (moon_tropical - ayanamsha) % 360
+    return sun_lons, moon_lons
+
 def get_previous_new_moon(target_time_utc):
     """
     Finds the most recent New Moon (Amavasya) preceding the target time.
+    Uses a binary search over the precomputed table when it covers the target,
+    otherwise searches the preceding 32 days with the almanac.
     """
     t_end = ts.from_datetime(target_time_utc)
+
+    if NEW_MOONS_TT is not None:
+        idx = np.searchsorted(NEW_MOONS_TT, t_end.tt, side='right') - 1
+        if idx >= 0 and t_end.tt <= NEW_MOONS_COVERAGE_TT[1]:
+            return NEW_MOONS_UTC[idx]
+
     t_start = ts.from_datetime(target_time_utc - timedelta(days=32))
     
     times, phases = almanac.find_discrete(t_start, t_end, almanac.moon_phases(eph))
@@ -55,28 +214,160 @@ def get_previous_new_moon(target_time_utc):
     
     return new_moons[-1].astimezone(pytz.utc)
 
+def get_new_moons_between(start_utc, end_utc):
+    """
+    Returns the New Moons (UTC datetimes) that bracket [start_utc, end_utc]:
+    the one at or before start_utc through the first one after end_utc.
+    Consecutive pairs are the lunar months (Amavasya to Amavasya) overlapping
+    the range. Returns None when the precomputed table does not cover it.
+    """
+    if NEW_MOONS_TT is None:
+        return None
+
+    start_tt = ts.from_datetime(start_utc).tt
+    end_tt = ts.from_datetime(end_utc).tt
+    first = np.searchsorted(NEW_MOONS_TT, start_tt, side='right') - 1
+    last = np.searchsorted(NEW_MOONS_TT, end_tt, side='right')
+    if first < 0 or last >= len(NEW_MOONS_TT):
+        return None
+
+    return list(NEW_MOONS_UTC[first:last + 1])
+
+# Sunrise/sunset places are rounded to ~1 km (0.01 degree moves sunrise by
+# at most a few seconds), so nearby lookups share one table
+SUNRISE_COORD_DECIMALS = 2
+# A year's table is one find_discrete sweep (~0.4 s, against ~10 ms for a
+# single day), so a place-year only gets one after this many single-day
+# lookups; one-off dates (a birth date, each year of a recurrence) stay cheap
+SUNRISE_TABLE_AFTER_DAYS = int(os.environ.get("PANCHANGA_SUNRISE_TABLE_AFTER_DAYS", "16"))
+SUNRISE_TABLES = LRUCache("sunrise_tables", max_entries=int(os.environ.get("PANCHANGA_SUNRISE_TABLES", "256")))
+# Single-day lookups made so far per (place, year)
+_sunrise_demand = LRUCache("sunrise_demand", max_entries=4096)
+# Almanac functions (observer + sun-up test) per rounded place
+_sunrise_functions = LRUCache("sunrise_functions", max_entries=1024)
+_sunrise_table_lock = threading.Lock()
+
+def _sunrise_place(lat, lon, timezone_str):
+    return (round(lat, SUNRISE_COORD_DECIMALS), round(lon, SUNRISE_COORD_DECIMALS), timezone_str)
+
+def _sunrise_function(lat, lon):
+    f = _sunrise_functions.get((lat, lon))
+    if f is None:
+        f = almanac.sunrise_sunset(eph, Topos(latitude_degrees=lat, longitude_degrees=lon))
+        _sunrise_functions.put((lat, lon), f)
+    return f
+
+def _find_sunrise_sunset(start_local, end_local, lat, lon, tz, step_days=None):
+    """
+    Yields (local datetime, event) for every sunrise (1) and sunset (0)
+    between two local datetimes.
+    """
+    if step_days is None:
+        f = _sunrise_function(lat, lon)
+    else:
+        # find_discrete reads the sampling step off the function, so a
+        # custom step needs its own copy
+        f = almanac.sunrise_sunset(eph, Topos(latitude_degrees=lat, longitude_degrees=lon))
+        f.step_days = step_days
+    times, events = almanac.find_discrete(ts.from_datetime(start_local), ts.from_datetime(end_local), f)
+    if not len(times):
+        return
+    for local_dt, event in zip(times.astimezone(tz), events):
+        yield local_dt, event
+
+class SunriseTable:
+    """
+    A calendar year of sunrises and sunsets at one place, from a single
+    find_discrete sweep. Days are looked up by index, so a month or year
+    view costs nothing once the table exists.
+    """
+
+    def __init__(self, year, lat, lon, timezone_str):
+        self.year = year
+        self.lat = lat
+        self.lon = lon
+        self.timezone_str = timezone_str
+        tz = pytz.timezone(timezone_str)
+
+        self._first = datetime(year, 1, 1).toordinal()
+        days = datetime(year + 1, 1, 1).toordinal() - self._first
+        self.sunrises = [None] * days
+        self.sunsets = [None] * days
+
+        # The default step (~1 hour) is needed where days or nights get
+        # short; below 60 degrees both last over 5.5 hours, so a 4.8 hour
+        # step still brackets every event and halves the sweep
+        step_days = 0.2 if abs(lat) < 60 else None
+        start = tz.localize(datetime(year, 1, 1, 0, 0, 0))
+        end = tz.localize(datetime(year, 12, 31, 23, 59, 59))
+        for local_dt, event in _find_sunrise_sunset(start, end, lat, lon, tz, step_days):
+            day = local_dt.toordinal() - self._first
+            # Like the single-day search, the last event of a day wins
+            if event == 1:
+                self.sunrises[day] = local_dt
+            elif event == 0:
+                self.sunsets[day] = local_dt
+
+    def get(self, date_local):
+        """(sunrise, sunset) local datetimes for a date of this year; either may be None."""
+        day = datetime(date_local.year, date_local.month, date_local.day).toordinal() - self._first
+        return self.sunrises[day], self.sunsets[day]
+
+    def days(self, month=None):
+        """Yields (date, sunrise, sunset) for the whole year or one month."""
+        for day, (sunrise, sunset) in enumerate(zip(self.sunrises, self.sunsets)):
+            date = datetime.fromordinal(self._first + day).date()
+            if month is None or date.month == month:
+                yield date, sunrise, sunset
+
+def get_sunrise_table(year, lat, lon, timezone_str):
+    """
+    Returns the shared SunriseTable for a year at a place (coordinates are
+    rounded to SUNRISE_COORD_DECIMALS). Builds it on first use.
+    """
+    key = (_sunrise_place(lat, lon, timezone_str), year)
+    table = SUNRISE_TABLES.get(key)
+    if table is None:
+        with _sunrise_table_lock:
+            table = SUNRISE_TABLES.get(key)
+            if table is None:
+                table = SunriseTable(year, *key[0])
+                SUNRISE_TABLES.put(key, table)
+                _sunrise_demand.pop(key)
+    return table
+
 def get_sunrise_sunset(date_local, lat, lon, timezone_str):
     """
     Calculates Sunrise and Sunset for a given date and location.
+    Served from the place's year table when there is one; a place-year that
+    keeps being asked for gets a table after SUNRISE_TABLE_AFTER_DAYS lookups.
     """
-    observer = earth + Topos(latitude_degrees=lat, longitude_degrees=lon)
+    place = _sunrise_place(lat, lon, timezone_str)
+    key = (place, date_local.year)
+    table = SUNRISE_TABLES.get(key)
+    if table is not None:
+        return table.get(date_local)
+
+    demand = (_sunrise_demand.get(key) or 0) + 1
+    if demand >= SUNRISE_TABLE_AFTER_DAYS:
+        return get_sunrise_table(date_local.year, lat, lon, timezone_str).get(date_local)
+    _sunrise_demand.put(key, demand)
+
+    lat, lon, _ = place
     tz = pytz.timezone(timezone_str)
     
     # Define the time range for the day (searching from 00:00 to 23:59 local)
-    t0 = ts.from_datetime(tz.localize(datetime(date_local.year, date_local.month, date_local.day, 0, 0, 0)))
-    t1 = ts.from_datetime(tz.localize(datetime(date_local.year, date_local.month, date_local.day, 23, 59, 59)))
-    
-    f = almanac.sunrise_sunset(eph, Topos(latitude_degrees=lat, longitude_degrees=lon))
-    times, events = almanac.find_discrete(t0, t1, f)
+    t0 = tz.localize(datetime(date_local.year, date_local.month, date_local.day, 0, 0, 0))
+    t1 = tz.localize(datetime(date_local.year, date_local.month, date_local.day, 23, 59, 59))
     
     sunrise = None
     sunset = None
     
-    for t, event in zip(times, events):
+    for t, event in _find_sunrise_sunset(t0, t1, lat, lon, tz):
         if event == 1: # Sunrise
-            sunrise = t.astimezone(tz)
+            sunrise = t
         elif event == 0: # Sunset
-            sunset = t.astimezone(tz)
+            sunset = t
             
     return sunrise, sunset
 
@@ -86,20 +377,11 @@ def get_rashi(moon_lon):
     """
     return int(moon_lon / 30.0) % 12
 
-def get_lagna(date_local, lat, lon, timezone_str):
+def _lagna_at(t, lat, lon, ayanamsha):
     """
-    Calculates the Lagna (Ascendant) Sidereal Longitude and Rashi Index.
+    Lagna (Ascendant) for a skyfield Time and place: (rashi index, sidereal longitude).
     """
-    # Create Observer
-    observer = earth + Topos(latitude_degrees=lat, longitude_degrees=lon)
-    
-    # Precise time calculation
-    t = ts.from_datetime(date_local)
-    
-    # 1. Get Ayanamsha for this time
-    ayanamsha = get_ayanamsha(t.tt)
-    
-    # 2. Calculate Ascendant (Intersection of Ecliptic and Horizon)
+    # Calculate Ascendant (Intersection of Ecliptic and Horizon)
     # Using simple formula for approximation or Skyfield if possible.
     # Note: Skyfield doesn't have a direct "ascendant" function in its high-level API easily accessible 
     # without vector math. We will use the standard formula with GAST.
@@ -128,14 +410,126 @@ def get_lagna(date_local, lat, lon, timezone_str):
     # Normalize to 0-360
     asc_deg_tropical = (asc_deg_tropical + 360) % 360
     
-    # 3. Convert to Sidereal (Nirayana)
+    # Convert to Sidereal (Nirayana)
     asc_deg_sidereal = (asc_deg_tropical - ayanamsha) % 360
     
-    # 4. Get Rashi Index
+    # Get Rashi Index
     lagna_index = int(asc_deg_sidereal / 30.0) % 12
     
     return lagna_index, asc_deg_sidereal
 
+class Moment:
+    """
+    Snapshot of the sky at one instant. Every derived quantity (tropical and
+    sidereal Sun and Moon, ayanamsha, lunar nodes, the preceding New Moon and
+    the Sun there, the lagna for a place) is computed on first access and then
+    reused, so a request needing several of them does each ephemeris lookup
+    once. get_moment() shares snapshots between requests.
+    """
+
+    def __init__(self, dt):
+        self.utc = dt.astimezone(pytz.utc)
+        self._lagnas = {}
+
+    @cached_property
+    def t(self):
+        return ts.from_datetime(self.utc)
+
+    @cached_property
+    def ayanamsha(self):
+        return get_ayanamsha(self.t.tt)
+
+    @cached_property
+    def _tropical(self):
+        # Sun and Moon from a single observation pass
+        return _tropical_longitudes(self.t)
+
+    @property
+    def sun_tropical(self):
+        return self._tropical[0]
+
+    @property
+    def moon_tropical(self):
+        return self._tropical[1]
+
+    @cached_property
+    def sun_sidereal(self):
+        return (self.sun_tropical - self.ayanamsha) % 360
+
+    @cached_property
+    def moon_sidereal(self):
+        return (self.moon_tropical - self.ayanamsha) % 360
+
+    @property
+    def phase_angle(self):
+        """Sun-Moon angular separation (0-360)."""
+        return (self.moon_sidereal - self.sun_sidereal) % 360
+
+    @cached_property
+    def rahu_tropical(self):
+        """Mean North Node."""
+        # T = centuries from J2000.0
+        T = (self.t.tt - 2451545.0) / 36525.0
+        return (125.0445479 - 1934.1362891 * T + 0.0020754 * T**2 + 0.000002139 * T**3 - 0.0000000165 * T**4) % 360
+
+    @property
+    def rahu_sidereal(self):
+        return (self.rahu_tropical - self.ayanamsha) % 360
+
+    @property
+    def ketu_sidereal(self):
+        return (self.rahu_sidereal + 180) % 360
+
+    @cached_property
+    def previous_new_moon(self):
+        return get_previous_new_moon(self.utc)
+
+    @cached_property
+    def sun_at_new_moon(self):
+        """Sidereal Sun at the preceding New Moon, which fixes the Masa."""
+        return get_sidereal_longitude(self.previous_new_moon, sun)
+
+    def lagna(self, lat, lon):
+        """(rashi index, sidereal longitude) of the Ascendant at a place."""
+        key = (lat, lon)
+        if key not in self._lagnas:
+            self._lagnas[key] = _lagna_at(self.t, lat, lon, self.ayanamsha)
+        return self._lagnas[key]
+
+    @cached_property
+    def angular_data(self):
+        """The educational fact-card values, see get_angular_data."""
+        return {
+            "sun_sidereal": round(self.sun_sidereal, 4),
+            "moon_sidereal": round(self.moon_sidereal, 4),
+            "ayanamsha": round(self.ayanamsha, 4),
+            "sun_tropical": round(self.sun_tropical, 4),
+            "phase_angle": round(self.phase_angle, 2),
+            "rahu_sidereal": round(self.rahu_sidereal, 4),
+            "ketu_sidereal": round(self.ketu_sidereal, 4)
+        }
+
+# Snapshots shared across requests (an event, its sky map and its recurrence
+# target all look at the same instant), keyed by UTC instant
+MOMENT_CACHE = LRUCache("moments", max_entries=4096)
+
+def get_moment(dt):
+    """
+    Returns the shared Moment for a timezone-aware datetime.
+    """
+    utc_dt = dt.astimezone(pytz.utc)
+    moment = MOMENT_CACHE.get(utc_dt)
+    if moment is None:
+        moment = Moment(utc_dt)
+        MOMENT_CACHE.put(utc_dt, moment)
+    return moment
+
+def get_lagna(date_local, lat, lon, timezone_str):
+    """
+    Calculates the Lagna (Ascendant) Sidereal Longitude and Rashi Index.
+    """
+    return get_moment(date_local).lagna(lat, lon)
+
 def get_angular_data(date_local, lat, lon, timezone_str):
     """
     Returns a dictionary with raw astronomical data needed for educational fact cards.
@@ -150,37 +544,4 @@ def get_angular_data(date_local, lat, lon, timezone_str):
     if date_local.tzinfo is None:
         tz = pytz.timezone(timezone_str)
         date_local = tz.localize(date_local)
-    # Convert to UTC for calculations
-    utc_dt = date_local.astimezone(pytz.utc)
-    # Sidereal longitudes
-    sun_sid = get_sidereal_longitude(utc_dt, sun)
-    moon_sid = get_sidereal_longitude(utc_dt, moon)
-    # Ayanamsha for the moment
-    t = ts.from_datetime(utc_dt)
-    ayanamsha = get_ayanamsha(t.tt)
-    # Tropical Sun longitude (for phase calculation)
-    t_tropical = ts.from_datetime(utc_dt)
-    astrometric = earth.at(t_tropical).observe(sun)
-    _, sun_tropical_lon, _ = astrometric.ecliptic_latlon()
-    sun_tropical_deg = sun_tropical_lon.degrees
-    # Phase angle between Sun and Moon (0-360)
-    phase_angle = (moon_sid - sun_sid) % 360
-
-    # Calculate Rahu (Mean North Node)
-    # T = centuries from J2000.0
-    tt = t.tt
-    T = (tt - 2451545.0) / 36525.0
-    # Formula for Mean Node (Tropical)
-    rahu_tropical = (125.0445479 - 1934.1362891 * T + 0.0020754 * T**2 + 0.000002139 * T**3 - 0.0000000165 * T**4) % 360
-    rahu_sidereal = (rahu_tropical - ayanamsha) % 360
-    ketu_sidereal = (rahu_sidereal + 180) % 360
-
-    return {
-        "sun_sidereal": round(sun_sid, 4),
-        "moon_sidereal": round(moon_sid, 4),
-        "ayanamsha": round(ayanamsha, 4),
-        "sun_tropical": round(sun_tropical_deg, 4),
-        "phase_angle": round(phase_angle, 2),
-        "rahu_sidereal": round(rahu_sidereal, 4),
-        "ketu_sidereal": round(ketu_sidereal, 4)
-    }
+    return get_moment(date_local).angular_data
@@ -0,0 +1,157 @@
+"""
+In-process LRU cache shared by the expensive lookups (recurrences, geocoding,
+rendered images, API responses).
+
+Entries are evicted least-recently-used first once either the entry count or the
+byte budget is exceeded, and optionally expire after a TTL. Sizes are whatever
+the caller reports (or `sizeof(value)`), so the byte budget is an estimate.
+"""
+
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+_registry = weakref.WeakSet()
+
+# name -> (pid, thread) of the periodic sweepers started in this process
+_sweepers = {}
+_sweepers_lock = threading.Lock()
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache with an optional byte budget, entry limit and TTL.
+    """
+
+    def __init__(self, name, max_bytes=None, max_entries=None, ttl=None, sizeof=None):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.sizeof = sizeof or (lambda value: 0)
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (value, size, expires_at)
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        _registry.add(self)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, size, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, size=None, ttl=None):
+        """
+        Stores a value. Values larger than the whole byte budget are not cached.
+        """
+        size = self.sizeof(value) if size is None else size
+        if self.max_bytes is not None and size > self.max_bytes:
+            return False
+
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, expires_at)
+            self._bytes += size
+            self._evict()
+        return True
+
+    def pop(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            value = self._entries[key][0]
+            self._remove(key)
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _evict(self):
+        while self._entries and (
+            (self.max_bytes is not None and self._bytes > self.max_bytes)
+            or (self.max_entries is not None and len(self._entries) > self.max_entries)
+        ):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+
+def get_caches():
+    """All live LRUCache instances in this process (for metrics)."""
+    return sorted(_registry, key=lambda cache: cache.name)
+
+
+def start_sweeper(name, sweep, interval):
+    """
+    Runs sweep() at once and then every interval seconds on a daemon thread,
+    one per name and process. Threads do not survive fork, so a sweeper
+    started before it is started again in the child on its next call.
+    """
+    pid = os.getpid()
+    with _sweepers_lock:
+        running = _sweepers.get(name)
+        if running is not None and running[0] == pid and running[1].is_alive():
+            return
+
+        def loop():
+            while True:
+                try:
+                    sweep()
+                except Exception as e:
+                    print(f"WARNING: Sweep {name} failed: {e}")
+                time.sleep(interval)
+
+        thread = threading.Thread(target=loop, name=f"sweep-{name}", daemon=True)
+        _sweepers[name] = (pid, thread)
+        thread.start()
@@ -0,0 +1,202 @@
+"""
+Offline gazetteer: cities with aliases, coordinates and timezone, built from
+GeoNames by scripts/build_gazetteer.py.
+
+The data file stores places as columns, most populous first, plus every
+folded name and curated alias as one sorted byte-string array. A prefix query
+is two binary searches over that array, and ranking the matches is just
+taking the smallest place indices. The file is optional; without it
+get_gazetteer() returns None and location lookups go to Nominatim as before.
+
+resolve() only answers unambiguous input: a name shared by several places, or
+naming a country or region, is left to the geocoder.
+"""
+
+import os
+import threading
+import unicodedata
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+
+GAZETTEER_PATH = Path(
+    os.environ.get("PANCHANGA_GAZETTEER")
+    or Path(__file__).resolve().parent.parent / "data" / "gazetteer.npz"
+)
+GAZETTEER_ENABLED = os.environ.get("PANCHANGA_GAZETTEER_ENABLED", "1") == "1"
+GAZETTEER_VERSION = 2
+
+# Sorts after every character a folded key can contain
+_KEY_END = b"\x7f"
+
+_gazetteer = None
+_gazetteer_loaded = False
+_gazetteer_lock = threading.Lock()
+
+
+def fold_name(text):
+    """
+    Folds a place name for matching: accents stripped, lowercase ASCII,
+    punctuation collapsed to single spaces ("São Paulo" -> "sao paulo").
+    """
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii").lower()
+    return " ".join("".join(ch if ch.isalnum() else " " for ch in text).split())
+
+
+class Place(namedtuple("Place", "name country_code country latitude longitude timezone population")):
+    __slots__ = ()
+
+    @property
+    def label(self):
+        return f"{self.name}, {self.country}"
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "label": self.label,
+            "country": self.country,
+            "country_code": self.country_code,
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "timezone": self.timezone,
+        }
+
+
+class Gazetteer:
+    """
+    Prefix index over the place columns of a gazetteer file.
+    """
+
+    def __init__(self, table):
+        self.names = table["names"]
+        self.country_index = table["country_index"]
+        self.country_codes = [code.decode() for code in table["country_codes"]]
+        self.country_names = [name.decode("utf-8") for name in table["country_names"]]
+        self.latitudes = table["latitudes"]
+        self.longitudes = table["longitudes"]
+        self.timezone_index = table["timezone_index"]
+        self.timezones = [tz.decode() for tz in table["timezones"]]
+        self.populations = table["populations"]
+        self.keys = table["keys"]
+        self.key_place = table["key_place"]
+        self.regions = {name.decode() for name in table["regions"]}
+        # Folded country name and lowercase code, for "Town, Country" queries
+        self._country_keys = [(fold_name(name), code.lower()) for code, name in zip(self.country_codes, self.country_names)]
+        self._country_index = {name: i for i, (name, _) in enumerate(self._country_keys)}
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as table:
+            if int(table["version"]) != GAZETTEER_VERSION:
+                raise ValueError(f"version {int(table['version'])}, expected {GAZETTEER_VERSION}")
+            return cls({name: table[name] for name in table.files})
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def key_count(self):
+        return len(self.keys)
+
+    def place(self, index):
+        country = self.country_index[index]
+        return Place(
+            self.names[index].decode("utf-8"),
+            self.country_codes[country],
+            self.country_names[country],
+            float(self.latitudes[index]),
+            float(self.longitudes[index]),
+            self.timezones[self.timezone_index[index]],
+            int(self.populations[index]),
+        )
+
+    def _key_range(self, key, prefix):
+        key = key.encode("ascii")
+        lo = int(np.searchsorted(self.keys, key, side="left"))
+        if prefix:
+            hi = int(np.searchsorted(self.keys, key + _KEY_END, side="left"))
+        else:
+            hi = int(np.searchsorted(self.keys, key, side="right"))
+        return lo, hi
+
+    def _matches_country(self, index, country, prefix):
+        name, code = self._country_keys[self.country_index[index]]
+        return code == country or (name.startswith(country) if prefix else name == country)
+
+    def suggest(self, query, limit=8):
+        """
+        Places whose name or curated alias starts with the query, most
+        populous first.
+        "Town, Country" narrows the results to countries starting with "Country".
+        """
+        parts = [fold_name(part) for part in query.split(",")]
+        prefix, country = parts[0], (parts[-1] if len(parts) > 1 else "")
+        if not prefix:
+            return []
+
+        lo, hi = self._key_range(prefix, prefix=True)
+        matches = self.key_place[lo:hi]
+        # Short prefixes match thousands of keys: take the most populous few
+        # first and only dedupe the whole slice if filtering leaves too few
+        top = limit * 16
+        if len(matches) > top:
+            results = self._collect(np.partition(matches, top)[:top], limit, country)
+            if len(results) == limit:
+                return results
+        return self._collect(matches, limit, country)
+
+    def _collect(self, matches, limit, country):
+        results = []
+        for index in np.unique(matches):
+            if country and not self._matches_country(index, country, prefix=True):
+                continue
+            results.append(self.place(index))
+            if len(results) == limit:
+                break
+        return results
+
+    def resolve(self, text):
+        """
+        Exact local match for free-text input such as "Bangalore" or
+        "Mysuru, Karnataka, India": the first part must equal a name or alias
+        and, when given, the last part must name the country (intermediate
+        parts such as the state are ignored). Returns the Place, or None when
+        no place or more than one matches, or the name is a region's
+        ("Goa") or another country's ("India"); the geocoder knows better.
+        """
+        parts = [fold_name(part) for part in text.split(",")]
+        name, country = parts[0], (parts[-1] if len(parts) > 1 else "")
+        if not name or name in self.regions:
+            return None
+
+        lo, hi = self._key_range(name, prefix=False)
+        matches = [
+            index for index in np.unique(self.key_place[lo:hi])
+            if not country or self._matches_country(index, country, prefix=False)
+        ]
+        if len(matches) != 1:
+            return None
+        # City-states ("Singapore") are the only towns named after a country
+        named_country = self._country_index.get(name)
+        if named_country is not None and self.country_index[matches[0]] != named_country:
+            return None
+        return self.place(matches[0])
+
+
+def get_gazetteer():
+    """
+    Returns the shared Gazetteer, loading it on first use, or None when it
+    is disabled or the data file is missing.
+    """
+    global _gazetteer, _gazetteer_loaded
+    if not _gazetteer_loaded:
+        with _gazetteer_lock:
+            if not _gazetteer_loaded:
+                if GAZETTEER_ENABLED and GAZETTEER_PATH.exists():
+                    try:
+                        _gazetteer = Gazetteer.load(GAZETTEER_PATH)
+                    except Exception as e:
+                        print(f"WARNING: Could not load gazetteer {GAZETTEER_PATH.name}: {e}")
+                _gazetteer_loaded = True
+    return _gazetteer
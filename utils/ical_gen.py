@@ -5,7 +5,7 @@ import pytz
 def create_ical_content(title, occurrences):
     """
     Creates iCal content (.ics) for a list of occurrences.
-    Each occurrence is a dict with 'datetime' and 'report'.
+    Each occurrence is a dict (or recurrence Occurrence) with 'datetime' and 'report'.
     """
     c = Calendar()
     
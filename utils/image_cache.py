@@ -0,0 +1,252 @@
+"""
+Two-tier cache for rendered PNGs (sky maps, solar system views).
+
+A memory tier (LRUCache of png bytes + ETag + metadata) sits in front of a
+disk tier shared by all workers on the host. The disk tier is bounded by a
+byte budget and a TTL: files are written atomically (temp file + rename, so a
+concurrent reader never sees half a PNG). A file's mtime is its creation time
+and never moves, so the TTL is a hard retention limit; hits only refresh its
+atime, the recency the LRU eviction goes by. Expired files are deleted when a
+lookup finds them and by a sweep that runs every SWEEP_INTERVAL seconds on a
+background thread of each worker (started with the worker, see
+gunicorn.conf.py, or on first use), busy or not. This replaces the old cron
+cleanup.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+import weakref
+from pathlib import Path
+
+from utils.cache import LRUCache, start_sweeper
+
+IMAGE_CACHE_ROOT = Path(os.environ.get("PANCHANGA_IMAGE_CACHE_DIR", "cache/images"))
+
+# Sweep at least this often, or as soon as this process alone has written past the budget
+SWEEP_INTERVAL = 60
+
+_registry = weakref.WeakSet()
+
+
+class ImageCache:
+    """
+    PNG cache with an in-memory hot tier and a size/TTL-bounded disk tier.
+    Entries are (png_bytes, etag, metadata); metadata lives in memory only.
+    """
+
+    def __init__(self, name, directory, max_disk_bytes, max_memory_bytes, ttl):
+        self.name = name
+        self.directory = Path(directory)
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl = ttl
+        self.memory = LRUCache(f"{name}_memory", max_bytes=max_memory_bytes, ttl=ttl)
+
+        self._lock = threading.Lock()
+        self._written_since_sweep = 0
+        self._last_sweep = 0.0
+        self._disk = {"files": 0, "bytes": 0}
+        self.disk_hits = 0
+        self.disk_misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.expirations = 0
+        _registry.add(self)
+
+    def path(self, key):
+        return self.directory / f"{key}.png"
+
+    def _pending_path(self, key):
+        return self.directory / f"{key}.pending"
+
+    def mark_pending(self, key):
+        """
+        Records, for every worker on the host, that this image is being
+        rendered; put() clears the mark.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._pending_path(key).touch()
+
+    def clear_pending(self, key):
+        self._unlink(self._pending_path(key))
+
+    def is_pending(self, key, max_age):
+        """Whether a render of this image was started less than max_age seconds ago."""
+        try:
+            return self._pending_path(key).stat().st_mtime + max_age > time.time()
+        except FileNotFoundError:
+            return False
+
+    def get(self, key):
+        """
+        Returns (png_bytes, etag, metadata) or None.
+        """
+        start_image_cache_sweeper()
+        entry = self.memory.get(key)
+        if entry is not None:
+            return entry
+
+        path = self.path(key)
+        try:
+            stat = path.stat()
+            if stat.st_mtime + self.ttl <= time.time():
+                self.disk_misses += 1
+                if self._unlink(path):
+                    self.expirations += 1
+                return None
+            png = path.read_bytes()
+            # Refresh recency (atime) for the LRU sweep; mtime stays the
+            # creation time the TTL counts from
+            os.utime(path, (time.time(), stat.st_mtime))
+        except FileNotFoundError:
+            self.disk_misses += 1
+            return None
+
+        self.disk_hits += 1
+        entry = (png, hashlib.md5(png).hexdigest(), {})
+        remaining = stat.st_mtime + self.ttl - time.time()
+        self.memory.put(key, entry, size=len(png), ttl=remaining)
+        return entry
+
+    def put(self, key, png, metadata=None):
+        """
+        Stores an image in both tiers. Returns the (png_bytes, etag, metadata) entry.
+        """
+        start_image_cache_sweeper()
+        entry = (png, hashlib.md5(png).hexdigest(), metadata or {})
+        self.memory.put(key, entry, size=len(png))
+        self._write(self.path(key), png)
+        self.clear_pending(key)
+
+        with self._lock:
+            self.writes += 1
+            self._written_since_sweep += len(png)
+            due = (
+                self._written_since_sweep > self.max_disk_bytes
+                or time.monotonic() - self._last_sweep > SWEEP_INTERVAL
+            )
+        if due:
+            self.sweep()
+        return entry
+
+    def _write(self, path, png):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-", suffix=".png")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(png)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def sweep(self):
+        """
+        Deletes expired files, then least recently used ones until the
+        directory is within the byte budget. Safe to run from several workers.
+        """
+        with self._lock:
+            self._written_since_sweep = 0
+            self._last_sweep = time.monotonic()
+
+        now = time.time()
+        files = []
+        try:
+            with os.scandir(self.directory) as it:
+                for item in it:
+                    if item.name.endswith(".pending"):
+                        # Marks of renders that never finished
+                        try:
+                            if item.stat().st_mtime + self.ttl <= now:
+                                self._unlink(item.path)
+                        except FileNotFoundError:
+                            pass
+                        continue
+                    if not item.name.endswith(".png"):
+                        continue
+                    try:
+                        stat = item.stat()
+                    except FileNotFoundError:
+                        continue
+                    # Abandoned temp files from crashed writers count as expired
+                    if stat.st_mtime + self.ttl <= now:
+                        if self._unlink(item.path):
+                            self.expirations += 1
+                    elif not item.name.startswith(".tmp-"):
+                        files.append((stat.st_atime, stat.st_size, item.path))
+        except FileNotFoundError:
+            return
+
+        total = sum(size for _, size, _ in files)
+        remaining = len(files)
+        files.sort()
+        for _, size, path in files:
+            if total <= self.max_disk_bytes:
+                break
+            if self._unlink(path):
+                self.evictions += 1
+            total -= size
+            remaining -= 1
+
+        with self._lock:
+            self._disk = {"files": remaining, "bytes": total}
+
+    @staticmethod
+    def _unlink(path):
+        try:
+            os.unlink(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def clear(self):
+        self.memory.clear()
+        try:
+            with os.scandir(self.directory) as it:
+                for item in it:
+                    if item.name.endswith(".png"):
+                        self._unlink(item.path)
+        except FileNotFoundError:
+            pass
+
+    def stats(self):
+        with self._lock:
+            disk = dict(self._disk)
+        lookups = self.disk_hits + self.disk_misses
+        return {
+            "name": self.name,
+            "memory": self.memory.stats(),
+            "disk": {
+                "directory": str(self.directory),
+                "files": disk["files"],
+                "bytes": disk["bytes"],
+                "max_bytes": self.max_disk_bytes,
+                "ttl": self.ttl,
+                "hits": self.disk_hits,
+                "misses": self.disk_misses,
+                "hit_ratio": round(self.disk_hits / lookups, 4) if lookups else 0.0,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            },
+        }
+
+
+def _sweep_all():
+    for cache in list(_registry):
+        cache.sweep()
+
+
+def start_image_cache_sweeper():
+    """Starts this process's periodic sweep of every ImageCache (idempotent)."""
+    start_sweeper("image_cache", _sweep_all, SWEEP_INTERVAL)
+
+
+def get_image_caches():
+    """All live ImageCache instances in this process (for metrics)."""
+    return sorted(_registry, key=lambda cache: cache.name)
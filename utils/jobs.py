@@ -0,0 +1,297 @@
+"""
+Background jobs: slow computations run on a small thread pool off the request
+path, and their results are fetched later by job id.
+
+A job's id is derived from its inputs, so submitting the same work twice
+joins the first job (single-flight), and every gunicorn worker on the host
+agrees on the id. State lives in one JSON file per job, written atomically
+(temp file + rename), so a poll answered by a different worker than the one
+running the job still sees it:
+
+- {"status": "queued"} until a pool thread picks it up;
+- {"status": "running", "progress": {"message": ..., "fraction": ...}}
+  while it runs; the job reports progress with report_progress();
+- {"status": "done", "result": ...} once finished, kept for JOB_RESULT_TTL
+  seconds (JOB_KIND_TTL for kinds whose results carry personal data, such
+  as the iCal file with the event's title, time and address), or
+  {"status": "failed", "error": ...}, kept only JOB_FAILURE_TTL seconds so
+  pollers see it; submitting a failed job again re-runs it.
+
+Concurrency is bounded twice: JOB_WORKERS threads run jobs, and at most
+JOB_QUEUE_DEPTH jobs may be queued or running, further submissions are
+rejected with JobQueueFull instead of piling up. A queued or running file
+not updated for JOB_STALE_AFTER seconds belonged to a worker that died or
+was restarted; the job counts as unknown and may be submitted again.
+Expired and abandoned files are deleted when read and by a sweep every
+SWEEP_INTERVAL seconds on a background thread of each worker (started with
+the worker, see gunicorn.conf.py, or on first use), busy or not.
+
+PANCHANGA_JOB_WORKERS=0 runs jobs inline in the submitting request instead.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+
+from utils.cache import start_sweeper
+
+JOB_DIR = Path(os.environ.get("PANCHANGA_JOB_DIR", "cache/jobs"))
+JOB_WORKERS = int(os.environ.get("PANCHANGA_JOB_WORKERS", "2"))
+JOB_QUEUE_DEPTH = int(os.environ.get("PANCHANGA_JOB_QUEUE", "32"))
+JOB_RESULT_TTL = int(os.environ.get("PANCHANGA_JOB_RESULT_TTL", 900))
+JOB_FAILURE_TTL = int(os.environ.get("PANCHANGA_JOB_FAILURE_TTL", 60))
+JOB_STALE_AFTER = int(os.environ.get("PANCHANGA_JOB_STALE_AFTER", 300))
+# Result TTL per job kind, overriding JOB_RESULT_TTL
+JOB_KIND_TTL = {
+    "ical": int(os.environ.get("PANCHANGA_JOB_ICAL_TTL", 300)),
+}
+
+# Ids come back from clients, so they must never name a path outside JOB_DIR
+JOB_ID_PATTERN = re.compile(r"^[a-z_]+-[0-9a-f]{32}$")
+
+FINISHED = ("done", "failed")
+
+# Progress is written to the job file at most this often (seconds)
+PROGRESS_INTERVAL = 0.25
+
+# Sweep expired job files at least this often (seconds)
+SWEEP_INTERVAL = 60
+
+_queue = None
+_queue_lock = threading.Lock()
+
+# The job the current thread is running, for report_progress()
+_current = threading.local()
+
+
+class JobQueueFull(RuntimeError):
+    """Too many jobs are already queued or running."""
+
+
+def job_id(kind, *inputs):
+    """Stable id of a job from its kind and (JSON-serializable) inputs."""
+    payload = json.dumps([kind, *inputs], sort_keys=True, default=str)
+    return f"{kind}-{hashlib.md5(payload.encode('utf-8')).hexdigest()}"
+
+
+def job_kind(job):
+    return job.split("-", 1)[0]
+
+
+def report_progress(message, fraction=None):
+    """
+    Records the progress of the job running in this thread (no-op outside a
+    job), e.g. report_progress("year 2031 of 2046", 0.35).
+    """
+    queue, job, state = getattr(_current, "job", (None, None, None))
+    if job is None:
+        return
+    now = time.monotonic()
+    if now - _current.reported < PROGRESS_INTERVAL:
+        return
+    _current.reported = now
+    state["progress"] = {"message": message, "fraction": None if fraction is None else round(fraction, 3)}
+    queue._write(job, state)
+
+
+class JobQueue:
+    """
+    Thread pool running background jobs, with file-backed job state.
+    """
+
+    def __init__(self, directory=JOB_DIR, workers=JOB_WORKERS, queue_depth=JOB_QUEUE_DEPTH,
+                 result_ttl=JOB_RESULT_TTL, failure_ttl=JOB_FAILURE_TTL):
+        self.directory = Path(directory)
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.result_ttl = result_ttl
+        self.failure_ttl = failure_ttl
+        self._lock = threading.Lock()
+        self._executor = None
+        self._inflight = {}  # job id -> Future of the queued or running job
+        self.submitted = 0
+        self.joined = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failures = 0
+        self.expirations = 0
+
+    def path(self, job):
+        return self.directory / f"{job}.json"
+
+    def _write(self, job, state):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-", suffix=".json")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.path(job))
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def _ttl(self, state):
+        status = state.get("status")
+        if status == "done":
+            return JOB_KIND_TTL.get(state.get("kind"), self.result_ttl)
+        return self.failure_ttl if status == "failed" else JOB_STALE_AFTER
+
+    def _expired(self, state, age):
+        return age > self._ttl(state)
+
+    def status(self, job):
+        """
+        The job's state dict ("status" is "queued", "running", "done" or
+        "failed"), or None if it is unknown, expired or was abandoned.
+        """
+        if not JOB_ID_PATTERN.match(job):
+            return None
+        path = self.path(job)
+        try:
+            mtime = path.stat().st_mtime
+            state = json.loads(path.read_text())
+        except (FileNotFoundError, ValueError):
+            # Missing, or caught between mkstemp and rename on another worker
+            return None
+        if self._expired(state, time.time() - mtime) and job not in self._inflight:
+            try:
+                path.unlink()
+                self.expirations += 1
+            except FileNotFoundError:
+                pass
+            return None
+        state["expires"] = mtime + self._ttl(state) if state["status"] in FINISHED else None
+        return state
+
+    def submit(self, job, fn, *args, **kwargs):
+        """
+        Runs fn(*args, **kwargs) in the background as this job unless it is
+        already queued, running or done; a failed job runs again. Returns the
+        job's current state.
+        Raises JobQueueFull when JOB_QUEUE_DEPTH jobs are already pending.
+        """
+        start_job_sweeper()
+        with self._lock:
+            if job in self._inflight:
+                self.joined += 1
+                return self.status(job) or {"status": "queued"}
+            # Done, or queued or running on another worker
+            state = self.status(job)
+            if state is not None and state["status"] != "failed":
+                self.joined += 1
+                return state
+            if len(self._inflight) >= self.queue_depth:
+                self.rejected += 1
+                raise JobQueueFull(f"Job queue is full ({self.queue_depth} jobs pending)")
+
+            self.submitted += 1
+            state = {"kind": job_kind(job), "status": "queued", "submitted": time.time()}
+            if self.workers > 0:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+                self._write(job, state)
+                self._inflight[job] = self._executor.submit(self._run, job, state, fn, args, kwargs)
+                return state
+            self._inflight[job] = None  # running inline, in this thread
+        return self._run(job, state, fn, args, kwargs)
+
+    def _run(self, job, state, fn, args, kwargs):
+        state = dict(state, status="running", started=time.time(), progress=None)
+        self._write(job, state)
+        _current.job, _current.reported = (self, job, state), 0.0
+        try:
+            state = dict(state, status="done", result=fn(*args, **kwargs))
+            with self._lock:
+                self.completed += 1
+        except Exception as e:
+            with self._lock:
+                self.failures += 1
+            state = dict(state, status="failed", error=str(e))
+        finally:
+            _current.job = None
+        state["finished"] = time.time()
+        self._write(job, state)
+        with self._lock:
+            self._inflight.pop(job, None)
+        return state
+
+    def wait(self, job, timeout):
+        """
+        Waits up to timeout seconds for a job running in this process to
+        finish. Returns its state (None if unknown).
+        """
+        future = self._inflight.get(job)
+        if future is not None:
+            wait([future], timeout=timeout)
+        return self.status(job)
+
+    def sweep(self):
+        """
+        Deletes the files of expired and abandoned jobs. Safe to run from
+        several workers.
+        """
+        now = time.time()
+        try:
+            with os.scandir(self.directory) as it:
+                items = [item for item in it if item.name.endswith(".json")]
+        except FileNotFoundError:
+            return
+        for item in items:
+            job = item.name[:-len(".json")]
+            if job in self._inflight:
+                continue
+            try:
+                age = now - item.stat().st_mtime
+                # Abandoned temp files from crashed writers count as stale
+                state = {} if item.name.startswith(".tmp-") else json.loads(Path(item.path).read_text())
+            except (FileNotFoundError, ValueError):
+                continue
+            if self._expired(state, age):
+                try:
+                    os.unlink(item.path)
+                    self.expirations += 1
+                except FileNotFoundError:
+                    pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_depth": self.queue_depth,
+                "pending": len(self._inflight),
+                "submitted": self.submitted,
+                "joined": self.joined,
+                "rejected": self.rejected,
+                "completed": self.completed,
+                "failures": self.failures,
+                "expirations": self.expirations,
+            }
+
+
+def get_job_queue():
+    """Returns the process-wide JobQueue; its threads start on the first job."""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = JobQueue()
+    return _queue
+
+
+def start_job_sweeper():
+    """Starts this process's periodic sweep of the job directory (idempotent)."""
+    start_sweeper("jobs", lambda: get_job_queue().sweep(), SWEEP_INTERVAL)
+
+
+def get_job_queue_stats():
+    """Stats of this process's queue, or None if it was never used."""
+    return _queue.stats() if _queue is not None else None
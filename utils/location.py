@@ -1,28 +1,214 @@
 from geopy.geocoders import Nominatim
 from timezonefinder import TimezoneFinder
+from pathlib import Path
+import os
+import sqlite3
+import threading
+import time
 import pytz
+from utils.cache import LRUCache
+from utils.gazetteer import get_gazetteer
+
+# Persistent geocoding cache (shared by all workers on the host)
+GEOCODE_DB_PATH = Path(os.environ.get("PANCHANGA_GEOCODE_DB", "cache/geocode.sqlite3"))
+GEOCODE_TTL = 30 * 24 * 3600       # Place coordinates rarely change
+GEOCODE_NEGATIVE_TTL = 24 * 3600   # Retry "not found" answers daily
+
+# Timezone resolution: one process-wide TimezoneFinder (optionally holding its
+# polygon data in memory) and an LRU keyed by coordinates rounded to ~10 m
+TIMEZONE_IN_MEMORY = os.environ.get("PANCHANGA_TZ_IN_MEMORY", "0") == "1"
+TIMEZONE_COORD_DECIMALS = 4
+
+_geocoder = None
+_timezone_finder = None
+_timezone_finder_lock = threading.Lock()
+_timezone_lru = LRUCache("timezones", max_entries=4096)
+_geocode_lru = LRUCache("geocode", max_entries=2048)
+_inflight = {}
+_inflight_lock = threading.Lock()
+_db_lock = threading.Lock()
+
+def get_geocoder():
+    """
+    Returns the shared Nominatim geocoder, creating it on first use.
+    """
+    global _geocoder
+    if _geocoder is None:
+        _geocoder = Nominatim(user_agent="hindu_panchanga_converter", timeout=10)
+    return _geocoder
+
+def set_geocoder(geocoder):
+    """
+    Replaces the geocoder (anything with a geopy-style geocode(query) method),
+    e.g. with a local stub for tests.
+    """
+    global _geocoder
+    _geocoder = geocoder
+
+def get_timezone_finder():
+    """
+    Returns the shared TimezoneFinder, creating it on first use.
+    """
+    global _timezone_finder
+    if _timezone_finder is None:
+        with _timezone_finder_lock:
+            if _timezone_finder is None:
+                _timezone_finder = TimezoneFinder(in_memory=TIMEZONE_IN_MEMORY)
+    return _timezone_finder
+
+def get_timezone(lat, lon):
+    """
+    Returns the IANA timezone name for a coordinate, or None over open ocean.
+    """
+    key = (round(lat, TIMEZONE_COORD_DECIMALS), round(lon, TIMEZONE_COORD_DECIMALS))
+    timezone_str = _timezone_lru.get(key)
+    if timezone_str is None:
+        timezone_str = get_timezone_finder().timezone_at(lng=key[1], lat=key[0]) or ""
+        _timezone_lru.put(key, timezone_str)
+    return timezone_str or None
+
+def normalize_location(location_name):
+    """
+    Normalizes free-text location input into a cache key.
+    """
+    text = location_name.lower().replace(",", ", ")
+    return " ".join(text.split()).strip(" ,.")
+
+def _connect():
+    GEOCODE_DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(GEOCODE_DB_PATH), timeout=5)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS geocode ("
+        " key TEXT PRIMARY KEY, found INTEGER NOT NULL, address TEXT,"
+        " latitude REAL, longitude REAL, expires_at REAL NOT NULL)"
+    )
+    return conn
+
+def _db_get(key):
+    try:
+        with _db_lock:
+            conn = _connect()
+            try:
+                row = conn.execute(
+                    "SELECT found, address, latitude, longitude, expires_at FROM geocode WHERE key = ?", (key,)
+                ).fetchone()
+            finally:
+                conn.close()
+    except sqlite3.Error as e:
+        print(f"Geocode cache read error: {e}")
+        return None
+
+    if row is None or row[4] <= time.time():
+        return None
+    found, address, lat, lon, expires_at = row
+    return ((address, lat, lon) if found else ()), expires_at - time.time()
+
+def _db_put(key, result, ttl):
+    found = bool(result)
+    address, lat, lon = result if found else (None, None, None)
+    try:
+        with _db_lock:
+            conn = _connect()
+            try:
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO geocode (key, found, address, latitude, longitude, expires_at)"
+                        " VALUES (?, ?, ?, ?, ?, ?)",
+                        (key, int(found), address, lat, lon, time.time() + ttl)
+                    )
+            finally:
+                conn.close()
+    except sqlite3.Error as e:
+        print(f"Geocode cache write error: {e}")
+
+def _lookup(key, location_name):
+    """
+    Resolves a key through the disk cache, then the geocoder.
+    Returns (address, lat, lon), or () when the place does not exist.
+    """
+    cached = _db_get(key)
+    if cached is not None:
+        result, ttl_left = cached
+        _geocode_lru.put(key, result, ttl=ttl_left)
+        return result
+
+    location = get_geocoder().geocode(location_name)
+    result = (location.address, location.latitude, location.longitude) if location else ()
+    ttl = GEOCODE_TTL if result else GEOCODE_NEGATIVE_TTL
+    _db_put(key, result, ttl)
+    _geocode_lru.put(key, result, ttl=ttl)
+    return result
+
+def geocode(location_name):
+    """
+    Cached geocoding: in-process LRU, then the on-disk SQLite cache, then the
+    remote geocoder. Concurrent lookups of the same place share one request.
+    Returns (address, lat, lon), or () when the place was not found.
+    """
+    key = normalize_location(location_name)
+    result = _geocode_lru.get(key)
+    if result is not None:
+        return result
+
+    with _inflight_lock:
+        event = _inflight.get(key)
+        leader = event is None
+        if leader:
+            event = _inflight[key] = threading.Event()
+
+    if not leader:
+        event.wait()
+        result = _geocode_lru.get(key)
+        if result is not None:
+            return result
+        # The leader failed (e.g. network error); try on our own
+        return _lookup(key, location_name)
+
+    try:
+        return _lookup(key, location_name)
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        event.set()
+
+def suggest_locations(query, limit=8):
+    """
+    Autocomplete: gazetteer places whose name starts with the query.
+    Returns an empty list when no gazetteer is installed.
+    """
+    gazetteer = get_gazetteer()
+    return gazetteer.suggest(query, limit=limit) if gazetteer else []
 
 def get_location_details(location_name):
     """
     Given a city/location name, returns lat, lon, and timezone.
+    Unambiguous exact matches in the offline gazetteer are answered locally;
+    anything else goes to the (cached) geocoder.
     """
-    geolocator = Nominatim(user_agent="hindu_panchanga_converter", timeout=10)
-    location = geolocator.geocode(location_name)
-    
-    if not location:
+    gazetteer = get_gazetteer()
+    place = gazetteer.resolve(location_name) if gazetteer else None
+    if place is not None:
+        return {
+            "address": place.label,
+            "latitude": place.latitude,
+            "longitude": place.longitude,
+            "timezone": place.timezone
+        }
+
+    result = geocode(location_name)
+
+    if not result:
         raise ValueError(f"Could not find location: {location_name}")
-    
-    lat = location.latitude
-    lon = location.longitude
-    
-    tf = TimezoneFinder()
-    timezone_str = tf.timezone_at(lng=lon, lat=lat)
-    
+
+    address, lat, lon = result
+
+    timezone_str = get_timezone(lat, lon)
+
     if not timezone_str:
          raise ValueError(f"Could not find timezone for location: {location_name}")
-         
+
     return {
-        "address": location.address,
+        "address": address,
         "latitude": lat,
         "longitude": lon,
         "timezone": timezone_str
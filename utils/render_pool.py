@@ -0,0 +1,241 @@
+"""
+Render worker pool: matplotlib image generation runs in dedicated processes.
+
+The web workers only submit render jobs and wait on them; matplotlib (and the
+pre-rendered nakshatra wheel) live in the pool processes, which are started
+and warmed once. Jobs are identified by their cache key:
+
+- identical jobs already queued or running are joined, not rendered twice
+  (single-flight);
+- at most RENDER_QUEUE_DEPTH distinct jobs may be pending, further ones are
+  rejected with RenderQueueFull instead of piling up behind a render burst;
+- callers stop waiting after RENDER_TIMEOUT seconds (RenderTimeout). The
+  render itself keeps running and later requests for the same key join it.
+
+Each web worker that renders starts its own pool, so the pool is sized per
+host: PANCHANGA_RENDER_WORKERS render processes are shared out between the
+web workers (gunicorn.conf.py tells this module how many there are), with
+at least one each. PANCHANGA_RENDER_WORKERS=0 renders inline in the calling
+process instead.
+"""
+
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+# Render processes for the whole host, shared out between the web workers
+RENDER_WORKERS = int(os.environ.get("PANCHANGA_RENDER_WORKERS", "2"))
+RENDER_QUEUE_DEPTH = int(os.environ.get("PANCHANGA_RENDER_QUEUE", "16"))
+RENDER_TIMEOUT = float(os.environ.get("PANCHANGA_RENDER_TIMEOUT", "30"))
+
+_pool = None
+_pool_lock = threading.Lock()
+_web_workers = 1
+
+
+class RenderQueueFull(RuntimeError):
+    """Too many distinct render jobs are already pending."""
+
+
+class RenderTimeout(RuntimeError):
+    """A render job did not finish within the caller's timeout."""
+
+
+def set_web_workers(count):
+    """Number of web worker processes on the host, each with its own pool."""
+    global _web_workers
+    _web_workers = max(1, count)
+
+
+def render_workers_per_process():
+    """This process's share of RENDER_WORKERS (at least 1; 0 renders inline)."""
+    if RENDER_WORKERS <= 0:
+        return 0
+    return max(1, RENDER_WORKERS // _web_workers)
+
+
+def _generator(kind):
+    if kind == "skyshot":
+        from utils.skyshot import generate_skymap
+        return generate_skymap
+    if kind == "solar_system":
+        from utils.solar_system import generate_solar_system
+        return generate_solar_system
+    raise ValueError(f"Unknown render job: {kind}")
+
+
+def render_png(kind, kwargs):
+    """
+    Runs one render job and returns the PNG bytes. Executed in the pool.
+    """
+    buf = io.BytesIO()
+    _generator(kind)(output_path=buf, **kwargs)
+    return buf.getvalue()
+
+
+def _warm_worker():
+    """Pool process initializer: load matplotlib and rasterize the wheel."""
+    _generator("solar_system")
+    from utils.skyshot import get_wheel_renderer
+    get_wheel_renderer()
+
+
+def _ping():
+    return os.getpid()
+
+
+class RenderPool:
+    """
+    Process pool with single-flight job dedup, a bounded queue and timeouts.
+    """
+
+    def __init__(self, workers=None, queue_depth=RENDER_QUEUE_DEPTH, timeout=RENDER_TIMEOUT):
+        self.workers = render_workers_per_process() if workers is None else workers
+        self.queue_depth = queue_depth
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._executor = None
+        self._inflight = {}  # (kind, key) -> Future
+        self.submitted = 0
+        self.joined = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.failures = 0
+
+    def _get_executor(self):
+        if self._executor is None:
+            # spawn: never fork a web worker that may hold threads and locks
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker,
+            )
+        return self._executor
+
+    def start(self):
+        """
+        Starts and warms the pool processes without waiting for them.
+        """
+        if self.workers <= 0:
+            return
+        with self._lock:
+            executor = self._get_executor()
+            for _ in range(self.workers):
+                executor.submit(_ping)
+
+    def submit(self, kind, key, **kwargs):
+        """
+        Returns the Future rendering this job, joining an identical one in flight.
+        """
+        job = (kind, key)
+        with self._lock:
+            future = self._inflight.get(job)
+            if future is not None:
+                self.joined += 1
+                return future
+            if len(self._inflight) >= self.queue_depth:
+                self.rejected += 1
+                raise RenderQueueFull(f"Render queue is full ({self.queue_depth} jobs pending)")
+
+            try:
+                future = self._get_executor().submit(render_png, kind, kwargs)
+            except BrokenProcessPool:
+                # A pool process died; start a fresh pool for this and later jobs
+                self._executor = None
+                future = self._get_executor().submit(render_png, kind, kwargs)
+            self.submitted += 1
+            self._inflight[job] = future
+
+        future.add_done_callback(lambda _: self._finish(job, future))
+        return future
+
+    def _finish(self, job, future):
+        with self._lock:
+            if self._inflight.get(job) is future:
+                del self._inflight[job]
+            if not future.cancelled() and future.exception() is not None:
+                self.failures += 1
+
+    def pending(self, kind, key):
+        """The Future of this job if it is queued or running in this process, else None."""
+        with self._lock:
+            return self._inflight.get((kind, key))
+
+    def render_async(self, kind, key, callback, **kwargs):
+        """
+        Starts (or joins) the render of one image without waiting for it.
+        callback(png) runs when it finishes, with None if it failed. Without
+        pool workers the image is rendered inline, before this returns.
+        """
+        if self.workers <= 0:
+            try:
+                png = render_png(kind, kwargs)
+            except Exception as e:
+                print(f"WARNING: Render {kind} failed: {e}")
+                png = None
+            callback(png)
+            return
+
+        def done(future):
+            failed = future.cancelled() or future.exception() is not None
+            callback(None if failed else future.result())
+
+        self.submit(kind, key, **kwargs).add_done_callback(done)
+
+    def render(self, kind, key, timeout=None, **kwargs):
+        """
+        Renders (or joins the render of) one image and returns its PNG bytes.
+        """
+        if self.workers <= 0:
+            return render_png(kind, kwargs)
+
+        if timeout is None:
+            timeout = self.timeout
+        future = self.submit(kind, key, **kwargs)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise RenderTimeout(f"Rendering took longer than {timeout:g}s") from None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_depth": self.queue_depth,
+                "pending": len(self._inflight),
+                "submitted": self.submitted,
+                "joined": self.joined,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+                "failures": self.failures,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+def get_render_pool():
+    """
+    Returns the process-wide RenderPool, starting its workers on first use.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = RenderPool()
+                _pool.start()
+    return _pool
+
+
+def get_render_pool_stats():
+    """Stats of this process's pool, or None if it was never started."""
+    return _pool.stats() if _pool is not None else None
@@ -6,13 +6,13 @@ This module creates an educational visualization of the Moon's position
 among the 27 Nakshatras at a given moment in time.
 """
 
-import matplotlib
-matplotlib.use('Agg')  # Non-interactive backend for server-side rendering
-import matplotlib.pyplot as plt
 import numpy as np
 import hashlib
 import os
+import threading
 from pathlib import Path
+from utils.image_cache import ImageCache, IMAGE_CACHE_ROOT
+from utils import svg
 
 # 27 Nakshatras with their sidereal longitude ranges and associated stars
 NAKSHATRAS = [
@@ -49,8 +49,30 @@ NAKSHATRAS = [
 NAKSHATRA_COLORS_NORMAL = ['#1a1a2e', '#16213e', '#0f3460'] * 9
 NAKSHATRA_COLOR_HIGHLIGHT = '#e94560'  # Ruby red for current Nakshatra
 
-# Cache directory for generated sky maps
-CACHE_DIR = Path("static/skyshots")
+# Figure geometry (shared by the full render and the pre-rendered wheel)
+FIGURE_SIZE = (10.0, 10.0)
+FIGURE_DPI = 120
+PAD_INCHES = 0.1
+BACKGROUND_COLOR = '#0a0a0f'
+
+# Cache directory for generated sky maps (outside static/, never served directly)
+CACHE_DIR = IMAGE_CACHE_ROOT / "skyshots"
+
+# Optional state-keyed caching: the wheel depends only on the highlighted
+# wedges and the Moon/Rahu/Ketu longitudes, so those (rounded to this many
+# degrees) can form the cache key, with the image drawn at the rounded
+# positions. At 0.25° the Moon marker is off by at most ~0.7 px. The default,
+# 0, draws exact positions and keys images by date/time/place.
+SKYSHOT_KEY_RESOLUTION = float(os.environ.get("PANCHANGA_SKYSHOT_RESOLUTION", "0"))
+
+# State-keyed images hold no user data and can live long; images keyed by
+# birth date/time/place keep the 15-minute retention the cron job enforced
+SKYSHOT_CACHE = ImageCache(
+    "skyshots", CACHE_DIR,
+    max_disk_bytes=int(os.environ.get("PANCHANGA_SKYSHOT_CACHE_BYTES", 128 * 1024 * 1024)),
+    max_memory_bytes=int(os.environ.get("PANCHANGA_SKYSHOT_MEMORY_BYTES", 32 * 1024 * 1024)),
+    ttl=int(os.environ.get("PANCHANGA_SKYSHOT_CACHE_TTL", 24 * 3600 if SKYSHOT_KEY_RESOLUTION > 0 else 15 * 60)),
+)
 
 
 def get_cache_key(date_str: str, time_str: str, lat: float, lon: float) -> str:
@@ -70,20 +92,37 @@ def get_cache_key(date_str: str, time_str: str, lat: float, lon: float) -> str:
     return hashlib.md5(data.encode()).hexdigest()[:12]
 
 
-def get_cached_image(cache_key: str):
+def quantize_longitude(longitude: float, resolution: float) -> float:
+    """
+    Rounds a longitude to the nearest multiple of the resolution (0-360°).
+    """
+    return round(round(longitude / resolution) * resolution % 360, 6)
+
+
+def get_state_cache_key(nakshatra_name: str, moon_longitude: float, rahu_longitude: float,
+                        ketu_longitude: float, resolution: float = SKYSHOT_KEY_RESOLUTION):
     """
-    Check if a cached sky map image exists.
+    Generate a cache key from the rendered state rather than the request.
     
     Args:
-        cache_key: The unique cache key
+        nakshatra_name: Nakshatra whose wedge is highlighted
+        moon_longitude, rahu_longitude, ketu_longitude: Exact sidereal longitudes
+        resolution: Quantization step in degrees
     
     Returns:
-        Path to the cached image if it exists, None otherwise
+        (cache_key, state) where state holds the quantized longitudes to render
+        at and each one's offset from the exact position in degrees
     """
-    image_path = CACHE_DIR / f"{cache_key}.png"
-    if image_path.exists():
-        return str(image_path)
-    return None
+    highlighted = get_highlighted_indices(nakshatra_name)
+    state = {"resolution": resolution}
+    for body, longitude in (("moon", moon_longitude), ("rahu", rahu_longitude), ("ketu", ketu_longitude)):
+        quantized = quantize_longitude(longitude, resolution)
+        state[f"{body}_longitude"] = quantized
+        state[f"{body}_offset"] = round((quantized - longitude + 180) % 360 - 180, 4)
+    
+    data = (f"wheel-{resolution}-{','.join(map(str, highlighted))}-{state['moon_longitude']}"
+            f"-{state['rahu_longitude']}-{state['ketu_longitude']}")
+    return hashlib.md5(data.encode()).hexdigest()[:12], state
 
 
 def get_nakshatra_index(moon_longitude: float) -> int:
@@ -127,38 +166,37 @@ def get_moon_phase_symbol(phase_angle: float) -> str:
         return '🌘'  # Waning Crescent
 
 
-def generate_skymap(
-    moon_longitude: float,
-    nakshatra_name: str,
-    nakshatra_pada: int,
-    phase_angle: float,
-    output_path: str,
-    event_title: str = None,
-    rahu_longitude: float = None,
-    ketu_longitude: float = None
-) -> str:
+def get_highlighted_indices(nakshatra_name: str) -> tuple:
     """
-    Generate an ecliptic wheel sky map showing the Moon's position among the 27 Nakshatras.
-    Includes Rahu and Ketu as mathematical markers (v4.1.1).
+    Indices of the wedges drawn highlighted for a Nakshatra name. Matching is
+    by full name or the first four letters, as the wheel has always done.
     """
-    # Ensure cache directory exists
-    CACHE_DIR.mkdir(parents=True, exist_ok=True)
-    
-    # Create figure with dark space background
+    name = nakshatra_name.lower()
+    return tuple(
+        i for i, nak in enumerate(NAKSHATRAS)
+        if nak["name"].lower() == name or name.startswith(nak["name"].lower()[:4])
+    )
+
+
+def _new_figure():
+    # Imported here so that processes which only look up cached images
+    # (the web workers, see utils.render_pool) never load matplotlib
     from matplotlib.figure import Figure
     from matplotlib.backends.backend_agg import FigureCanvasAgg as FigureCanvas
     
-    fig = Figure(figsize=(10.0, 10.0), facecolor='#0a0a0f')
+    fig = Figure(figsize=FIGURE_SIZE, facecolor=BACKGROUND_COLOR)
     canvas = FigureCanvas(fig)
-    ax = fig.add_subplot(111, polar=True, facecolor='#0a0a0f')
-    
-    # Draw the 27 Nakshatra segments
+    ax = fig.add_subplot(111, polar=True, facecolor=BACKGROUND_COLOR)
+    return fig, canvas, ax
+
+
+def _draw_wheel(ax, highlighted):
+    """Draws the 27 Nakshatra segments and their labels."""
     for i, nak in enumerate(NAKSHATRAS):
         start_rad = np.radians(90 - nak["start"])
         end_rad = np.radians(90 - nak["end"])
         
-        is_current = (nak["name"].lower() == nakshatra_name.lower() or 
-                      nakshatra_name.lower().startswith(nak["name"].lower()[:4]))
+        is_current = i in highlighted
         
         if is_current:
             color = NAKSHATRA_COLOR_HIGHLIGHT
@@ -194,50 +232,292 @@ def generate_skymap(
             rotation=rotation_deg,
             rotation_mode='anchor'
         )
-    
-    # Rahu & Ketu (Lunar Nodes) - Mathematical points (v4.1.1)
+
+
+def _draw_nodes(ax, rahu_longitude, ketu_longitude):
+    """Rahu & Ketu (Lunar Nodes) - Mathematical points (v4.1.1). Returns the artists."""
+    artists = []
     if rahu_longitude is not None:
         rahu_rad = np.radians(90 - rahu_longitude)
-        ax.text(rahu_rad, 1.02, '☊', color='#ff33cc', fontsize=18, fontweight='bold', ha='center', va='center')
-        ax.text(rahu_rad, 1.10, 'RAHU', color='#ff33cc', fontsize=7, ha='center', va='center', fontweight='bold')
+        artists.append(ax.text(rahu_rad, 1.02, '☊', color='#ff33cc', fontsize=18, fontweight='bold', ha='center', va='center'))
+        artists.append(ax.text(rahu_rad, 1.10, 'RAHU', color='#ff33cc', fontsize=7, ha='center', va='center', fontweight='bold'))
     
     if ketu_longitude is not None:
         ketu_rad = np.radians(90 - ketu_longitude)
-        ax.text(ketu_rad, 1.02, '☋', color='#cc33ff', fontsize=18, fontweight='bold', ha='center', va='center')
-        ax.text(ketu_rad, 1.10, 'KETU', color='#cc33ff', fontsize=7, ha='center', va='center', fontweight='bold')
+        artists.append(ax.text(ketu_rad, 1.02, '☋', color='#cc33ff', fontsize=18, fontweight='bold', ha='center', va='center'))
+        artists.append(ax.text(ketu_rad, 1.10, 'KETU', color='#cc33ff', fontsize=7, ha='center', va='center', fontweight='bold'))
+    return artists
 
-    # Draw the Moon at its position
+
+def _draw_moon(ax, moon_longitude):
+    """Draws the Moon at its position. Returns the marker."""
     moon_rad = np.radians(90 - moon_longitude)
     moon_r = 0.75
     
     # Moon marker
-    ax.plot(moon_rad, moon_r, 'o', markersize=28, color='#ffd700', 
-            markeredgecolor='#ffffff', markeredgewidth=2, zorder=10)
-    
-    # Add moon phase symbol (Removed emoji to fix font warning on Oracle Linux 9)
-    # ax.text(moon_rad, moon_r, moon_symbol, fontsize=20, ha='center', va='center', zorder=11)
-    
-    # Draw Earth at center
+    # (Moon phase emoji removed to fix font warning on Oracle Linux 9)
+    marker, = ax.plot(moon_rad, moon_r, 'o', markersize=28, color='#ffd700', 
+                      markeredgecolor='#ffffff', markeredgewidth=2, zorder=10)
+    return marker
+
+
+def _draw_earth(ax):
+    """Draws Earth at center."""
     ax.plot(0, 0, 'o', markersize=20, color='#4a90d9', 
             markeredgecolor='#ffffff', markeredgewidth=1.5, zorder=5)
     ax.text(0, 0, 'EARTH', fontsize=7, ha='center', va='center', color='#ffffff', zorder=6)
-    
-    # Configure polar plot
+
+
+def _configure_axes(ax):
     ax.set_theta_zero_location('N')
     ax.set_theta_direction(-1)
     ax.set_ylim(0, 1.15) # Increased to fit Rahu/Ketu labels
     ax.set_xticks([])
     ax.set_yticks([])
     ax.spines['polar'].set_visible(False)
+
+
+def render_skymap_full(moon_longitude, highlighted, rahu_longitude=None, ketu_longitude=None, output_path=None):
+    """
+    Draws the whole sky map in a fresh figure, the way every request used to.
+    Kept as the reference the pre-rendered wheel is verified against
+    (scripts/verify_skymap_render.py).
+    """
+    fig, canvas, ax = _new_figure()
+    _draw_wheel(ax, highlighted)
+    _draw_nodes(ax, rahu_longitude, ketu_longitude)
+    _draw_moon(ax, moon_longitude)
+    _draw_earth(ax)
+    _configure_axes(ax)
     
     # Save the figure with minimal padding
-    fig.savefig(output_path, dpi=120, bbox_inches='tight', 
+    fig.savefig(output_path, dpi=FIGURE_DPI, bbox_inches='tight', 
                 facecolor=fig.get_facecolor(), edgecolor='none',
-                pad_inches=0.1)
+                pad_inches=PAD_INCHES)
+    return output_path
+
+
+class WheelRenderer:
+    """
+    Sky map renderer that rasterizes the static wheel once and composites
+    the per-request markers onto it.
+
+    The unhighlighted wheel (with Earth) is rendered once; each highlight
+    variant is stored as the rectangle of pixels where it differs from that
+    base. A render copies the base and the highlighted patches into a
+    persistent Agg canvas, draws only the Moon and node artists onto it with
+    draw_artist(), and crops the same region savefig(bbox_inches='tight')
+    would keep.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._patches = {}
+
+        self.crop, self.base = self._render_wheel(())
+
+        # Persistent canvas for the dynamic artists: same axes geometry, no wheel
+        self.fig, self.canvas, self.ax = _new_figure()
+        self.fig.set_dpi(FIGURE_DPI)
+        self.moon = _draw_moon(self.ax, 0)
+        self.rahu = _draw_nodes(self.ax, 0, None)
+        self.ketu = _draw_nodes(self.ax, None, 0)
+        _configure_axes(self.ax)
+        for artist in [self.moon, *self.rahu, *self.ketu]:
+            artist.set_visible(False)
+        self.canvas.draw()
+
+    @staticmethod
+    def _render_wheel(highlighted):
+        """Returns (crop, pixels) for the static wheel with the given highlights."""
+        fig, canvas, ax = _new_figure()
+        fig.set_dpi(FIGURE_DPI)
+        _draw_wheel(ax, highlighted)
+        _draw_earth(ax)
+        _configure_axes(ax)
+        canvas.draw()
+
+        bbox = fig.get_tightbbox(canvas.get_renderer()).padded(PAD_INCHES)
+        height = fig.bbox.height
+        crop = (
+            slice(round(height - bbox.y1 * FIGURE_DPI), round(height - bbox.y0 * FIGURE_DPI)),
+            slice(round(bbox.x0 * FIGURE_DPI), round(bbox.x1 * FIGURE_DPI)),
+        )
+        return crop, np.asarray(canvas.buffer_rgba())[crop].copy()
+
+    def _patch(self, index):
+        patch = self._patches.get(index)
+        if patch is None:
+            _, variant = self._render_wheel((index,))
+            rows, cols = np.nonzero(np.any(variant != self.base, axis=2))
+            r0, r1, c0, c1 = rows.min(), rows.max() + 1, cols.min(), cols.max() + 1
+            patch = self._patches[index] = (r0, c0, variant[r0:r1, c0:c1].copy())
+        return patch
+
+    def prerender(self):
+        """Renders every highlight variant up front (e.g. at worker start)."""
+        with self._lock:
+            for index in range(len(NAKSHATRAS)):
+                self._patch(index)
+
+    def render(self, moon_longitude, highlighted, rahu_longitude=None, ketu_longitude=None):
+        """Returns the sky map as an RGBA array."""
+        with self._lock:
+            view = np.asarray(self.canvas.buffer_rgba())[self.crop]
+            view[...] = self.base
+            for index in highlighted:
+                r0, c0, patch = self._patch(index)
+                view[r0:r0 + patch.shape[0], c0:c0 + patch.shape[1]] = patch
+
+            # Same draw order as the full figure: node texts, then the Moon
+            for artists, longitude in ((self.rahu, rahu_longitude), (self.ketu, ketu_longitude)):
+                if longitude is None:
+                    continue
+                rad = np.radians(90 - longitude)
+                for artist in artists:
+                    artist.set_position((rad, artist.get_position()[1]))
+                    artist.set_visible(True)
+                    self.ax.draw_artist(artist)
+                    artist.set_visible(False)
+
+            self.moon.set_data([np.radians(90 - moon_longitude)], [self.moon.get_ydata()[0]])
+            self.moon.set_visible(True)
+            self.ax.draw_artist(self.moon)
+            self.moon.set_visible(False)
+
+            return view.copy()
+
+
+_wheel_renderer = None
+_wheel_renderer_lock = threading.Lock()
+
+
+def get_wheel_renderer() -> WheelRenderer:
+    """
+    Returns the process-wide WheelRenderer, rasterizing the base wheel on first use.
+    """
+    global _wheel_renderer
+    if _wheel_renderer is None:
+        with _wheel_renderer_lock:
+            if _wheel_renderer is None:
+                _wheel_renderer = WheelRenderer()
+    return _wheel_renderer
+
+
+def generate_skymap(
+    moon_longitude: float,
+    nakshatra_name: str,
+    nakshatra_pada: int,
+    phase_angle: float,
+    output_path: str,
+    event_title: str = None,
+    rahu_longitude: float = None,
+    ketu_longitude: float = None
+) -> str:
+    """
+    Generate an ecliptic wheel sky map showing the Moon's position among the 27 Nakshatras.
+    Includes Rahu and Ketu as mathematical markers (v4.1.1).
+    """
+    from PIL import Image
     
+    pixels = get_wheel_renderer().render(
+        moon_longitude, get_highlighted_indices(nakshatra_name),
+        rahu_longitude=rahu_longitude, ketu_longitude=ketu_longitude
+    )
+    Image.fromarray(pixels).save(output_path, format='png', dpi=(FIGURE_DPI, FIGURE_DPI))
+
     return output_path
 
 
+# SVG geometry in the PNG's pixels: the polar axes is 0.77 of the figure
+# height across and spans r = 0..1.15; the tight crop adds PAD_INCHES around it
+_SVG_AXES_RADIUS = 0.77 * FIGURE_SIZE[1] * FIGURE_DPI / 2
+_SVG_PX_PER_UNIT = _SVG_AXES_RADIUS / 1.15
+_SVG_HALF_EXTENT = _SVG_AXES_RADIUS + PAD_INCHES * FIGURE_DPI
+
+
+def _pt(points):
+    return svg.points_to_pixels(points, FIGURE_DPI)
+
+
+def _svg_xy(longitude, r):
+    """Pixel position of a (longitude, radius) wheel point, origin at Earth."""
+    rad = np.radians(longitude)
+    return r * _SVG_PX_PER_UNIT * np.cos(rad), -r * _SVG_PX_PER_UNIT * np.sin(rad)
+
+
+def _svg_wedge(start, end, r_inner, r_outer):
+    """Annular sector between two longitudes (counterclockwise on screen)."""
+    outer = _SVG_PX_PER_UNIT * r_outer
+    inner = _SVG_PX_PER_UNIT * r_inner
+    (x0, y0), (x1, y1) = _svg_xy(start, r_outer), _svg_xy(end, r_outer)
+    (x2, y2), (x3, y3) = _svg_xy(end, r_inner), _svg_xy(start, r_inner)
+    return (f"M{x0:.2f},{y0:.2f} A{outer:.2f},{outer:.2f} 0 0 0 {x1:.2f},{y1:.2f} "
+            f"L{x2:.2f},{y2:.2f} A{inner:.2f},{inner:.2f} 0 0 1 {x3:.2f},{y3:.2f} Z")
+
+
+def render_skymap_svg(moon_longitude, highlighted, rahu_longitude=None, ketu_longitude=None) -> bytes:
+    """
+    The sky map as SVG, drawn from string templates with the same geometry,
+    colors and draw order as the matplotlib figure. Returns UTF-8 bytes.
+    """
+    elements = []
+    for i, nak in enumerate(NAKSHATRAS):
+        is_current = i in highlighted
+        elements.append(svg.path(
+            _svg_wedge(nak["start"], nak["end"], 0.55, 0.95),
+            NAKSHATRA_COLOR_HIGHLIGHT if is_current else NAKSHATRA_COLORS_NORMAL[i],
+            stroke='#ffffff', stroke_width=_pt(2 if is_current else 0.5),
+            opacity=0.85 if is_current else 0.5,
+        ))
+
+    for i, nak in enumerate(NAKSHATRAS):
+        is_current = i in highlighted
+        # Same label rotation as _draw_wheel: radial, flipped to stay upright
+        mid_longitude = (nak["start"] + nak["end"]) / 2
+        rotation_deg = -mid_longitude
+        if -180 < rotation_deg < -90 or 90 < rotation_deg < 180:
+            rotation_deg += 180
+        x, y = _svg_xy(mid_longitude, 0.75)
+        elements.append(svg.text(
+            x, y, nak["name"][:6], '#ffffff' if is_current else '#aaaaaa',
+            _pt(7 if is_current else 6), rotation=rotation_deg, bold=is_current,
+        ))
+
+    for longitude, glyph, label, color in (
+        (rahu_longitude, '☊', 'RAHU', '#ff33cc'),
+        (ketu_longitude, '☋', 'KETU', '#cc33ff'),
+    ):
+        if longitude is None:
+            continue
+        elements.append(svg.text(*_svg_xy(longitude, 1.02), glyph, color, _pt(18), bold=True))
+        elements.append(svg.text(*_svg_xy(longitude, 1.10), label, color, _pt(7), bold=True))
+
+    elements.append(svg.circle(0, 0, _pt(10), '#4a90d9', stroke='#ffffff', stroke_width=_pt(1.5)))
+    elements.append(svg.text(0, 0, 'EARTH', '#ffffff', _pt(7)))
+    elements.append(svg.circle(*_svg_xy(moon_longitude, 0.75), _pt(14), '#ffd700',
+                               stroke='#ffffff', stroke_width=_pt(2)))
+
+    half = _SVG_HALF_EXTENT
+    return svg.document((-half, -half, half, half), BACKGROUND_COLOR, elements)
+
+
+def generate_skymap_svg(
+    moon_longitude: float,
+    nakshatra_name: str,
+    rahu_longitude: float = None,
+    ketu_longitude: float = None
+) -> bytes:
+    """
+    SVG counterpart of generate_skymap: cheap enough to render inline in the
+    web worker, no matplotlib involved.
+    """
+    return render_skymap_svg(
+        moon_longitude, get_highlighted_indices(nakshatra_name),
+        rahu_longitude=rahu_longitude, ketu_longitude=ketu_longitude
+    )
+
+
 def get_nakshatra_info(nakshatra_name: str):
     """
     Get detailed information about a Nakshatra by name.
@@ -6,14 +6,16 @@ This module visualizes planetary alignments by plotting their positions
 on a normalized ecliptic plane.
 """
 
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
 import numpy as np
 import hashlib
 import os
+from datetime import datetime
 from pathlib import Path
-from utils.astronomy import eph, sun, ts
+from skyfield.constants import AU_KM, C_AUDAY
+from skyfield.framelib import build_ecliptic_matrix
+from utils.astronomy import eph, sun, ts, as_time
+from utils.image_cache import ImageCache, IMAGE_CACHE_ROOT
+from utils import svg
 
 planets_map = {
     "Mercury": eph['mercury'],
@@ -25,48 +27,113 @@ planets_map = {
     "Uranus": eph['uranus barycenter'],
     "Neptune": eph['neptune barycenter']
 }
+PLANET_NAMES = tuple(planets_map)
 
-CACHE_DIR = Path("static/solar_systems")
+# Ephemeris segments (solar system barycenter -> body) summed for each planet
+_planet_segments = [
+    [vf.spk_segment for vf in getattr(body, "vector_functions", (body,))]
+    for body in planets_map.values()
+]
+
+# Traditional/Approximated names map
+TRADITIONAL_NAMES = {
+    "Mercury": "BUDHA (MERCURY)",
+    "Venus": "SHUKRA (VENUS)",
+    "Earth": "PRITHVI (EARTH)",
+    "Mars": "MANGALA (MARS)",
+    "Jupiter": "GURU (JUPITER)",
+    "Saturn": "SHANI (SATURN)",
+    "Uranus": "ARUNA (URANUS)*",
+    "Neptune": "VARUNA (NEPTUNE)*"
+}
+
+PLANET_COLORS = {
+    "Mercury": "#9b9b9b",
+    "Venus": "#f3d299",
+    "Earth": "#4a90d9",
+    "Mars": "#e94560",
+    "Jupiter": "#d39c7e",
+    "Saturn": "#c5ab6e",
+    "Uranus": "#a2cffe", # Muted blue
+    "Neptune": "#3f51b5" # Muted indigo
+}
+
+PLANET_SYMBOLS = {
+    "Mercury": "☿", "Venus": "♀", "Earth": "⊕", 
+    "Mars": "♂", "Jupiter": "♃", "Saturn": "♄",
+    "Uranus": "♅", "Neptune": "♆"
+}
+
+TRADITIONAL_PLANETS = ["Mercury", "Venus", "Earth", "Mars", "Jupiter", "Saturn"]
+
+# Refined Logarithmic-Style Scaling to handle outer planets without squashing inner
+def scale_position(x, y):
+    dist = np.sqrt(x**2 + y**2)
+    if dist == 0: return 0, 0
+    # Log-based scaling allows Uranus and Neptune to fit beautifully
+    scaled_dist = 4.5 * np.log1p(dist) 
+    factor = scaled_dist / dist
+    return x * factor, y * factor
+
+# Cache directory for generated views (outside static/, never served directly)
+CACHE_DIR = IMAGE_CACHE_ROOT / "solar_systems"
+
+# Keyed by the event's date/time, so the 15-minute privacy retention applies
+SOLAR_CACHE = ImageCache(
+    "solar_systems", CACHE_DIR,
+    max_disk_bytes=int(os.environ.get("PANCHANGA_SOLAR_CACHE_BYTES", 128 * 1024 * 1024)),
+    max_memory_bytes=int(os.environ.get("PANCHANGA_SOLAR_MEMORY_BYTES", 32 * 1024 * 1024)),
+    ttl=int(os.environ.get("PANCHANGA_SOLAR_CACHE_TTL", 15 * 60)),
+)
 
 def get_cache_key(date_str: str, time_str: str):
     """Heliocentric view only depends on date/time, not observer location."""
     data = f"solar-{date_str}-{time_str}"
     return hashlib.md5(data.encode()).hexdigest()[:12]
 
-def get_cached_image(cache_key: str):
-    image_path = CACHE_DIR / f"{cache_key}.png"
-    if image_path.exists():
-        return str(image_path)
-    return None
+def _barycentric_planets(whole, fraction):
+    """Barycentric ICRF positions (AU) of all planets, shape (8, 3, N)."""
+    return np.stack([
+        sum(segment.compute(whole, planet_fraction) for segment in segments)
+        for segments, planet_fraction in zip(_planet_segments, fraction)
+    ]) / AU_KM
+
+def get_heliocentric_positions(times_utc):
+    """
+    Heliocentric ecliptic X/Y positions (AU, true ecliptic and equinox of
+    date) of all planets in PLANET_NAMES order.
+
+    Accepts a UTC datetime, a sequence of them or a skyfield Time, and returns
+    an array of shape (8, 2) for a single instant or (8, 2, N) for N instants.
+    Matches sun.at(t).observe(body).frame_xyz(ecliptic_frame) per planet, but
+    evaluates each ephemeris segment once for all instants, iterating the
+    light-time correction for every planet and instant together.
+    """
+    t = ts.from_datetime(times_utc) if isinstance(times_utc, datetime) else as_time(times_utc)
+    whole = np.atleast_1d(t.whole)
+    tdb_fraction = np.atleast_1d(t.tdb_fraction)
+
+    sun_xyz = sun.spk_segment.compute(whole, tdb_fraction) / AU_KM
+    light_time = np.zeros((len(PLANET_NAMES), len(whole)))
+    for _ in range(10):
+        xyz = _barycentric_planets(whole, tdb_fraction - light_time) - sun_xyz
+        previous, light_time = light_time, np.sqrt((xyz * xyz).sum(axis=1)) / C_AUDAY
+        if np.max(np.abs(light_time - previous)) < 1e-12:
+            break
+    else:
+        raise ValueError("light-travel time failed to converge")
+
+    rotation = build_ecliptic_matrix(t)
+    if rotation.ndim == 2:
+        rotation = rotation[:, :, None]
+    ecliptic = np.einsum("ijn,pjn->pin", rotation, xyz)[:, :2]
+    return ecliptic[:, :, 0] if t.shape == () else ecliptic
 
 def generate_solar_system(utc_dt, output_path, event_title=None):
     """
     Generate a top-down heliocentric view of the solar system.
     """
-    # Ensure cache directory exists
-    CACHE_DIR.mkdir(parents=True, exist_ok=True)
-    
-    t = ts.from_datetime(utc_dt)
-    
-    positions = {}
-    for name, body in planets_map.items():
-        # Get position relative to sun
-        astrometric = sun.at(t).observe(body)
-        from skyfield.framelib import ecliptic_frame
-        pos = astrometric.frame_xyz(ecliptic_frame).au
-        positions[name] = (pos[0], pos[1]) # X, Y coordinates
-
-    # Traditional/Approximated names map
-    traditional_names = {
-        "Mercury": "BUDHA (MERCURY)",
-        "Venus": "SHUKRA (VENUS)",
-        "Earth": "PRITHVI (EARTH)",
-        "Mars": "MANGALA (MARS)",
-        "Jupiter": "GURU (JUPITER)",
-        "Saturn": "SHANI (SATURN)",
-        "Uranus": "ARUNA (URANUS)*",
-        "Neptune": "VARUNA (NEPTUNE)*"
-    }
+    positions = dict(zip(PLANET_NAMES, map(tuple, get_heliocentric_positions(utc_dt))))
 
     # Setup Plot
     from matplotlib.figure import Figure
@@ -84,41 +151,13 @@ def generate_solar_system(utc_dt, output_path, event_title=None):
             markeredgecolor='#ffffff', markeredgewidth=1.5, label='Sun', zorder=10)
     ax.text(0, -0.6, 'SUN (SURYA)', color='#ffffff', ha='center', fontsize=16, fontweight='bold')
 
-    colors = {
-        "Mercury": "#9b9b9b",
-        "Venus": "#f3d299",
-        "Earth": "#4a90d9",
-        "Mars": "#e94560",
-        "Jupiter": "#d39c7e",
-        "Saturn": "#c5ab6e",
-        "Uranus": "#a2cffe", # Muted blue
-        "Neptune": "#3f51b5" # Muted indigo
-    }
-    
-    symbols = {
-        "Mercury": "☿", "Venus": "♀", "Earth": "⊕", 
-        "Mars": "♂", "Jupiter": "♃", "Saturn": "♄",
-        "Uranus": "♅", "Neptune": "♆"
-    }
-
-    traditional_planets = ["Mercury", "Venus", "Earth", "Mars", "Jupiter", "Saturn"]
-
-    # Refined Logarithmic-Style Scaling to handle outer planets without squashing inner
-    def scale_pos(x, y):
-        dist = np.sqrt(x**2 + y**2)
-        if dist == 0: return 0, 0
-        # Log-based scaling allows Uranus and Neptune to fit beautifully
-        scaled_dist = 4.5 * np.log1p(dist) 
-        factor = scaled_dist / dist
-        return x * factor, y * factor
-
     max_r = 0
     for name, (x, y) in positions.items():
-        sx, sy = scale_pos(x, y)
+        sx, sy = scale_position(x, y)
         r = np.sqrt(sx**2 + sy**2)
         max_r = max(max_r, r)
         
-        is_modern = name not in traditional_planets
+        is_modern = name not in TRADITIONAL_PLANETS
         
         # Orbit styling
         orbit_color = '#ffffff' if not is_modern else '#444455'
@@ -131,14 +170,14 @@ def generate_solar_system(utc_dt, output_path, event_title=None):
         
         # Planet Symbol
         opacity = 1.0 if not is_modern else 0.6
-        ax.text(sx, sy, symbols[name], color=colors[name], ha='center', va='center', 
+        ax.text(sx, sy, PLANET_SYMBOLS[name], color=PLANET_COLORS[name], ha='center', va='center', 
                 fontsize=28, fontweight='bold', zorder=15, alpha=opacity)
         
         # Planet Name
         ha = 'left' if sx >= 0 else 'right'
         offset = 0.5 if sx >= 0 else -0.5
-        v_name = traditional_names.get(name, name.upper())
-        ax.text(sx + offset, sy, v_name, color=colors[name], 
+        v_name = TRADITIONAL_NAMES.get(name, name.upper())
+        ax.text(sx + offset, sy, v_name, color=PLANET_COLORS[name], 
                 ha=ha, va='center', fontsize=14, fontweight='bold', zorder=15, alpha=opacity)
 
     # Note about Aruna/Varuna
@@ -161,3 +200,76 @@ def generate_solar_system(utc_dt, output_path, event_title=None):
     # Save the figure
     fig.savefig(output_path, dpi=130, bbox_inches='tight', facecolor='#0a0a0f', pad_inches=0.2)
     return output_path
+
+# SVG geometry in the PNG's pixels (18.5 in figure saved at 130 dpi): the
+# equal-aspect axes is 0.77 of the figure across, spanning +/- 1.1 * max_r
+SVG_DPI = 130
+_SVG_AXES_HALF = 0.77 * 18.5 * SVG_DPI / 2
+_SVG_PAD = 0.2 * SVG_DPI
+# Average advance of a bold DejaVu Sans glyph, for sizing the canvas to the labels
+_SVG_CHAR_WIDTH = 0.65
+
+def _pt(points):
+    return svg.points_to_pixels(points, SVG_DPI)
+
+def render_solar_system_svg(positions):
+    """
+    The heliocentric view as SVG, drawn from string templates with the
+    geometry, colors and draw order of generate_solar_system's figure.
+    positions maps planet names to heliocentric ecliptic (x, y) in AU.
+    Returns UTF-8 bytes.
+    """
+    scaled = {name: scale_position(x, y) for name, (x, y) in positions.items()}
+    max_r = max(np.hypot(sx, sy) for sx, sy in scaled.values())
+    padding = 1.1
+    px = _SVG_AXES_HALF / (max_r * padding)
+    # Canvas: the axes square, widened to fit the planet labels
+    x0, x1 = -_SVG_AXES_HALF, _SVG_AXES_HALF
+
+    orbits, planets = [], []
+    for name, (sx, sy) in scaled.items():
+        is_modern = name not in TRADITIONAL_PLANETS
+        x, y = sx * px, -sy * px
+        orbits.append(svg.circle(
+            0, 0, np.hypot(x, y), 'none',
+            stroke='#444455' if is_modern else '#ffffff', stroke_width=_pt(1),
+            dash=(_pt(3.7), _pt(1.6)) if is_modern else None,
+            opacity=0.08 if is_modern else 0.15,
+        ))
+
+        opacity = 0.6 if is_modern else 1.0
+        planets.append(svg.text(x, y, PLANET_SYMBOLS[name], PLANET_COLORS[name], _pt(28),
+                                bold=True, opacity=opacity))
+        v_name = TRADITIONAL_NAMES.get(name, name.upper())
+        label_x = x + (0.5 if sx >= 0 else -0.5) * px
+        planets.append(svg.text(label_x, y, v_name, PLANET_COLORS[name], _pt(14),
+                                ha='left' if sx >= 0 else 'right', bold=True, opacity=opacity))
+        label_width = _SVG_CHAR_WIDTH * _pt(14) * len(v_name)
+        x0, x1 = min(x0, label_x - label_width), max(x1, label_x + label_width)
+
+    # Same star field as the PNG (seed 42, drawn in data coordinates)
+    rng = np.random.RandomState(42)
+    stars_x = rng.uniform(-max_r * padding, max_r * padding, 100) * px
+    stars_y = -rng.uniform(-max_r * padding, max_r * padding, 100) * px
+    star_r = _pt(np.sqrt(1.5)) / 2
+    stars = [svg.circle(x, y, star_r, '#ffffff', opacity=0.15) for x, y in zip(stars_x, stars_y)]
+
+    labels = [
+        svg.text(0, 0.6 * px, 'SUN (SURYA)', '#ffffff', _pt(16), va='baseline', bold=True),
+        svg.text(0.96 * _SVG_AXES_HALF, 0.96 * _SVG_AXES_HALF,
+                 "* Modern astronomical additions (Aruna & Varuna)", '#555555', _pt(12),
+                 ha='right', va='baseline', italic=True),
+    ]
+    sun_marker = [svg.circle(0, 0, r_glow * px, '#ffcc00', opacity=0.3) for r_glow in (0.2, 0.1)]
+    sun_marker.append(svg.circle(0, 0, _pt(12), '#ffcc00', stroke='#ffffff', stroke_width=_pt(1.5)))
+
+    bounds = (x0 - _SVG_PAD, -_SVG_AXES_HALF - _SVG_PAD, x1 + _SVG_PAD, _SVG_AXES_HALF + _SVG_PAD)
+    return svg.document(bounds, '#0a0a0f', orbits + stars + labels + sun_marker + planets)
+
+def generate_solar_system_svg(utc_dt):
+    """
+    SVG counterpart of generate_solar_system: cheap enough to render inline
+    in the web worker, no matplotlib involved.
+    """
+    positions = dict(zip(PLANET_NAMES, map(tuple, get_heliocentric_positions(utc_dt))))
+    return render_solar_system_svg(positions)
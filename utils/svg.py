@@ -0,0 +1,81 @@
+"""
+String templates for the SVG variants of the sky map and solar system views.
+
+The SVG renderers reproduce the matplotlib figures' geometry (same radii,
+angles, colors, font sizes and draw order) in figure pixels, so an SVG and
+the PNG of the same view line up; they just skip matplotlib, rasterization
+and PNG encoding. Coordinates are written with two decimals.
+"""
+
+from xml.sax.saxutils import escape
+
+# Fonts matplotlib renders with, then close substitutes
+FONT_FAMILY = "DejaVu Sans, Verdana, Arial, sans-serif"
+
+_DOCUMENT = (
+    '<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}" height="{height:.0f}" '
+    'viewBox="{x:.2f} {y:.2f} {width:.2f} {height:.2f}" font-family="{font}">'
+    '<rect x="{x:.2f}" y="{y:.2f}" width="{width:.2f}" height="{height:.2f}" fill="{background}"/>'
+    '{body}</svg>'
+)
+_CIRCLE = '<circle cx="{x:.2f}" cy="{y:.2f}" r="{r:.2f}" fill="{fill}"{extra}/>'
+_PATH = '<path d="{d}" fill="{fill}"{extra}/>'
+_TEXT = '<text x="{x:.2f}" y="{y:.2f}" font-size="{size:.2f}" fill="{fill}"{extra}>{label}</text>'
+
+_ANCHORS = {"left": "start", "center": "middle", "right": "end"}
+_BASELINES = {"center": "central", "baseline": "auto"}
+
+
+def points_to_pixels(points, dpi):
+    """Converts a matplotlib size in points (fonts, markers, line widths) to pixels."""
+    return points * dpi / 72
+
+
+def _attributes(stroke=None, stroke_width=None, opacity=None, dash=None, **extra):
+    attributes = []
+    if stroke:
+        attributes.append(f' stroke="{stroke}" stroke-width="{stroke_width:.2f}"')
+    if dash:
+        attributes.append(f' stroke-dasharray="{dash[0]:.2f} {dash[1]:.2f}"')
+    if opacity is not None and opacity < 1:
+        attributes.append(f' opacity="{opacity:g}"')
+    for name, value in extra.items():
+        if value is not None:
+            attributes.append(f' {name.replace("_", "-")}="{value}"')
+    return "".join(attributes)
+
+
+def circle(x, y, r, fill, **style):
+    return _CIRCLE.format(x=x, y=y, r=r, fill=fill, extra=_attributes(**style))
+
+
+def path(d, fill, **style):
+    return _PATH.format(d=d, fill=fill, extra=_attributes(**style))
+
+
+def text(x, y, label, fill, size, ha="center", va="center", rotation=0, bold=False, italic=False, opacity=None):
+    """
+    Text anchored like matplotlib's ax.text(ha=..., va=...); rotation is in
+    matplotlib's sense (degrees counterclockwise about the anchor point).
+    """
+    extra = _attributes(
+        opacity=opacity,
+        text_anchor=_ANCHORS[ha],
+        dominant_baseline=_BASELINES[va],
+        font_weight="bold" if bold else None,
+        font_style="italic" if italic else None,
+        transform=f"rotate({-rotation:.2f} {x:.2f} {y:.2f})" if rotation else None,
+    )
+    return _TEXT.format(x=x, y=y, size=size, fill=fill, extra=extra, label=escape(label))
+
+
+def document(bounds, background, elements):
+    """
+    An SVG showing the (x0, y0, x1, y1) pixel rectangle of the drawing.
+    Returns UTF-8 bytes.
+    """
+    x0, y0, x1, y1 = bounds
+    return _DOCUMENT.format(
+        x=x0, y=y0, width=x1 - x0, height=y1 - y0,
+        font=FONT_FAMILY, background=background, body="".join(elements),
+    ).encode("utf-8")
@@ -0,0 +1,104 @@
+"""
+Startup warm-up for preloaded gunicorn masters (see gunicorn.conf.py).
+
+With preload_app the master imports the app once and forks the workers from
+it, so everything loaded before the fork is shared copy-on-write instead of
+being loaded again by every worker. Import alone leaves a lot to the first
+request; warm_up() loads the rest of the shared, read-only state:
+
+- the de421 segments and timescale data (one Moment, one sunrise);
+- the memory-mapped tables (New Moons, anga index, lunar months, Chebyshev
+  series), paged in;
+- pytz's zone data for every common timezone;
+- the TimezoneFinder and the gazetteer.
+
+It must not start threads or processes: the render pool and the job queue
+are created on first use, in the workers, after the fork.
+"""
+
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+import pytz
+
+# Where the ephemeris and sunrise code paths are exercised
+WARMUP_PLACE = {"latitude": 12.9716, "longitude": 77.5946, "timezone": "Asia/Kolkata"}
+
+
+def _ephemeris():
+    from utils.astronomy import get_moment, get_sunrise_sunset
+    local_tz = pytz.timezone(WARMUP_PLACE["timezone"])
+    now = datetime.now(local_tz)
+    moment = get_moment(now.astimezone(pytz.utc))
+    moment.angular_data
+    moment.lagna(WARMUP_PLACE["latitude"], WARMUP_PLACE["longitude"])
+    get_sunrise_sunset(now, WARMUP_PLACE["latitude"], WARMUP_PLACE["longitude"], WARMUP_PLACE["timezone"])
+
+
+def _tables():
+    from utils import astronomy
+    from panchanga import lunar_months, transitions
+    arrays = [astronomy.NEW_MOONS_TT]
+    if transitions.ANGA_INDEX is not None:
+        arrays += [times for times, _ in transitions.ANGA_INDEX.series.values()]
+    if lunar_months.MASA_TABLE is not None:
+        arrays += [lunar_months.MASA_TABLE.bounds_tt, lunar_months.MASA_TABLE.masas]
+    if astronomy.CHEBYSHEV is not None:
+        arrays += [astronomy.CHEBYSHEV.sun[0], astronomy.CHEBYSHEV.moon[0]]
+    for array in arrays:
+        if array is not None:
+            # Reading every page brings memory-mapped files into the page cache
+            float(np.sum(array))
+
+
+def _timezones():
+    for name in pytz.common_timezones:
+        pytz.timezone(name)
+
+
+def _locations():
+    from utils.gazetteer import get_gazetteer
+    from utils.location import get_timezone_finder
+    get_timezone_finder().timezone_at(lng=WARMUP_PLACE["longitude"], lat=WARMUP_PLACE["latitude"])
+    get_gazetteer()
+
+
+WARMUP_STEPS = {
+    "ephemeris": _ephemeris,
+    "tables": _tables,
+    "timezones": _timezones,
+    "locations": _locations,
+}
+
+
+def warm_up():
+    """
+    Loads the shared read-only state. Returns seconds per step; a failing
+    step is reported and skipped, since requests load it lazily anyway.
+    """
+    timings = {}
+    for name, step in WARMUP_STEPS.items():
+        t0 = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            print(f"WARNING: Warm-up step {name} failed: {e}")
+        timings[name] = round(time.perf_counter() - t0, 3)
+    return timings
+
+
+def process_memory():
+    """
+    Resident and shared memory of this process in bytes (Linux), or None.
+    Shared pages count fully in each worker's RSS, so compare PSS (see
+    scripts/benchmark_startup.py) to see what the workers really cost.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            _, resident, shared = (int(value) for value in f.read().split()[:3])
+    except (OSError, ValueError):
+        return None
+    page = os.sysconf("SC_PAGE_SIZE")
+    return {"rss_bytes": resident * page, "shared_bytes": shared * page}